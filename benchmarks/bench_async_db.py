@@ -0,0 +1,81 @@
+"""Асинхронный фасад БД: пропускная способность и задержка записи при
+разном числе одновременных корутин
+
+Запуск: python -m benchmarks.bench_async_db --writes 5000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks import synthetic
+from hotel_management.async_db import AsyncDatabaseManager
+from hotel_management.database import DatabaseManager
+
+CONCURRENCY = (1, 10, 50, 100, 500)
+
+
+def percentile(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def report(label: str, count: int, elapsed: float, latencies, extra: str = ""):
+    print(
+        f"{label:<28} {count / elapsed:9.0f} записей/с  "
+        f"p50 {statistics.median(latencies) * 1e3:7.2f} мс  "
+        f"p99 {percentile(latencies, 0.99) * 1e3:7.2f} мс  {extra}".rstrip()
+    )
+
+
+async def run_async(path: str, guests: list, concurrency: int):
+    latencies = []
+    async with AsyncDatabaseManager(path) as db:
+        chunks = [guests[i::concurrency] for i in range(concurrency)]
+
+        async def worker(chunk):
+            for guest in chunk:
+                started = time.perf_counter()
+                await db.save_guest(guest)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(chunk) for chunk in chunks))
+        elapsed = time.perf_counter() - started
+    report(
+        f"async, корутин: {concurrency}",
+        len(guests),
+        elapsed,
+        latencies,
+        f"({db.writes / db.commits:.1f} записей на коммит)",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writes", type=int, default=5000)
+    args = parser.parse_args()
+    guests = list(synthetic.guests(args.writes))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sync.db")
+        latencies = []
+        with DatabaseManager(path) as db:
+            started = time.perf_counter()
+            for guest in guests:
+                call_started = time.perf_counter()
+                db.save_guest(guest)
+                latencies.append(time.perf_counter() - call_started)
+            elapsed = time.perf_counter() - started
+        report("sync, коммит на запись", len(guests), elapsed, latencies)
+
+        for concurrency in CONCURRENCY:
+            path = os.path.join(tmp, f"async{concurrency}.db")
+            asyncio.run(run_async(path, guests, concurrency))
+
+
+if __name__ == "__main__":
+    main()
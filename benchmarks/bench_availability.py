@@ -0,0 +1,119 @@
+"""Проверка занятости: дерево интервалов против линейного сканирования бронирований
+
+Запуск: python -m benchmarks.bench_availability --rooms 500 --reservations 100000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from hotel_management.availability import AvailabilityEngine, to_day
+from hotel_management.database import DatabaseManager
+from hotel_management.room import Room
+
+START = datetime(2024, 1, 1)
+
+
+def make_reservations(rooms: int, total: int, rng: random.Random):
+    """Непересекающиеся бронирования, равномерно распределенные по номерам"""
+    created_at = START.isoformat()
+    next_free = [START] * rooms
+    for reservation_id in range(1, total + 1):
+        room_index = reservation_id % rooms
+        check_in = next_free[room_index] + timedelta(days=rng.randrange(0, 3))
+        check_out = check_in + timedelta(days=rng.randrange(1, 7))
+        next_free[room_index] = check_out
+        yield {
+            "id": reservation_id,
+            "guest_id": reservation_id,
+            "room_id": room_index + 1,
+            "check_in_date": check_in.isoformat(),
+            "check_out_date": check_out.isoformat(),
+            "num_guests": 1,
+            "total_cost": 100.0,
+            "status": "active",
+            "created_at": created_at,
+        }
+
+
+def per_call(label: str, calls: int, func):
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<44} {elapsed / calls * 1e6:12.1f} мкс/запрос")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--reservations", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "hotel.db")) as db:
+            db.save_rooms_many(
+                Room(i, i, Room.ROOM_TYPES[i % 4], 100.0, 2)
+                for i in range(1, args.rooms + 1)
+            )
+            db.save_reservations_many(
+                make_reservations(args.rooms, args.reservations, rng)
+            )
+
+            started = time.perf_counter()
+            engine = AvailabilityEngine.from_database(db)
+            print(f"Загрузка индекса из БД: {time.perf_counter() - started:.2f} с")
+            reservations = list(db.iter_reservations(row_format="dict"))
+
+    horizon = max(to_day(r["check_out_date"]) for r in reservations) - to_day(START)
+    queries = []
+    for _ in range(args.queries):
+        check_in = START + timedelta(days=rng.randrange(horizon))
+        queries.append(
+            (rng.randrange(1, args.rooms + 1), check_in, check_in + timedelta(days=3))
+        )
+    it = iter(queries * 2)
+
+    def linear_is_free():
+        room_id, check_in, check_out = next(it)
+        start, end = check_in.isoformat(), check_out.isoformat()
+        return not any(
+            r["room_id"] == room_id
+            and r["check_in_date"] < end
+            and r["check_out_date"] > start
+            for r in reservations
+        )
+
+    linear_calls = max(1, args.queries // 20)
+    per_call("is_room_free (линейный поиск)", linear_calls, linear_is_free)
+    it = iter(queries)
+    per_call(
+        "is_room_free (дерево интервалов)",
+        args.queries,
+        lambda: engine.is_room_free(*next(it)),
+    )
+    it = iter(queries)
+    per_call(
+        "free_rooms по типу (дерево интервалов)",
+        args.queries,
+        lambda: engine.free_rooms(*next(it)[1:], room_type="double"),
+    )
+    new_ids = iter(range(args.reservations + 1, args.reservations + args.queries + 1))
+    far = START + timedelta(days=horizon + 10)
+    per_call(
+        "add_booking + cancel_reservation",
+        args.queries,
+        lambda: (
+            engine.add_booking(rid := next(new_ids), 1, far, far + timedelta(days=2)),
+            engine.cancel_reservation(rid),
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
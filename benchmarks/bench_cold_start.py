@@ -0,0 +1,60 @@
+"""Время холодного старта: загрузка данных приложения из БД
+
+Повторяет HotelManagementApp.load_data без интерфейса.
+Запуск: python -m benchmarks.bench_cold_start --guests 50000 --reservations 500000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks import synthetic
+from hotel_management.availability import AvailabilityEngine
+from hotel_management.database import DatabaseManager
+from hotel_management.repository import HotelRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--guests", type=int, default=50_000)
+    parser.add_argument("--reservations", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hotel.db")
+        with DatabaseManager(path) as db:
+            synthetic.populate(db, args.rooms, args.guests, args.reservations)
+
+        with DatabaseManager(path) as db:
+            # "Сегодня" - за год до конца синтетической истории бронирований
+            last = db.connection.execute(
+                "SELECT MAX(check_out_date) FROM reservations"
+            ).fetchone()[0]
+            today = date.fromisoformat(last[:10]) - timedelta(days=365)
+
+        started = time.perf_counter()
+        with DatabaseManager(path) as db:
+            repository = HotelRepository(db)
+            rooms = repository.load_rooms()
+            guests = repository.load_guests()
+            loaded = time.perf_counter()
+            AvailabilityEngine.from_database(db, today)
+            finished = time.perf_counter()
+            print(
+                f"Номера и гости ({len(rooms)} + {len(guests)}): {loaded - started:.2f} с"
+            )
+            print(f"Индекс занятости с {today}: {finished - loaded:.2f} с")
+            print(f"Холодный старт: {finished - started:.2f} с")
+
+            started = time.perf_counter()
+            count = len(repository.reservations)
+            print(
+                f"Ленивая загрузка {count} бронирований: {time.perf_counter() - started:.2f} с"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Сравнение задержки одного вызова DatabaseManager до и после пула соединений
+
+Запуск: python -m benchmarks.bench_database --n 2000
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from hotel_management.database import INSERT_RESERVATION_SQL, DatabaseManager
+
+
+def legacy_save_reservation(db_path: str, data: tuple):
+    """Старое поведение: новое соединение и коммит на каждый вызов"""
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute(INSERT_RESERVATION_SQL, data)
+        conn.commit()
+        return cursor.lastrowid
+
+
+def legacy_get_all_rooms(db_path: str):
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM rooms")
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def make_reservations(n: int):
+    start = datetime(2025, 1, 1)
+    created_at = datetime.now().isoformat()
+    for i in range(1, n + 1):
+        check_in = start + timedelta(days=i % 365)
+        yield {
+            "id": i,
+            "guest_id": i % 100 + 1,
+            "room_id": i % 50 + 1,
+            "check_in_date": check_in.isoformat(),
+            "check_out_date": (check_in + timedelta(days=3)).isoformat(),
+            "num_guests": 2,
+            "total_cost": 300.0,
+            "status": "active",
+            "created_at": created_at,
+        }
+
+
+def as_tuple(data: dict) -> tuple:
+    return (
+        data["id"],
+        data["guest_id"],
+        data["room_id"],
+        data["check_in_date"],
+        data["check_out_date"],
+        data["num_guests"],
+        data["total_cost"],
+        data["status"],
+        data["created_at"],
+    )
+
+
+def timed(label: str, n: int, func):
+    started = time.perf_counter()
+    for _ in range(n):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {elapsed / n * 1e6:10.1f} мкс/вызов")
+    return elapsed / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=2000, help="количество вызовов")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.db")
+        pooled_path = os.path.join(tmp, "pooled.db")
+        DatabaseManager(legacy_path, journal_mode="DELETE", synchronous="FULL").close()
+
+        legacy_rows = iter(make_reservations(args.n))
+        before = timed(
+            "save_reservation (соединение на вызов)",
+            args.n,
+            lambda: legacy_save_reservation(legacy_path, as_tuple(next(legacy_rows))),
+        )
+        before_read = timed(
+            "get_all_rooms (соединение на вызов)",
+            args.n,
+            lambda: legacy_get_all_rooms(legacy_path),
+        )
+
+        with DatabaseManager(pooled_path) as db:
+            pooled_rows = iter(make_reservations(args.n))
+            after = timed(
+                "save_reservation (постоянное соединение)",
+                args.n,
+                lambda: db.save_reservation(next(pooled_rows)),
+            )
+            after_read = timed(
+                "get_all_rooms (постоянное соединение)",
+                args.n,
+                db.get_all_rooms,
+            )
+            batch = make_reservations(args.n)
+            started = time.perf_counter()
+            db.save_reservations_many(batch)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{'save_reservations_many':<40} {elapsed / args.n * 1e6:10.1f} мкс/строку"
+            )
+
+    print(
+        f"Ускорение записи: x{before / after:.1f}, чтения: x{before_read / after_read:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
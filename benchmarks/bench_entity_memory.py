@@ -0,0 +1,92 @@
+"""Память и время создания бронирований: __dict__ против __slots__
+
+Сравнивает прежнюю раскладку (атрибуты в __dict__, datetime.now() в
+каждом конструкторе) с текущей Reservation на слотах и с from_row().
+Запуск: python -m benchmarks.bench_entity_memory --n 1000000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from hotel_management.reservation import Reservation
+
+
+class DictLayoutReservation:
+    """Прежняя раскладка Reservation: атрибуты в __dict__"""
+
+    def __init__(
+        self, id, guest_id, room_id, check_in_date, check_out_date, num_guests
+    ):
+        self._id = id
+        self._created_at = datetime.now()
+        self._guest_id = guest_id
+        self._room_id = room_id
+        self._check_in_date = check_in_date
+        self._check_out_date = check_out_date
+        self._num_guests = num_guests
+        self._total_cost = 0.0
+        self._status = "active"
+
+
+def measure(label: str, n: int, build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    objects = build(n)
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(objects) == n
+    print(
+        f"{label:<28} {elapsed:7.2f} с  {current / 2**20:9.1f} МБ  "
+        f"{current / n:6.0f} байт/объект"
+    )
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    # Даты общие для объектов из конструктора, чтобы мерить раскладку сущности
+    check_in = datetime(2025, 1, 1)
+    check_out = check_in + timedelta(days=3)
+    stored_row = (
+        1,
+        1,
+        1,
+        check_in.isoformat(),
+        check_out.isoformat(),
+        2,
+        300.0,
+        "active",
+        "2024-12-01T00:00:00",
+    )
+
+    legacy = measure(
+        "__dict__ + datetime.now()",
+        args.n,
+        lambda n: [
+            DictLayoutReservation(i, 1, 1, check_in, check_out, 2) for i in range(n)
+        ],
+    )
+    slotted = measure(
+        "__slots__ + datetime.now()",
+        args.n,
+        lambda n: [Reservation(i, 1, 1, check_in, check_out, 2) for i in range(n)],
+    )
+    # from_row разбирает даты из строк, поэтому объекты дат у каждой записи свои
+    measure(
+        "__slots__, from_row без часов",
+        args.n,
+        lambda n: [Reservation.from_row(stored_row) for _ in range(n)],
+    )
+    print(f"Экономия памяти: {1 - slotted / legacy:.0%}")
+
+
+if __name__ == "__main__":
+    main()
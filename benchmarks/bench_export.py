@@ -0,0 +1,44 @@
+"""Выгрузка в XLSX: время и пиковая память export_to_xlsx
+
+Запуск: python -m benchmarks.bench_export --reservations 200000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import synthetic
+from hotel_management.database import DatabaseManager
+from hotel_management.export import export_to_xlsx
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--reservations", type=int, default=200_000)
+    parser.add_argument("--max-rows", type=int, default=1_048_576)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "hotel.db")) as db:
+            synthetic.populate(db, args.rooms, 1000, args.reservations)
+            path = os.path.join(tmp, "report.xlsx")
+            started = time.perf_counter()
+            rows = export_to_xlsx(db, path, max_rows=args.max_rows)
+            elapsed = time.perf_counter() - started
+            size = os.path.getsize(path)
+            # Память меряется отдельным прогоном: tracemalloc замедляет выгрузку
+            tracemalloc.start()
+            export_to_xlsx(db, path, max_rows=args.max_rows)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    print(
+        f"{rows} строк за {elapsed:.1f} с ({rows / elapsed:,.0f} строк/с), "
+        f"пик памяти {peak / 2**20:.1f} МБ, файл {size / 2**20:.1f} МБ"
+    )
+
+
+if __name__ == "__main__":
+    main()
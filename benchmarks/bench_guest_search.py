@@ -0,0 +1,62 @@
+"""Поиск гостей: оператор `in` (Guest.__contains__) против GuestSearchIndex
+
+Запуск: python -m benchmarks.bench_guest_search --n 200000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks import synthetic
+from hotel_management.guest import Guest
+from hotel_management.search import GuestSearchIndex
+
+
+def per_query(label: str, queries, func):
+    started = time.perf_counter()
+    for query in queries:
+        func(query)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {elapsed / len(queries) * 1e3:9.3f} мс/запрос")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    guests = [Guest.from_row(tuple(g.values())) for g in synthetic.guests(args.n)]
+    started = time.perf_counter()
+    index = GuestSearchIndex(guests)
+    print(f"Построение индекса: {time.perf_counter() - started:.2f} с")
+    # Память меряется отдельным построением: tracemalloc сильно замедляет код
+    tracemalloc.start()
+    GuestSearchIndex(guests[: args.n // 10])
+    memory = tracemalloc.get_traced_memory()[0] * 10
+    tracemalloc.stop()
+    print(f"Память индекса (оценка по 10% гостей): {memory / 2**20:.0f} МБ")
+
+    rng = random.Random(7)
+    queries = []
+    for _ in range(args.queries):
+        guest = rng.choice(guests)
+        queries.append(rng.choice([guest.name, guest.email[:9], guest.phone[-6:]]))
+
+    per_query(
+        "[g for g in guests if q in g]",
+        queries[:5],
+        lambda query: [g for g in guests if query in g][:20],
+    )
+    per_query("GuestSearchIndex.search", queries, index.search)
+
+    started = time.perf_counter()
+    for guest in guests[:1000]:
+        guest.email = "changed." + guest.email
+    elapsed = time.perf_counter() - started
+    print(f"Переиндексация при смене email: {elapsed / 1000 * 1e3:.3f} мс/гость")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Пакетная проверка гостей: построчный Guest.validate() против validate_guests
+
+Запуск: python -m benchmarks.bench_guest_validation --n 500000 --workers 4
+"""
+
+import argparse
+import re
+import time
+
+from benchmarks import synthetic
+from hotel_management.guest import Guest
+from hotel_management.validation import validate_guests
+
+
+def legacy_validate(record: dict) -> bool:
+    """Прежний путь импорта: объект Guest на запись и re.match со строками"""
+    Guest(0, record["name"], record["email"], record["phone"], record["passport"])
+    email_ok = re.match(
+        r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", record["email"]
+    )
+    phone_ok = re.match(r"^\+?[1-9]\d{1,14}$", record["phone"])
+    return (
+        bool(record["name"].strip())
+        and email_ok is not None
+        and phone_ok is not None
+        and len(record["passport"]) >= 5
+    )
+
+
+def timed(label: str, n: int, func):
+    started = time.perf_counter()
+    invalid = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<36} {n / elapsed:12,.0f} записей/с  (ошибочных: {invalid})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    # Записи готовятся заранее, чтобы не мерить их генерацию
+    records = list(synthetic.guests(args.n))
+    timed(
+        "Guest + re.match со строками",
+        args.n,
+        lambda: sum(not legacy_validate(r) for r in records),
+    )
+    timed(
+        "validate_guests (один процесс)",
+        args.n,
+        lambda: sum(not r.ok for r in validate_guests(records)),
+    )
+    timed(
+        f"validate_guests ({args.workers} процесса)",
+        args.n,
+        lambda: sum(not r.ok for r in validate_guests(records, workers=args.workers)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Накладные расходы инструментирования: без обертки, сбор выключен, включен
+
+Запуск: python -m benchmarks.bench_metrics --n 200000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from hotel_management.database import DatabaseManager
+from hotel_management.metrics import METRICS
+from hotel_management.room import Room
+
+
+def per_call(label: str, calls: int, func):
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {elapsed / calls * 1e9:10.0f} нс/вызов")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=200_000)
+    args = parser.parse_args()
+    room = Room(1, 101, "single", 100.0, 1)
+    raw_validate = Room.validate.__wrapped__
+
+    per_call("Room.validate без обертки", args.n, lambda: raw_validate(room))
+    per_call("Room.validate, метрики выключены", args.n, room.validate)
+    METRICS.enable()
+    per_call("Room.validate, метрики включены", args.n, room.validate)
+    METRICS.disable()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "hotel.db")) as db:
+            db.save_room(room)
+            calls = max(1, args.n // 10)
+            raw = DatabaseManager.get_id_bounds.__wrapped__
+            per_call("get_id_bounds без обертки", calls, lambda: raw(db, "rooms"))
+            per_call(
+                "get_id_bounds, метрики выключены",
+                calls,
+                lambda: db.get_id_bounds("rooms"),
+            )
+            METRICS.enable()
+            per_call(
+                "get_id_bounds, метрики включены",
+                calls,
+                lambda: db.get_id_bounds("rooms"),
+            )
+            METRICS.disable()
+    stats = METRICS.snapshot()["operations"]["db.get_id_bounds"]
+    print(
+        f"get_id_bounds: p50 {stats['p50_seconds'] * 1e6:.1f} мкс, "
+        f"p99 {stats['p99_seconds'] * 1e6:.1f} мкс"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Календарь занятости: битовые маски против дерева интервалов и
+линейного сканирования бронирований
+
+Запуск: python -m benchmarks.bench_occupancy --rooms 2000 --days 730
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+
+from benchmarks import synthetic
+from hotel_management.availability import AvailabilityEngine
+from hotel_management.database import DatabaseManager
+from hotel_management.occupancy import OccupancyCalendar
+
+# Средняя длина бронирования с промежутком в synthetic.reservations, дней
+AVERAGE_STAY = 4.5
+
+
+def per_call(label: str, calls: int, func):
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<44} {elapsed / calls * 1e6:12.1f} мкс/запрос")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    rng = random.Random(1)
+    # Бронирований хватает, чтобы заполнить весь горизонт
+    total = int(args.rooms * args.days / AVERAGE_STAY)
+    start = synthetic.START
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "hotel.db")) as db:
+            synthetic.populate(db, args.rooms, 1000, total)
+            print(f"Номеров: {args.rooms}, бронирований: {total}")
+
+            started = time.perf_counter()
+            calendar = OccupancyCalendar.from_database(db, start, args.days)
+            print(f"Календарь из БД: {time.perf_counter() - started:.2f} с")
+            started = time.perf_counter()
+            engine = AvailabilityEngine.from_database(db, start)
+            print(f"Дерево интервалов из БД: {time.perf_counter() - started:.2f} с")
+            reservations = list(db.iter_reservations(row_format="dict"))
+
+            tracemalloc.start()
+            OccupancyCalendar.from_database(db, start, args.days)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    masks = sum(value.__sizeof__() for value in calendar._occupied.values())
+    print(
+        f"Маски номеров: {masks / 1024:.0f} КиБ, пик построения: {peak / 2**20:.1f} МиБ"
+    )
+
+    queries = []
+    for _ in range(args.queries):
+        check_in = start + timedelta(days=rng.randrange(args.days - 14))
+        queries.append((check_in, check_in + timedelta(days=rng.randrange(1, 14))))
+
+    def linear_free_rooms(check_in, check_out):
+        """Прежний подход: все бронирования против всех номеров"""
+        start, end = check_in.isoformat(), check_out.isoformat()
+        busy = {
+            r["room_id"]
+            for r in reservations
+            if r["status"] != "cancelled"
+            and r["check_in_date"] < end
+            and r["check_out_date"] > start
+        }
+        return [room_id for room_id in range(1, args.rooms + 1) if room_id not in busy]
+
+    it = iter(queries)
+    per_call(
+        "free_rooms (линейный поиск)",
+        max(1, args.queries // 50),
+        lambda: linear_free_rooms(*next(it)),
+    )
+    it = iter(queries)
+    per_call(
+        "free_rooms (дерево интервалов)",
+        args.queries,
+        lambda: engine.free_rooms(*next(it)),
+    )
+    it = iter(queries)
+    per_call(
+        "free_rooms (календарь)", args.queries, lambda: calendar.free_rooms(*next(it))
+    )
+    it = iter(queries)
+    per_call(
+        "free_rooms по типу (календарь)",
+        args.queries,
+        lambda: calendar.free_rooms(*next(it), room_type="double"),
+    )
+    it = iter(queries)
+    per_call(
+        "occupancy_rate (календарь)",
+        args.queries,
+        lambda: calendar.occupancy_rate(*next(it)),
+    )
+    per_call(
+        "daily_free на весь горизонт (календарь)",
+        args.queries,
+        lambda: calendar.daily_free(start, start + timedelta(days=args.days)),
+    )
+    new_ids = iter(range(total + 1, total + args.queries + 1))
+    per_call(
+        "add_booking + cancel_reservation",
+        args.queries,
+        lambda: (
+            calendar.add_booking(rid := next(new_ids), 1, *queries[0]),
+            calendar.cancel_reservation(rid),
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
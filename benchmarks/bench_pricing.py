@@ -0,0 +1,61 @@
+"""Пакетный расчет стоимости: цикл по Reservation против price_batch
+
+Запуск: python -m benchmarks.bench_pricing --n 1000000
+"""
+
+import argparse
+import time
+
+from benchmarks import synthetic
+from hotel_management.pricing import np, price_batch
+from hotel_management.reservation import Reservation
+
+
+def timed(label: str, n: int, func):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<36} {elapsed:7.2f} с  {n / elapsed:14,.0f} строк/с")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--rooms", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = list(synthetic.reservations(args.n, args.rooms, 1000))
+    prices = {
+        room["id"]: room["price_per_night"] for room in synthetic.rooms(args.rooms)
+    }
+    check_in = [row["check_in_date"] for row in rows]
+    check_out = [row["check_out_date"] for row in rows]
+    room_ids = [row["room_id"] for row in rows]
+    stored_rows = [tuple(row.values()) for row in rows]
+
+    def scalar():
+        # Оба варианта начинают со строк БД с датами в ISO-формате
+        for row in stored_rows:
+            reservation = Reservation.from_row(row)
+            price = prices[reservation.room_id]
+            reservation.calculate_stay_cost(price)
+            reservation.calculate_booking_deposit(price)
+
+    timed("from_row + calculate_* в цикле", args.n, scalar)
+    timed(
+        "price_batch (без NumPy)",
+        args.n,
+        lambda: price_batch(check_in, check_out, room_ids, prices, use_numpy=False),
+    )
+    if np is not None:
+        timed(
+            "price_batch (NumPy)",
+            args.n,
+            lambda: price_batch(check_in, check_out, room_ids, prices, use_numpy=True),
+        )
+    else:
+        print("NumPy не установлен, векторный вариант пропущен")
+
+
+if __name__ == "__main__":
+    main()
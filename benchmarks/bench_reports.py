@@ -0,0 +1,49 @@
+"""Отчет по выручке: один процесс против пула процессов
+
+Запуск: python -m benchmarks.bench_reports --reservations 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks import synthetic
+from hotel_management.database import DatabaseManager
+from hotel_management.reports import build_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, default=2000)
+    parser.add_argument("--reservations", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    cores = os.cpu_count() or 1
+    workers = sorted({1, 2, cores})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hotel.db")
+        with DatabaseManager(path) as db:
+            synthetic.populate(db, args.rooms, 1000, args.reservations)
+        print(f"Бронирований: {args.reservations}, ядер: {cores}")
+
+        reference = build_report(path, workers=1)
+        baseline = None
+        for count in workers:
+            best = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                report = build_report(path, workers=count)
+                best = min(best, time.perf_counter() - started)
+            assert report == reference, "результат отличается от однопоточного"
+            baseline = baseline or best
+            print(
+                f"процессов: {count:<3} {best:8.2f} с "
+                f"{args.reservations / best:12.0f} броней/с  x{baseline / best:.2f}"
+            )
+    print(f"Месяцев в отчете: {len(reference.by_month)}")
+
+
+if __name__ == "__main__":
+    main()
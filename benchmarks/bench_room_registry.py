@@ -0,0 +1,77 @@
+"""Поиск номеров: линейный обход списка против RoomRegistry
+
+Запуск: python -m benchmarks.bench_room_registry --rooms 2000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks import synthetic
+from hotel_management.room import Room
+from hotel_management.room_registry import RoomRegistry
+
+
+def linear_get(rooms, room_id):
+    """Прежний поиск в calculate_cost и add_reservation"""
+    return next((r for r in rooms if r.id == room_id), None)
+
+
+def per_call(label: str, repeat: int, func):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<44} {elapsed * 1e6:10,.2f} мкс/вызов")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rooms = [
+        Room(r["id"], r["number"], r["room_type"], r["price_per_night"], r["capacity"])
+        for r in synthetic.rooms(args.rooms)
+    ]
+    started = time.perf_counter()
+    registry = RoomRegistry(rooms)
+    print(f"Построение реестра: {(time.perf_counter() - started) * 1000:.1f} мс")
+
+    rng = random.Random(1)
+    ids = [rng.randrange(1, args.rooms + 1) for _ in range(args.repeat)]
+    lookups = iter(ids)
+    per_call(
+        "Поиск по id: next(...) по списку",
+        args.repeat,
+        lambda: linear_get(rooms, next(lookups)),
+    )
+    lookups = iter(ids)
+    per_call(
+        "Поиск по id: RoomRegistry.get",
+        args.repeat,
+        lambda: registry.get(next(lookups)),
+    )
+    per_call(
+        "Дешевый double от 3 мест: sorted(Room.__lt__)",
+        50,
+        lambda: next(
+            (r for r in sorted(rooms) if r.room_type == "double" and r.capacity >= 3),
+            None,
+        ),
+    )
+    per_call(
+        "Дешевый double от 3 мест: RoomRegistry",
+        args.repeat,
+        lambda: registry.cheapest(room_type="double", min_capacity=3),
+    )
+    per_call(
+        "Цена 100..150: RoomRegistry.by_price",
+        args.repeat,
+        lambda: registry.by_price(100, 150),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Схема v1 против v2: размер файла, выборки по датам и время миграции
+
+БД создается в схеме v1, замеряется, мигрирует на v2 и замеряется снова.
+Запуск: python -m benchmarks.bench_schema --reservations 1000000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks import synthetic
+from hotel_management.database import DatabaseManager
+from hotel_management.migration import migrate, vacuum
+
+
+def file_size(db: DatabaseManager) -> int:
+    """Размер файла БД после переноса WAL в основной файл"""
+    db.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return os.path.getsize(db.db_path)
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure(db: DatabaseManager, args) -> dict:
+    rng = random.Random(1)
+    # Периоды поиска внутри синтетической истории (~2 дня на бронь номера)
+    days = 2 * args.reservations // args.rooms
+    periods = []
+    for _ in range(args.queries):
+        start = synthetic.START + timedelta(days=rng.randrange(days))
+        periods.append((rng.randrange(1, args.rooms + 1), start, start + timedelta(7)))
+    since = synthetic.START + timedelta(days=days // 2)
+
+    def room_queries():
+        for room_id, start, end in periods:
+            db.get_room_reservations(room_id, start, end)
+
+    return {
+        "size": file_size(db),
+        "room": best_of(room_queries, args.repeat) / args.queries,
+        "active": best_of(
+            lambda: sum(1 for _ in db.iter_active_reservations(since)), args.repeat
+        ),
+        "stats": best_of(db.get_statistics_aggregates, args.repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, default=2000)
+    parser.add_argument("--reservations", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hotel.db")
+        with DatabaseManager(path, schema_version=1) as db:
+            synthetic.populate(db, args.rooms, 1000, args.reservations)
+            before = measure(db, args)
+            started = time.perf_counter()
+            migrate(db, args.batch_size)
+            migrated = time.perf_counter() - started
+            started = time.perf_counter()
+            vacuum(db)
+            vacuumed = time.perf_counter() - started
+            after = measure(db, args)
+
+    print(f"Бронирований: {args.reservations}, номеров: {args.rooms}")
+    print(
+        f"Миграция пачками по {args.batch_size}: {migrated:.2f} с, "
+        f"VACUUM: {vacuumed:.2f} с"
+    )
+    rows = (
+        ("Размер файла, МБ", "size", 2**-20, "{:10.1f}"),
+        ("Брони номера за неделю, мкс", "room", 1e6, "{:10.1f}"),
+        ("Активные с даты (обход), с", "active", 1, "{:10.3f}"),
+        ("Агрегаты статистики, с", "stats", 1, "{:10.3f}"),
+    )
+    print(f"{'':<30}{'v1':>10}{'v2':>10}")
+    for title, key, scale, fmt in rows:
+        print(
+            f"{title:<30}{fmt.format(before[key] * scale)}"
+            f"{fmt.format(after[key] * scale)}   x{before[key] / after[key]:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
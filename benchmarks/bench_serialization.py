@@ -0,0 +1,74 @@
+"""Сериализация бронирований: to_dict/dict(zip) против to_row/from_row
+
+Запуск: python -m benchmarks.bench_serialization --n 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from hotel_management.database import RESERVATION_COLUMNS, DatabaseManager
+from hotel_management.reservation import Reservation
+
+
+def dict_params(data: dict) -> tuple:
+    """Прежний путь записи: словарь, затем кортеж по ключам"""
+    return tuple(data[column] for column in RESERVATION_COLUMNS)
+
+
+def timed(label: str, n: int, func):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {elapsed:7.2f} с  {n / elapsed:12,.0f} строк/с")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    start = datetime(2025, 1, 1)
+    reservations = [
+        Reservation(i, i, 1 + i % 100, start, start + timedelta(days=1 + i % 7), 2)
+        for i in range(1, args.n + 1)
+    ]
+    rows = [reservation.to_row() for reservation in reservations]
+
+    timed(
+        "to_dict -> кортеж",
+        args.n,
+        lambda: [dict_params(r.to_dict()) for r in reservations],
+    )
+    timed("to_row", args.n, lambda: [r.to_row() for r in reservations])
+    timed(
+        "dict(zip) по строке",
+        args.n,
+        lambda: [dict(zip(RESERVATION_COLUMNS, row)) for row in rows],
+    )
+    timed("from_row", args.n, lambda: [Reservation.from_row(row) for row in rows])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "hotel.db")) as db:
+            timed(
+                "save_reservations_many(to_dict)",
+                args.n,
+                lambda: db.save_reservations_many(r.to_dict() for r in reservations),
+            )
+            timed(
+                "save_reservations_many(to_row)",
+                args.n,
+                lambda: db.save_reservations_many(reservations),
+            )
+            timed(
+                "iter_reservations (dict)",
+                args.n,
+                lambda: list(db.iter_reservations(row_format="dict")),
+            )
+            timed("get_all_reservations (from_row)", args.n, db.get_all_reservations)
+
+
+if __name__ == "__main__":
+    main()
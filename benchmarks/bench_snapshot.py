@@ -0,0 +1,134 @@
+"""Холодный запуск приложения: загрузка из БД против бинарного снимка
+
+Запуск: python -m benchmarks.bench_snapshot --reservations 1000000
+"""
+
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks import synthetic
+from hotel_management.database import DatabaseManager
+from hotel_management.reservation import Reservation
+from hotel_management.snapshot import load_state, save_snapshot
+
+
+def timed(func):
+    # Объекты прошлых замеров не должны попадать в обходы сборщика мусора
+    gc.collect()
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def cold_start(db: DatabaseManager, path: str, since):
+    """То, что делает HotelManagementApp до показа окна"""
+    state = load_state(db, path, since)
+    rooms = state.repository.load_rooms()
+    state.repository.load_guests()
+    for room in rooms:
+        state.statistics.track_room(room)
+    return state
+
+
+def summary(state, since) -> tuple:
+    """Данные для сверки снимка с БД"""
+    stats = state.statistics
+    return (
+        stats.total_rooms,
+        stats.total_guests,
+        stats.reservations_by_status(),
+        round(stats.total_revenue, 2),
+        state.availability.free_rooms(since, since + timedelta(7)),
+    )
+
+
+def change(db: DatabaseManager, args, rng: random.Random) -> None:
+    """Изменения после снимка: новые бронирования, отмены и цены"""
+    first = args.reservations + 1
+    start = synthetic.START + timedelta(days=2 * args.reservations // args.rooms)
+    db.save_reservations_many(
+        Reservation(
+            first + i,
+            rng.randrange(1, args.guests + 1),
+            rng.randrange(1, args.rooms + 1),
+            start + timedelta(i % 30),
+            start + timedelta(i % 30 + 2),
+            1,
+        )
+        for i in range(args.changes)
+    )
+    ids = rng.sample(range(1, args.reservations + 1), args.changes)
+    with db.transaction():
+        for reservation_id in ids[: args.changes // 2]:
+            db.set_reservation_status(reservation_id, "cancelled")
+    db.update_reservation_costs((123.0, i) for i in ids[args.changes // 2 :])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, default=2000)
+    parser.add_argument("--guests", type=int, default=50_000)
+    parser.add_argument("--reservations", type=int, default=1_000_000)
+    parser.add_argument("--changes", type=int, default=1000)
+    args = parser.parse_args()
+    rng = random.Random(1)
+    # Текущая дата - середина синтетической истории
+    since = (synthetic.START + timedelta(days=args.reservations // args.rooms)).date()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hotel.snapshot")
+        with DatabaseManager(os.path.join(tmp, "hotel.db")) as db:
+            synthetic.populate(db, args.rooms, args.guests, args.reservations)
+            state, results["db"] = timed(lambda: cold_start(db, path, since))
+            expected = summary(state, since)
+            _, results["history_db"] = timed(lambda: len(state.repository.reservations))
+            del state
+
+            _, results["capture"] = timed(lambda: save_snapshot(db, path, since))
+            size = os.path.getsize(path)
+            state, results["snapshot"] = timed(lambda: cold_start(db, path, since))
+            assert state.reason is None and summary(state, since) == expected
+            _, results["search"] = timed(
+                lambda: state.availability.free_rooms(since, since + timedelta(3))
+            )
+            _, results["history"] = timed(lambda: len(state.repository.reservations))
+            del state
+
+            change(db, args, rng)
+            state, results["db_changed"] = timed(lambda: cold_start(db, "", since))
+            expected = summary(state, since)
+            del state
+            state, results["replay"] = timed(lambda: cold_start(db, path, since))
+            assert state.reason is None and summary(state, since) == expected
+            _, results["refresh"] = timed(
+                lambda: save_snapshot(db, path, since, state.snapshot)
+            )
+
+    print(
+        f"Номеров: {args.rooms}, гостей: {args.guests}, "
+        f"бронирований: {args.reservations}; снимок {size / 2**20:.1f} МБ"
+    )
+    rows = (
+        ("Запуск из БД", "db"),
+        ("Запуск из снимка", "snapshot"),
+        (f"Запуск из БД после {2 * args.changes} изменений", "db_changed"),
+        (f"Запуск из снимка + {2 * args.changes} изменений", "replay"),
+        ("Первый поиск свободных номеров", "search"),
+        ("История бронирований из БД", "history_db"),
+        ("История бронирований из снимка", "history"),
+        ("Запись полного снимка", "capture"),
+        ("Запись снимка из предыдущего", "refresh"),
+    )
+    for title, key in rows:
+        print(f"{title:<45}{results[key]:10.3f} с")
+    print(f"Ускорение запуска: x{results['db'] / results['snapshot']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Статистика отеля: пересчет обходом коллекций против счетчиков
+
+Запуск: python -m benchmarks.bench_statistics --reservations 500000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks import synthetic
+from hotel_management.database import DatabaseManager
+from hotel_management.repository import HotelRepository
+from hotel_management.statistics import HotelStatistics
+
+
+def recompute(rooms, guests, reservations) -> tuple:
+    """Прежний show_statistics"""
+    return (
+        len(rooms),
+        len([r for r in rooms if r.is_available]),
+        len(guests),
+        len([r for r in reservations if r.status == "active"]),
+        sum(r.total_cost for r in reservations),
+    )
+
+
+def counters(stats: HotelStatistics) -> tuple:
+    return (
+        stats.total_rooms,
+        stats.available_rooms,
+        stats.total_guests,
+        stats.active_reservations,
+        stats.total_revenue,
+    )
+
+
+def per_call(label: str, repeat: int, func):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<36} {elapsed * 1e6:12,.1f} мкс/вызов")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--guests", type=int, default=50_000)
+    parser.add_argument("--reservations", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "hotel.db")) as db:
+            synthetic.populate(db, args.rooms, args.guests, args.reservations)
+
+            started = time.perf_counter()
+            stats = HotelStatistics.from_database(db)
+            print(f"Начальные агрегаты из БД: {time.perf_counter() - started:.2f} с")
+
+            repository = HotelRepository(db)
+            rooms = repository.load_rooms()
+            guests = repository.load_guests()
+            started = time.perf_counter()
+            reservations = repository.load_reservations()
+            print(f"Загрузка всех бронирований: {time.perf_counter() - started:.2f} с")
+
+            expected = recompute(rooms, guests, reservations)
+            assert counters(stats)[:4] == expected[:4]
+            assert abs(counters(stats)[4] - expected[4]) < 1e-6 * max(expected[4], 1)
+
+            per_call(
+                "Пересчет обходом коллекций",
+                3,
+                lambda: recompute(rooms, guests, reservations),
+            )
+            per_call("Чтение счетчиков", 100_000, lambda: counters(stats))
+            per_call("Разбивка по месяцам", 1000, stats.by_month)
+
+
+if __name__ == "__main__":
+    main()
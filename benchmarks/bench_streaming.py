@@ -0,0 +1,45 @@
+"""Пиковая память при чтении бронирований: get_all_reservations против iter_reservations
+
+Запуск: python -m benchmarks.bench_streaming --n 200000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_database import make_reservations
+from hotel_management.database import DatabaseManager
+
+
+def measure(label: str, func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<36} {count:>9} строк {elapsed:8.2f} с  пик {peak / 2**20:8.1f} МБ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--n", type=int, default=200_000, help="количество бронирований"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "hotel.db")) as db:
+            db.save_reservations_many(make_reservations(args.n))
+            measure("get_all_reservations", lambda: len(db.get_all_reservations()))
+            for row_format in ("tuple", "row", "dict", "entity"):
+                measure(
+                    f"iter_reservations({row_format})",
+                    lambda: sum(1 for _ in db.iter_reservations(row_format=row_format)),
+                )
+
+
+if __name__ == "__main__":
+    main()
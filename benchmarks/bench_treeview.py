@@ -0,0 +1,143 @@
+"""Время кадра списка гостей: полная перерисовка Treeview против
+синхронизации по разнице и виртуального окна
+
+Нужен дисплей (переменная DISPLAY, например Xvfb).
+Запуск: python -m benchmarks.bench_treeview --n 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from benchmarks import synthetic
+from hotel_management.database import DatabaseManager
+from hotel_management.guest import Guest
+from hotel_management.list_view import DatabaseSource, TreeviewSync, VirtualTreeview
+
+COLUMNS = ("ID", "Имя", "Email", "Телефон", "Паспорт")
+
+
+def guest_row(guest) -> tuple:
+    return (guest.id, guest.name, guest.email, guest.phone, guest.passport)
+
+
+def make_tree(root) -> ttk.Treeview:
+    tree = ttk.Treeview(root, columns=COLUMNS, show="headings", height=25)
+    for col in COLUMNS:
+        tree.heading(col, text=col)
+    tree.pack(side="left", fill="both", expand=True)
+    return tree
+
+
+def frame(root, label: str, func, repeat: int = 1):
+    """Среднее время операции вместе с отрисовкой (root.update)"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+        root.update()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<44} {elapsed * 1000:10.1f} мс/кадр")
+
+
+def full_rebuild(tree, guests):
+    """Прежний update_guests_list"""
+    for item in tree.get_children():
+        tree.delete(item)
+    for guest in guests:
+        tree.insert("", "end", values=guest_row(guest))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=100_000)
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        sys.exit(f"Tk недоступен: {e}")
+    root.geometry("900x600")
+
+    guests = [
+        Guest(row["id"], row["name"], row["email"], row["phone"], row["passport"])
+        for row in synthetic.guests(args.n)
+    ]
+    extra = Guest(
+        args.n + 1, "New Guest", "new@example.com", "+79000000000", "NEW00001"
+    )
+
+    tree = make_tree(root)
+    frame(
+        root, f"Полная перерисовка ({args.n} строк)", lambda: full_rebuild(tree, guests)
+    )
+    guests.append(extra)
+    frame(
+        root, "Полная перерисовка после добавления", lambda: full_rebuild(tree, guests)
+    )
+    guests.pop()
+    tree.destroy()
+
+    tree = make_tree(root)
+    view = TreeviewSync(tree, guest_row)
+    frame(root, "TreeviewSync: первый вывод", lambda: view.sync(guests))
+    guests.append(extra)
+    frame(root, "TreeviewSync: добавление одного гостя", lambda: view.sync(guests))
+    guests.pop()
+    tree.destroy()
+
+    tree = make_tree(root)
+    scrollbar = ttk.Scrollbar(root, orient="vertical")
+    scrollbar.pack(side="right", fill="y")
+    virtual = VirtualTreeview(tree, scrollbar, guest_row)
+    frame(root, "VirtualTreeview: первый вывод", lambda: virtual.set_source(guests))
+    guests.append(extra)
+    frame(root, "VirtualTreeview: добавление одного гостя", virtual.render)
+    frame(
+        root, "VirtualTreeview: прокрутка на 3 строки", lambda: virtual.scroll(3), 200
+    )
+    frame(
+        root,
+        "VirtualTreeview: переход на страницу",
+        lambda: virtual.yview("scroll", "1", "pages"),
+        200,
+    )
+    tree.destroy()
+    scrollbar.destroy()
+
+    # Список, который приложение не держит в памяти (история бронирований)
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "hotel.db")) as db:
+            db.save_guests_many(guests)
+            tree = make_tree(root)
+            scrollbar = ttk.Scrollbar(root, orient="vertical")
+            scrollbar.pack(side="right", fill="y")
+            virtual = VirtualTreeview(tree, scrollbar, guest_row)
+            source = DatabaseSource(db, "guests")
+            rng = random.Random(1)
+            frame(
+                root,
+                "DatabaseSource: первый вывод",
+                lambda: virtual.set_source(source),
+            )
+            frame(
+                root,
+                "DatabaseSource: прокрутка на 3 строки",
+                lambda: virtual.scroll(3),
+                200,
+            )
+            frame(
+                root,
+                "DatabaseSource: переход в случайное место",
+                lambda: virtual.yview("moveto", str(rng.random())),
+                200,
+            )
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
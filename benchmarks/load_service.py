@@ -0,0 +1,186 @@
+"""Нагрузка на HTTP-сервис бронирования: запросов в секунду и задержки
+
+Без --url поднимает сервис на временной синтетической БД:
+    python -m benchmarks.load_service --connections 50 --requests 20000
+Против запущенного сервиса:
+    python -m benchmarks.load_service --url 127.0.0.1:8080 --rooms 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+from benchmarks import synthetic
+from hotel_management.database import DatabaseManager
+
+# Доли запросов: поиск свободных номеров, расчет стоимости, бронирование
+MIX = (("availability", 0.7), ("quote", 0.2), ("book", 0.1))
+# Разных периодов поиска: одинаковые запросы склеиваются сервисом
+SEARCH_PERIODS = 20
+
+
+def percentile(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Client:
+    """HTTP/1.1-клиент с постоянным соединением"""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, await self.reader.readexactly(length)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def make_request(rng: random.Random, rooms: int, guests: int):
+    """Случайный запрос по долям MIX: (операция, метод, путь, тело)"""
+    kind = rng.choices([name for name, _ in MIX], [share for _, share in MIX])[0]
+    if kind == "availability":
+        start = date.today() + timedelta(days=1 + rng.randrange(SEARCH_PERIODS))
+        end = start + timedelta(days=3)
+        return kind, "GET", f"/availability?check_in={start}&check_out={end}", None
+    start = date.today() + timedelta(days=1 + rng.randrange(365))
+    end = start + timedelta(days=rng.randrange(1, 7))
+    room_id = rng.randrange(1, rooms + 1)
+    if kind == "quote":
+        path = f"/quote?room_id={room_id}&check_in={start}&check_out={end}"
+        return kind, "GET", path, None
+    payload = {
+        "guest_id": rng.randrange(1, guests + 1),
+        "room_id": room_id,
+        "check_in": start.isoformat(),
+        "check_out": end.isoformat(),
+        "num_guests": 1,
+    }
+    return kind, "POST", "/reservations", payload
+
+
+async def run_load(host, port, connections, total, rooms, guests):
+    latencies = defaultdict(list)
+    statuses = Counter()
+    remaining = [total]
+
+    async def worker(seed: int):
+        rng = random.Random(seed)
+        client = Client(host, port)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                kind, method, path, payload = make_request(rng, rooms, guests)
+                started = time.perf_counter()
+                status, _ = await client.request(method, path, payload)
+                latencies[kind].append(time.perf_counter() - started)
+                statuses[status] += 1
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(seed) for seed in range(connections)))
+    elapsed = time.perf_counter() - started
+
+    print(f"Соединений: {connections}, запросов: {total}")
+    print(f"Пропускная способность: {total / elapsed:.0f} запросов/с")
+    everything = [value for values in latencies.values() for value in values]
+    for kind, values in [("все", everything)] + sorted(latencies.items()):
+        print(
+            f"  {kind:<14} p50 {statistics.median(values) * 1e3:7.2f} мс  "
+            f"p99 {percentile(values, 0.99) * 1e3:7.2f} мс  ({len(values)})"
+        )
+    print(
+        "Коды ответов: " + ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items()))
+    )
+    client = Client(host, port)
+    _, body = await client.request("GET", "/stats")
+    client.close()
+    print(f"Сервис: {json.loads(body)}")
+
+
+def start_service(tmp: str, rooms: int, guests: int):
+    """Запуск сервиса в отдельном процессе на синтетической БД"""
+    path = os.path.join(tmp, "hotel.db")
+    with DatabaseManager(path) as db:
+        db.save_rooms_many(synthetic.rooms(rooms))
+        db.save_guests_many(synthetic.guests(guests))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "hotel_management.service", "--db", path, "--port", "0"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    # Первая строка вывода: адрес сервиса
+    address = process.stdout.readline().strip().rsplit("/", 1)[1]
+    host, port = address.rsplit(":", 1)
+    return process, host, int(port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="адрес запущенного сервиса host:port")
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--guests", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.url:
+        host, port = args.url.rsplit(":", 1)
+        asyncio.run(
+            run_load(
+                host,
+                int(port),
+                args.connections,
+                args.requests,
+                args.rooms,
+                args.guests,
+            )
+        )
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        process, host, port = start_service(tmp, args.rooms, args.guests)
+        try:
+            asyncio.run(
+                run_load(
+                    host, port, args.connections, args.requests, args.rooms, args.guests
+                )
+            )
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Гонка бронирований из нескольких процессов: двойные бронирования,
+пропускная способность и ожидание блокировки записи
+
+Запуск: python -m benchmarks.stress_booking --attempts 500 --rooms 20
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from hotel_management.database import BookingConflictError, DatabaseManager
+from hotel_management.metrics import METRICS
+from hotel_management.reservation import Reservation
+
+WRITERS = (1, 2, 4, 8)
+START = datetime(2030, 1, 1)
+# Короткий таймаут соединения: дальше ожиданием управляют повторы book_if_free
+BUSY_TIMEOUT = 0.05
+
+
+def writer(path: str, mode: str, seed: int, attempts: int, rooms: int, days: int):
+    rng = random.Random(seed)
+    booked = 0
+    METRICS.enable()
+    started = time.perf_counter()
+    with DatabaseManager(path, timeout=BUSY_TIMEOUT) as db:
+        for _ in range(attempts):
+            check_in = START + timedelta(days=rng.randrange(days))
+            check_out = check_in + timedelta(days=rng.randrange(1, 4))
+            reservation = Reservation(
+                None, 1, rng.randrange(1, rooms + 1), check_in, check_out, 1
+            )
+            if mode == "naive":
+                # Прежний порядок: проверка и запись в разных транзакциях
+                if db.get_room_reservations(reservation.room_id, check_in, check_out):
+                    continue
+                db.save_reservation(reservation)
+                booked += 1
+                continue
+            try:
+                db.book_if_free(reservation, retries=100)
+                booked += 1
+            except BookingConflictError:
+                pass
+    elapsed = time.perf_counter() - started
+    lock_wait = METRICS.snapshot()["operations"].get("db.book_if_free.lock_wait")
+    return booked, elapsed, lock_wait
+
+
+def run(mode: str, writers: int, args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hotel.db")
+        DatabaseManager(path).close()
+        context = multiprocessing.get_context("spawn")
+        jobs = [
+            (path, mode, seed, args.attempts, args.rooms, args.days)
+            for seed in range(writers)
+        ]
+        started = time.perf_counter()
+        with context.Pool(writers) as pool:
+            results = pool.starmap(writer, jobs)
+        elapsed = time.perf_counter() - started
+        with DatabaseManager(path) as db:
+            doubles = len(db.get_double_bookings())
+    attempts = writers * args.attempts
+    booked = sum(result[0] for result in results)
+    line = (
+        f"{mode:<12} процессов: {writers:<2} {attempts / elapsed:8.0f} попыток/с  "
+        f"забронировано {booked:5}  двойных: {doubles:4}"
+    )
+    waits = [result[2] for result in results if result[2]]
+    if waits:
+        mean = sum(w["total_seconds"] for w in waits) / sum(w["calls"] for w in waits)
+        p99 = max(w["p99_seconds"] for w in waits)
+        line += (
+            f"  ожидание блокировки: ср. {mean * 1e3:.2f} мс, p99 {p99 * 1e3:.2f} мс"
+        )
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attempts", type=int, default=500, help="на процесс")
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--days", type=int, default=60)
+    args = parser.parse_args()
+    print(f"Ядер: {os.cpu_count()}, номеров: {args.rooms}, дней: {args.days}")
+    for writers in WRITERS:
+        run("naive", writers, args)
+        run("book_if_free", writers, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+"""Набор бенчмарков пакета hotel_management с JSON-результатами
+
+Запуск всех замеров на синтетическом отеле и запись результатов:
+    python -m benchmarks.suite run --size 10k --out results.json
+Сравнение с сохраненным базовым замером (код выхода 1 при регрессии):
+    python -m benchmarks.suite compare baseline.json results.json --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import (
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from benchmarks import synthetic
+from hotel_management.database import DatabaseManager
+from hotel_management.guest import Guest
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+from hotel_management.reports import build_report
+from hotel_management.statistics import HotelStatistics
+
+# Построчная запись коммитит каждую строку, поэтому ограничена отдельно
+SINGLE_ROW_LIMIT = 1000
+QUERY_COUNT = 1000
+DEFAULT_THRESHOLD = 0.10
+
+
+class Hotel(NamedTuple):
+    """Синтетический отель: исходные записи и заполненная БД"""
+
+    rooms: List[dict]
+    guests: List[dict]
+    reservations: List[dict]
+    db_path: str
+    tmp: str
+
+
+# Замер: генератор (hotel) -> (число обработанных элементов, измеряемая
+# функция), превращаемый в контекстный менеджер: после yield замер
+# закрывает свои соединения и временные файлы. Подготовка внутри замера
+# не входит во время.
+Case = Callable[[Hotel], ContextManager[Tuple[int, Callable[[], object]]]]
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str):
+    def register(func) -> Case:
+        CASES[name] = contextmanager(func)
+        return CASES[name]
+
+    return register
+
+
+def parse_size(value: str) -> int:
+    """Размер вида 1000, 10k или 1m"""
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    if multiplier != 1:
+        value = value[:-1]
+    return int(float(value) * multiplier)
+
+
+@contextmanager
+def _fresh_db(hotel: Hotel) -> Iterator[DatabaseManager]:
+    """Пустая БД во временном каталоге, удаляемом после замера"""
+    with tempfile.TemporaryDirectory(dir=hotel.tmp) as tmp:
+        with DatabaseManager(os.path.join(tmp, "hotel.db")) as db:
+            yield db
+
+
+def _rooms(hotel: Hotel) -> List[Room]:
+    return [
+        Room(r["id"], r["number"], r["room_type"], r["price_per_night"], r["capacity"])
+        for r in hotel.rooms
+    ]
+
+
+def _guests(hotel: Hotel) -> List[Guest]:
+    return [
+        Guest(g["id"], g["name"], g["email"], g["phone"], g["passport"])
+        for g in hotel.guests
+    ]
+
+
+def _reservations(hotel: Hotel) -> List[Reservation]:
+    parse = datetime.fromisoformat
+    return [
+        Reservation(
+            r["id"],
+            r["guest_id"],
+            r["room_id"],
+            parse(r["check_in_date"]),
+            parse(r["check_out_date"]),
+            r["num_guests"],
+        )
+        for r in hotel.reservations
+    ]
+
+
+# Сущности
+
+
+@case("entities.room_create")
+def _bench_entities_room_create(hotel):
+    yield len(hotel.rooms), lambda: _rooms(hotel)
+
+
+@case("entities.guest_create")
+def _bench_entities_guest_create(hotel):
+    yield len(hotel.guests), lambda: _guests(hotel)
+
+
+@case("entities.reservation_create")
+def _bench_entities_reservation_create(hotel):
+    yield len(hotel.reservations), lambda: _reservations(hotel)
+
+
+@case("entities.room_validate")
+def _bench_entities_room_validate(hotel):
+    rooms = _rooms(hotel)
+    yield len(rooms), lambda: [room.validate() for room in rooms]
+
+
+@case("entities.guest_validate")
+def _bench_entities_guest_validate(hotel):
+    guests = _guests(hotel)
+    yield len(guests), lambda: [guest.validate() for guest in guests]
+
+
+@case("entities.reservation_validate")
+def _bench_entities_reservation_validate(hotel):
+    reservations = _reservations(hotel)
+    yield len(reservations), lambda: [r.validate() for r in reservations]
+
+
+# Запись в БД
+
+
+def _save_each(hotel: Hotel, records: List[dict], method: str):
+    records = records[:SINGLE_ROW_LIMIT]
+    with _fresh_db(hotel) as db:
+        save = getattr(db, method)
+        yield len(records), lambda: [save(record) for record in records]
+
+
+@case("db.save_room")
+def _bench_db_save_room(hotel):
+    yield from _save_each(hotel, hotel.rooms, "save_room")
+
+
+@case("db.save_guest")
+def _bench_db_save_guest(hotel):
+    yield from _save_each(hotel, hotel.guests, "save_guest")
+
+
+@case("db.save_reservation")
+def _bench_db_save_reservation(hotel):
+    yield from _save_each(hotel, hotel.reservations, "save_reservation")
+
+
+@case("db.save_rooms_many")
+def _bench_db_save_rooms_many(hotel):
+    with _fresh_db(hotel) as db:
+        yield len(hotel.rooms), lambda: db.save_rooms_many(hotel.rooms)
+
+
+@case("db.save_guests_many")
+def _bench_db_save_guests_many(hotel):
+    with _fresh_db(hotel) as db:
+        yield len(hotel.guests), lambda: db.save_guests_many(hotel.guests)
+
+
+@case("db.save_reservations_many")
+def _bench_db_save_reservations_many(hotel):
+    with _fresh_db(hotel) as db:
+        yield len(hotel.reservations), lambda: db.save_reservations_many(
+            hotel.reservations
+        )
+
+
+@case("db.update_reservation_costs")
+def _bench_db_update_reservation_costs(hotel):
+    with DatabaseManager(hotel.db_path) as db:
+        costs = [(r["total_cost"], r["id"]) for r in hotel.reservations]
+        yield len(costs), lambda: db.update_reservation_costs(costs)
+
+
+# Чтение из БД
+
+
+@case("db.get_all_rooms")
+def _bench_db_get_all_rooms(hotel):
+    with DatabaseManager(hotel.db_path) as db:
+        yield len(hotel.rooms), db.get_all_rooms
+
+
+@case("db.get_all_reservations")
+def _bench_db_get_all_reservations(hotel):
+    with DatabaseManager(hotel.db_path) as db:
+        yield len(hotel.reservations), db.get_all_reservations
+
+
+@case("db.iter_guests_entity")
+def _bench_db_iter_guests_entity(hotel):
+    with DatabaseManager(hotel.db_path) as db:
+        yield len(hotel.guests), lambda: list(db.iter_guests(row_format="entity"))
+
+
+@case("db.iter_reservations_entity")
+def _bench_db_iter_reservations_entity(hotel):
+    with DatabaseManager(hotel.db_path) as db:
+        yield len(hotel.reservations), lambda: list(
+            db.iter_reservations(row_format="entity")
+        )
+
+
+@case("db.get_room_reservations")
+def _bench_db_get_room_reservations(hotel):
+    with DatabaseManager(hotel.db_path) as db:
+        queries = [
+            (r["room_id"], r["check_in_date"], r["check_out_date"])
+            for r in hotel.reservations[:QUERY_COUNT]
+        ]
+        yield len(queries), lambda: [db.get_room_reservations(*q) for q in queries]
+
+
+@case("db.get_guest_active_reservations")
+def _bench_db_get_guest_active_reservations(hotel):
+    with DatabaseManager(hotel.db_path) as db:
+        guest_ids = [g["id"] for g in hotel.guests[:QUERY_COUNT]]
+        yield len(guest_ids), lambda: [
+            db.get_guest_active_reservations(guest_id) for guest_id in guest_ids
+        ]
+
+
+@case("db.get_rooms_page")
+def _bench_db_get_rooms_page(hotel):
+    with DatabaseManager(hotel.db_path) as db:
+
+        def walk():
+            after_id = 0
+            while True:
+                page = db.get_rooms_page(after_id)
+                if not page:
+                    return
+                after_id = page[-1][0]
+
+        yield len(hotel.rooms), walk
+
+
+# Статистика и экспорт
+
+
+@case("statistics.from_database")
+def _bench_statistics_from_database(hotel):
+    with DatabaseManager(hotel.db_path) as db:
+        yield len(hotel.reservations), lambda: HotelStatistics.from_database(db)
+
+
+@case("statistics.recompute")
+def _bench_statistics_recompute(hotel):
+    rooms, guests, reservations = _rooms(hotel), _guests(hotel), _reservations(hotel)
+
+    def recompute():
+        # Прежний show_statistics
+        return (
+            len(rooms),
+            len([r for r in rooms if r.is_available]),
+            len(guests),
+            len([r for r in reservations if r.status == "active"]),
+            sum(r.total_cost for r in reservations),
+        )
+
+    yield len(reservations), recompute
+
+
+@case("reports.build")
+def _bench_reports_build(hotel):
+    yield len(hotel.reservations), lambda: build_report(hotel.db_path, workers=1)
+
+
+@case("export.xlsx")
+def _bench_export_xlsx(hotel):
+    try:
+        from hotel_management.export import export_to_xlsx
+    except ImportError:
+        yield 0, None
+        return
+    with DatabaseManager(hotel.db_path) as db:
+        path = os.path.join(hotel.tmp, "export.xlsx")
+        yield len(hotel.rooms) + len(hotel.reservations), lambda: export_to_xlsx(
+            db, path
+        )
+
+
+def build_hotel(tmp: str, rooms: int, guests: int, reservations: int) -> Hotel:
+    hotel = Hotel(
+        list(synthetic.rooms(rooms)),
+        list(synthetic.guests(guests)),
+        list(synthetic.reservations(reservations, rooms, guests)),
+        os.path.join(tmp, "hotel.db"),
+        tmp,
+    )
+    with DatabaseManager(hotel.db_path) as db:
+        db.save_rooms_many(hotel.rooms)
+        db.save_guests_many(hotel.guests)
+        db.save_reservations_many(hotel.reservations)
+    return hotel
+
+
+def measure(hotel: Hotel, name: str, repeat: int, memory: bool) -> Optional[dict]:
+    """Время каждого повтора с новой подготовкой; память - отдельным прогоном"""
+    timings = []
+    items = 0
+    for _ in range(repeat):
+        with CASES[name](hotel) as (items, func):
+            if func is None:
+                return None
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+    best = min(timings)
+    result = {
+        "items": items,
+        "min": best,
+        "median": statistics.median(timings),
+        "rate": items / best if best else None,
+    }
+    if memory:
+        with CASES[name](hotel) as (_, func):
+            tracemalloc.start()
+            func()
+            result["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+    return result
+
+
+def run(args) -> dict:
+    names = [name for name in CASES if not args.filter or args.filter in name]
+    rooms = args.rooms or args.size
+    guests = args.guests or args.size
+    reservations = args.reservations or args.size
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "rooms": rooms,
+            "guests": guests,
+            "reservations": reservations,
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        hotel = build_hotel(tmp, rooms, guests, reservations)
+        print(f"Синтетический отель: {time.perf_counter() - started:.2f} с")
+        for name in names:
+            result = measure(hotel, name, args.repeat, args.memory)
+            if result is None:
+                print(f"{name:<36} пропущен")
+                continue
+            report["results"][name] = result
+            rate = f"{result['rate']:14,.0f} эл/с" if result["rate"] else ""
+            print(f"{name:<36} {result['min'] * 1000:10.2f} мс {rate}")
+    return report
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Имена замеров, ставших медленнее базового больше чем на threshold"""
+    regressions = []
+    base_results, results = baseline["results"], current["results"]
+    for name in sorted(set(base_results) | set(results)):
+        if name not in results or name not in base_results:
+            where = "нет в текущем" if name not in results else "нет в базовом"
+            print(f"{name:<36} {where}")
+            continue
+        ratio = results[name]["min"] / base_results[name]["min"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  РЕГРЕССИЯ"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  быстрее"
+        print(f"{name:<36} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="выполнить замеры")
+    run_parser.add_argument("--size", type=parse_size, default=parse_size("10k"))
+    run_parser.add_argument("--rooms", type=parse_size)
+    run_parser.add_argument("--guests", type=parse_size)
+    run_parser.add_argument("--reservations", type=parse_size)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--filter", help="только замеры с этой подстрокой")
+    run_parser.add_argument("--memory", action="store_true", help="пик tracemalloc")
+    run_parser.add_argument("--out", help="файл для JSON-результатов")
+    run_parser.add_argument("--baseline", help="сразу сравнить с базовым JSON")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    compare_parser = commands.add_parser("compare", help="сравнить два JSON")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        current = run(args)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(current, f, ensure_ascii=False, indent=2)
+        if not args.baseline:
+            return 0
+        baseline = _load(args.baseline)
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"Регрессий: {len(regressions)} (порог {args.threshold:.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Генераторы синтетических данных отеля для бенчмарков"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from hotel_management.room import Room
+
+START = datetime(2022, 1, 1)
+CREATED_AT = START.isoformat()
+
+
+def rooms(count: int) -> Iterator[dict]:
+    for i in range(1, count + 1):
+        room_type = Room.ROOM_TYPES[i % len(Room.ROOM_TYPES)]
+        yield {
+            "id": i,
+            "number": i,
+            "room_type": room_type,
+            "price_per_night": 50.0 + 25.0 * (i % 8),
+            "capacity": 1 + i % 4,
+            "is_available": True,
+            "created_at": CREATED_AT,
+        }
+
+
+def guests(count: int) -> Iterator[dict]:
+    for i in range(1, count + 1):
+        yield {
+            "id": i,
+            "name": f"Guest {i}",
+            "email": f"guest{i}@example.com",
+            "phone": f"+7900{i:07d}",
+            "passport": f"PP{i:08d}",
+            "created_at": CREATED_AT,
+        }
+
+
+def reservations(
+    count: int, room_count: int, guest_count: int, seed: int = 1
+) -> Iterator[dict]:
+    """Непересекающиеся бронирования, равномерно распределенные по номерам"""
+    rng = random.Random(seed)
+    next_free = [START] * room_count
+    for i in range(1, count + 1):
+        room_index = i % room_count
+        check_in = next_free[room_index] + timedelta(days=rng.randrange(0, 3))
+        nights = rng.randrange(1, 7)
+        check_out = check_in + timedelta(days=nights)
+        next_free[room_index] = check_out
+        status = "cancelled" if i % 17 == 0 else "active"
+        yield {
+            "id": i,
+            "guest_id": 1 + i % guest_count,
+            "room_id": room_index + 1,
+            "check_in_date": check_in.isoformat(),
+            "check_out_date": check_out.isoformat(),
+            "num_guests": 1,
+            "total_cost": 100.0 * nights,
+            "status": status,
+            "created_at": CREATED_AT,
+        }
+
+
+def populate(db, room_count: int, guest_count: int, reservation_count: int):
+    """Заполнение БД синтетическим отелем"""
+    db.save_rooms_many(rooms(room_count))
+    db.save_guests_many(guests(guest_count))
+    db.save_reservations_many(reservations(reservation_count, room_count, guest_count))
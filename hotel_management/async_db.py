@@ -0,0 +1,241 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from .database import DatabaseManager
+
+# Методы DatabaseManager, доступные как корутины
+WRITE_METHODS = (
+    "save_room",
+    "save_guest",
+    "save_reservation",
+    "book_if_free",
+    "save_rooms_many",
+    "save_guests_many",
+    "save_reservations_many",
+    "update_reservation_costs",
+    "set_reservation_status",
+    "save_import_checkpoint",
+    "delete_import_checkpoint",
+)
+READ_METHODS = (
+    "get_all_rooms",
+    "get_all_reservations",
+    "get_room_reservations",
+    "get_guest_active_reservations",
+    "get_reservations_by_status",
+    "get_import_checkpoint",
+    "get_max_ids",
+    "get_id_bounds",
+    "get_row_counts",
+    "get_id_at",
+    "get_statistics_aggregates",
+    "get_rooms_page",
+    "get_guests_page",
+    "get_reservations_page",
+    "get_reservations_page_by_status",
+)
+
+DEFAULT_READERS = 4
+DEFAULT_MAX_PENDING = 1000
+DEFAULT_MAX_BATCH = 500
+
+# Сигнал остановки потока записи
+_STOP = object()
+
+
+class AsyncDatabaseManager:
+    """Асинхронный фасад DatabaseManager для приложений на asyncio
+
+    Все записи выполняет один поток со своим соединением: накопившиеся
+    в очереди операции объединяются в одну транзакцию (group commit),
+    каждая - в своей точке сохранения, так что ошибка одной записи не
+    отменяет остальные. Чтения идут через пул потоков с соединениями
+    только для чтения. В очереди записи не больше max_pending операций,
+    остальные корутины ждут свободного места. Экземпляр используется из
+    одного цикла событий.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "hotel.db",
+        readers: int = DEFAULT_READERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ):
+        if readers <= 0:
+            raise ValueError("Количество читателей должно быть положительным")
+        if max_pending <= 0 or max_batch <= 0:
+            raise ValueError("Размер очереди и пачки должен быть положительным")
+        self.db_path = db_path
+        self.max_batch = max_batch
+        # Схема создается здесь; соединение потока записи откроется в нем самом
+        self._writer_db = DatabaseManager(db_path)
+        self._writer_db.close()
+        self._reader_db = DatabaseManager(db_path, read_only=True)
+        self._readers = ThreadPoolExecutor(readers, thread_name_prefix="db-reader")
+        self._slots = asyncio.Semaphore(max_pending)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="db-writer", daemon=True
+        )
+        self._writer.start()
+        self._closed = False
+        self.writes = 0
+        self.commits = 0
+
+    async def __aenter__(self) -> "AsyncDatabaseManager":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def write(self, func: Callable, *args):
+        """Выполнение func(db, *args) в потоке записи в составе group commit"""
+        if self._closed:
+            raise ValueError("Менеджер базы данных закрыт")
+        await self._slots.acquire()
+        if self._closed:
+            # Менеджер закрыли, пока корутина ждала места в очереди:
+            # место передается следующей ждущей, чтобы и она завершилась
+            self._slots.release()
+            raise ValueError("Менеджер базы данных закрыт")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((loop, future, func, args))
+        return await future
+
+    async def read(self, func: Callable, *args):
+        """Выполнение func(db, *args) в пуле читателей"""
+        if self._closed:
+            raise ValueError("Менеджер базы данных закрыт")
+        return await asyncio.get_running_loop().run_in_executor(
+            self._readers, func, self._reader_db, *args
+        )
+
+    def _next_batch(self) -> Optional[list]:
+        """Ожидание первой записи и добор уже поставленных в очередь"""
+        item = self._queue.get()
+        if item is _STOP:
+            return None
+        batch = [item]
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Остановка после записи уже принятых операций
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _write_loop(self):
+        db = self._writer_db
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                outcomes = self._commit(db, batch)
+                self.writes += len(batch)
+                self.commits += 1
+                loop = batch[0][0]
+                loop.call_soon_threadsafe(self._resolve, outcomes)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _commit(db: DatabaseManager, batch: list) -> List[tuple]:
+        """Запись пачки одной транзакцией, результат каждой операции"""
+        outcomes = []
+        try:
+            with db.transaction(immediate=True) as conn:
+                for loop, future, func, args in batch:
+                    conn.execute("SAVEPOINT write")
+                    try:
+                        result = func(db, *args)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO write")
+                        outcomes.append((loop, future, None, e))
+                    else:
+                        outcomes.append((loop, future, result, None))
+                    conn.execute("RELEASE write")
+        except Exception as e:
+            # Транзакция не зафиксирована: ошибка у всех операций пачки
+            return [(loop, future, None, e) for loop, future, _, _ in batch]
+        return outcomes
+
+    def _resolve(self, outcomes: List[tuple]):
+        """Передача результатов корутинам (в потоке цикла событий)"""
+        for _, future, result, error in outcomes:
+            self._slots.release()
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _fail_queued(self):
+        """Ошибка у операций, оставшихся в очереди после остановки записи"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is _STOP:
+                continue
+            _, future, _, _ = item
+            self._slots.release()
+            if not future.done():
+                future.set_exception(ValueError("Менеджер базы данных закрыт"))
+
+    async def close(self):
+        """Запись принятых операций и закрытие соединений
+
+        Корутины, ждущие места в очереди, и операции, не записанные
+        потоком записи (например, после его сбоя), завершаются ошибкой.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._writer.join)
+        self._fail_queued()
+        # Будит первую ждущую место корутину, та передает место дальше
+        self._slots.release()
+        self._readers.shutdown()
+        self._reader_db.close()
+
+
+def _write_method(name: str):
+    method = getattr(DatabaseManager, name)
+
+    async def call(self, *args):
+        return await self.write(method, *args)
+
+    call.__name__ = name
+    call.__doc__ = f"Асинхронный DatabaseManager.{name}"
+    return call
+
+
+def _read_method(name: str):
+    method = getattr(DatabaseManager, name)
+
+    async def call(self, *args):
+        return await self.read(method, *args)
+
+    call.__name__ = name
+    call.__doc__ = f"Асинхронный DatabaseManager.{name}"
+    return call
+
+
+for _name in WRITE_METHODS:
+    setattr(AsyncDatabaseManager, _name, _write_method(_name))
+for _name in READ_METHODS:
+    setattr(AsyncDatabaseManager, _name, _read_method(_name))
@@ -0,0 +1,385 @@
+import random
+from bisect import bisect_left
+from datetime import date, datetime
+from itertools import accumulate, repeat
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from .database import DatabaseManager
+from .reservation import Reservation
+from .room import Room
+
+DayLike = Union[datetime, date, str, int]
+
+
+def to_day(value: DayLike) -> int:
+    """Приведение даты к порядковому номеру дня (date.toordinal)"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10]).toordinal()
+    return value.toordinal()
+
+
+class _Node:
+    """Узел дерева интервалов"""
+
+    __slots__ = ("start", "end", "key", "max_end", "priority", "left", "right")
+
+    def __init__(self, start: int, end: int, key, priority: float):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.max_end = end
+        self.priority = priority
+        self.left = None
+        self.right = None
+
+    def order(self) -> tuple:
+        return (self.start, self.end, self.key)
+
+    def update(self):
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+def _rotate_right(node: _Node) -> _Node:
+    top = node.left
+    node.left = top.right
+    top.right = node
+    node.update()
+    top.update()
+    return top
+
+
+def _rotate_left(node: _Node) -> _Node:
+    top = node.right
+    node.right = top.left
+    top.left = node
+    node.update()
+    top.update()
+    return top
+
+
+def _insert(node: Optional[_Node], new: _Node) -> _Node:
+    if node is None:
+        return new
+    if new.order() < node.order():
+        node.left = _insert(node.left, new)
+        if node.left.priority > node.priority:
+            return _rotate_right(node)
+    else:
+        node.right = _insert(node.right, new)
+        if node.right.priority > node.priority:
+            return _rotate_left(node)
+    node.update()
+    return node
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+def _remove(node: Optional[_Node], order: tuple) -> Tuple[Optional[_Node], bool]:
+    if node is None:
+        return None, False
+    node_order = node.order()
+    if order == node_order:
+        return _merge(node.left, node.right), True
+    if order < node_order:
+        node.left, removed = _remove(node.left, order)
+    else:
+        node.right, removed = _remove(node.right, order)
+    if removed:
+        node.update()
+    return node, removed
+
+
+def _build(intervals: list, lo: int, hi: int) -> Tuple[Optional[_Node], int]:
+    """Сбалансированное дерево из отсортированного списка интервалов
+
+    Приоритет узла больше 1 и растет с высотой поддерева, поэтому
+    последующие вставки (приоритет из [0, 1)) не нарушают свойство кучи.
+    """
+    if lo >= hi:
+        return None, 0
+    mid = (lo + hi) // 2
+    start, end, key = intervals[mid]
+    left, left_height = _build(intervals, lo, mid)
+    right, right_height = _build(intervals, mid + 1, hi)
+    height = max(left_height, right_height) + 1
+    node = _Node(start, end, key, 1.0 + height)
+    node.left = left
+    node.right = right
+    node.update()
+    return node, height
+
+
+class IntervalTree:
+    """Дерево полуоткрытых интервалов [start, end) с поиском пересечений
+
+    Декартово дерево по (start, end, key), в каждом узле хранится
+    максимальный конец интервала в поддереве. Вставка, удаление и
+    проверка пересечения выполняются за O(log n). Дерево из from_sorted()
+    до первого изменения отвечает на запросы по упорядоченным массивам.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, object]] = ()):
+        ordered = sorted(intervals)
+        self._root, _ = _build(ordered, 0, len(ordered))
+        self._size = len(ordered)
+        self._random: Optional[random.Random] = None
+        # (начала, концы, ключи, префиксные максимумы концов) до первого изменения
+        self._frozen: Optional[tuple] = None
+
+    @classmethod
+    def from_sorted(
+        cls,
+        starts: Sequence[int],
+        ends: Sequence[int],
+        keys: Sequence,
+        max_ends: Optional[Sequence[int]] = None,
+    ) -> "IntervalTree":
+        """Дерево из интервалов, уже упорядоченных по (start, end, key)
+
+        Узлы не создаются: запросы идут бинарным поиском по массивам,
+        а дерево строится при первом добавлении или удалении. max_ends -
+        максимумы концов префиксов (вычисляются, если не заданы).
+        """
+        tree = cls()
+        if max_ends is None:
+            max_ends = list(accumulate(ends, max))
+        tree._frozen = (starts, ends, keys, max_ends)
+        tree._size = len(keys)
+        return tree
+
+    def _thaw(self) -> None:
+        """Построение узлов из массивов from_sorted()"""
+        if self._frozen is not None:
+            starts, ends, keys, _ = self._frozen
+            self._frozen = None
+            self._root, _ = _build(list(zip(starts, ends, keys)), 0, self._size)
+
+    def add(self, start: int, end: int, key) -> None:
+        """Добавление интервала"""
+        if end <= start:
+            raise ValueError("Конец интервала должен быть больше начала")
+        self._thaw()
+        if self._random is None:
+            self._random = random.Random()
+        node = _Node(start, end, key, self._random.random())
+        self._root = _insert(self._root, node)
+        self._size += 1
+
+    def remove(self, start: int, end: int, key) -> bool:
+        """Удаление интервала, возвращает True если он был найден"""
+        self._thaw()
+        self._root, removed = _remove(self._root, (start, end, key))
+        if removed:
+            self._size -= 1
+        return removed
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """Есть ли интервал, пересекающийся с [start, end)"""
+        if self._frozen is not None:
+            # Среди интервалов с началом до end ищется конец после start
+            starts, _, _, max_ends = self._frozen
+            count = bisect_left(starts, end)
+            return count > 0 and max_ends[count - 1] > start
+        node = self._root
+        while node is not None:
+            if node.start < end and node.end > start:
+                return True
+            if node.left is not None and node.left.max_end > start:
+                node = node.left
+            elif node.start >= end:
+                return False
+            else:
+                node = node.right
+        return False
+
+    def find_overlapping(self, start: int, end: int) -> List:
+        """Ключи всех интервалов, пересекающихся с [start, end)"""
+        found = []
+        if self._frozen is not None:
+            starts, ends, keys, max_ends = self._frozen
+            for i in range(bisect_left(starts, end) - 1, -1, -1):
+                if max_ends[i] <= start:
+                    break
+                if ends[i] > start:
+                    found.append(keys[i])
+            return found
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= start:
+                continue
+            if node.start < end:
+                if node.end > start:
+                    found.append(node.key)
+                stack.append(node.right)
+            stack.append(node.left)
+        return found
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class AvailabilityEngine:
+    """Проверка занятости номеров по датам
+
+    Для каждого номера хранится дерево интервалов его бронирований.
+    Отмененные бронирования не учитываются.
+    """
+
+    def __init__(self):
+        self._trees: Dict[int, IntervalTree] = {}
+        self._rooms_by_type: Dict[str, Set[int]] = {}
+        self._bookings: Dict[int, Tuple[int, int, int]] = {}
+        # Интервалы from_intervals(): в _bookings попадают при первом изменении
+        self._pending: Optional[Dict[int, tuple]] = None
+
+    @classmethod
+    def from_database(
+        cls, db: DatabaseManager, since: Optional[DayLike] = None
+    ) -> "AvailabilityEngine":
+        """Построение индекса по таблицам rooms и reservations
+
+        При заданном since бронирования, закончившиеся до этой даты,
+        не загружаются: на будущую занятость они не влияют.
+        """
+        rooms = [(room_id, room_type) for room_id, _, room_type, *_ in db.iter_rooms()]
+        intervals: Dict[int, list] = {}
+        for row in db.iter_active_reservations(since):
+            reservation_id, _, room_id, check_in, check_out, *_ = row
+            start, end = to_day(check_in), to_day(check_out)
+            if end <= start:
+                continue
+            intervals.setdefault(room_id, []).append((start, end, reservation_id))
+        return cls.from_intervals(
+            rooms,
+            {
+                room_id: tuple(zip(*sorted(room_intervals)))
+                for room_id, room_intervals in intervals.items()
+            },
+        )
+
+    @classmethod
+    def from_intervals(
+        cls,
+        rooms: Iterable[Tuple[int, str]],
+        intervals: Dict[int, Tuple[Sequence[int], ...]],
+    ) -> "AvailabilityEngine":
+        """Индекс из готовых интервалов бронирований по номерам
+
+        Для каждого номера - (начала, концы, id бронирований) в днях,
+        упорядоченные по (начало, конец, id), и, возможно, максимумы
+        концов префиксов. Деревья строятся при первом изменении номера
+        (см. IntervalTree.from_sorted).
+        """
+        engine = cls()
+        for room_id, columns in intervals.items():
+            engine._trees[room_id] = IntervalTree.from_sorted(*columns)
+        for room_id, room_type in rooms:
+            engine.add_room(room_id, room_type)
+        engine._pending = intervals
+        return engine
+
+    def _booking_map(self) -> Dict[int, Tuple[int, int, int]]:
+        """Бронирования по id: (номер, начало, конец)"""
+        if self._pending is not None:
+            for room_id, (starts, ends, keys, *_) in self._pending.items():
+                self._bookings.update(zip(keys, zip(repeat(room_id), starts, ends)))
+            self._pending = None
+        return self._bookings
+
+    def add_room(self, room: Union[Room, int], room_type: Optional[str] = None):
+        """Регистрация номера (объект Room или id и тип)"""
+        if isinstance(room, Room):
+            room, room_type = room.id, room.room_type
+        if room not in self._trees:
+            self._trees[room] = IntervalTree()
+        self._rooms_by_type.setdefault(room_type, set()).add(room)
+
+    def remove_room(self, room_id: int) -> None:
+        """Удаление номера без бронирований из индекса"""
+        tree = self._trees.get(room_id)
+        if tree is not None and len(tree):
+            raise ValueError("У номера есть бронирования")
+        self._trees.pop(room_id, None)
+        for room_ids in self._rooms_by_type.values():
+            room_ids.discard(room_id)
+
+    def add_reservation(self, reservation: Reservation) -> None:
+        """Учет нового бронирования"""
+        if reservation.status == "cancelled":
+            return
+        self.add_booking(
+            reservation.id,
+            reservation.room_id,
+            reservation.check_in_date,
+            reservation.check_out_date,
+        )
+
+    def add_booking(
+        self, reservation_id: int, room_id: int, check_in: DayLike, check_out: DayLike
+    ) -> None:
+        """Учет бронирования номера на период [check_in, check_out)"""
+        bookings = self._booking_map()
+        if reservation_id in bookings:
+            self.cancel_reservation(reservation_id)
+        start, end = to_day(check_in), to_day(check_out)
+        self._trees.setdefault(room_id, IntervalTree()).add(start, end, reservation_id)
+        bookings[reservation_id] = (room_id, start, end)
+
+    def cancel_reservation(self, reservation_id: int) -> bool:
+        """Освобождение дат отмененного бронирования"""
+        booking = self._booking_map().pop(reservation_id, None)
+        if booking is None:
+            return False
+        room_id, start, end = booking
+        return self._trees[room_id].remove(start, end, reservation_id)
+
+    def is_room_free(self, room_id: int, check_in: DayLike, check_out: DayLike) -> bool:
+        """Свободен ли номер на период [check_in, check_out)"""
+        tree = self._trees.get(room_id)
+        if tree is None:
+            return True
+        return not tree.overlaps(to_day(check_in), to_day(check_out))
+
+    def conflicting_reservations(
+        self, room_id: int, check_in: DayLike, check_out: DayLike
+    ) -> List[int]:
+        """id бронирований номера, пересекающихся с периодом"""
+        tree = self._trees.get(room_id)
+        if tree is None:
+            return []
+        return tree.find_overlapping(to_day(check_in), to_day(check_out))
+
+    def free_rooms(
+        self, check_in: DayLike, check_out: DayLike, room_type: Optional[str] = None
+    ) -> List[int]:
+        """id свободных на период номеров (всех или заданного типа)"""
+        start, end = to_day(check_in), to_day(check_out)
+        if room_type is None:
+            room_ids = self._trees.keys()
+        else:
+            room_ids = self._rooms_by_type.get(room_type, ())
+        return sorted(
+            room_id
+            for room_id in room_ids
+            if not self._trees[room_id].overlaps(start, end)
+        )
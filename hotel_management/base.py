@@ -1,13 +1,69 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import Callable, List, Optional
+
+# Подписчик на изменения: (сущность, поле, старое значение, новое значение)
+Observer = Callable[["BaseEntity", str, object, object], None]
 
 
 class BaseEntity(ABC):
     """Абстрактный базовый класс для всех сущностей отеля"""
 
+    # Атрибуты хранятся в слотах, без __dict__ на каждый объект
+    __slots__ = ("_id", "_created_at", "_observers", "_guards")
+
     def __init__(self, id: int):
         self._id = id
         self._created_at = datetime.now()
+        self._observers: Optional[List[Observer]] = None
+        self._guards: Optional[List[Observer]] = None
+
+    @classmethod
+    def _restore(cls, id: int, created_at):
+        """Создание объекта без вызова __init__ (для восстановления из БД)
+
+        Дата создания берется из сохраненной строки, а не из часов.
+        """
+        entity = cls.__new__(cls)
+        entity._id = id
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        entity._created_at = created_at
+        entity._observers = None
+        entity._guards = None
+        return entity
+
+    def subscribe(self, observer: Observer) -> None:
+        """Подписка на изменения свойств через сеттеры"""
+        if self._observers is None:
+            self._observers = []
+        self._observers.append(observer)
+
+    def unsubscribe(self, observer: Observer) -> None:
+        """Отмена подписки на изменения"""
+        if self._observers is not None and observer in self._observers:
+            self._observers.remove(observer)
+
+    def guard(self, check: Observer) -> None:
+        """Проверка изменения до присваивания: check может отклонить его исключением"""
+        if self._guards is None:
+            self._guards = []
+        self._guards.append(check)
+
+    def unguard(self, check: Observer) -> None:
+        """Отмена проверки изменений"""
+        if self._guards is not None and check in self._guards:
+            self._guards.remove(check)
+
+    def _check(self, field: str, old, new) -> None:
+        """Вызов проверок перед изменением поля"""
+        for check in tuple(self._guards):
+            check(self, field, old, new)
+
+    def _notify(self, field: str, old, new) -> None:
+        """Оповещение подписчиков об изменении поля"""
+        for observer in tuple(self._observers):
+            observer(self, field, old, new)
 
     @property
     def id(self) -> int:
@@ -22,6 +78,17 @@ class BaseEntity(ABC):
         """Преобразование объекта в словарь"""
         pass
 
+    @abstractmethod
+    def to_row(self) -> tuple:
+        """Кортеж значений в порядке столбцов таблицы БД"""
+        pass
+
+    @classmethod
+    @abstractmethod
+    def from_row(cls, row) -> "BaseEntity":
+        """Восстановление объекта из строки таблицы БД"""
+        pass
+
     @abstractmethod
     def validate(self) -> bool:
         """Валидация данных объекта"""
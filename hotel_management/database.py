@@ -1,153 +1,999 @@
+import json
+import random
 import sqlite3
-from datetime import datetime
-from typing import List, Optional
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from itertools import islice
+from time import perf_counter, sleep
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from urllib.request import pathname2url
 
+from .guest import Guest
+from .metrics import METRICS, instrument_class
+from .reservation import Reservation
+from .room import Room
+from .schema import (
+    CHANGE_LOG_TABLES,
+    CHANGE_LOG_TRIGGERS,
+    COMMON_TABLES,
+    IMPORT_REASONS_COLUMN_SQL,
+    INSERT_ROOM_TYPE_SQL,
+    QUERIES,
+    SCHEMA_VERSION,
+    V1_TABLES,
+    V2_TABLES,
+    V2_VIEWS,
+    from_epoch,
+    to_epoch,
+)
 
+# Порядок столбцов совпадает с порядком в таблицах и в from_row()
+ROOM_COLUMNS = (
+    "id",
+    "number",
+    "room_type",
+    "price_per_night",
+    "capacity",
+    "is_available",
+    "created_at",
+)
+GUEST_COLUMNS = ("id", "name", "email", "phone", "passport", "created_at")
+RESERVATION_COLUMNS = (
+    "id",
+    "guest_id",
+    "room_id",
+    "check_in_date",
+    "check_out_date",
+    "num_guests",
+    "total_cost",
+    "status",
+    "created_at",
+)
+
+# Форматы строк для потокового чтения:
+# tuple - кортеж, row - sqlite3.Row, dict - словарь, entity - объект сущности
+ROW_FORMATS = ("tuple", "row", "dict", "entity")
+
+# SQL-запросы вынесены в константы: одинаковый текст запроса позволяет
+# sqlite3 брать уже подготовленный statement из кэша соединения.
+# Запросы схемы v1; через представления v2 они работают и с ней
+INSERT_ROOM_SQL = QUERIES[1]["insert_room"]
+INSERT_GUEST_SQL = QUERIES[1]["insert_guest"]
+INSERT_RESERVATION_SQL = QUERIES[1]["insert_reservation"]
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_PAGE_SIZE = 100
+# Повторы BEGIN IMMEDIATE при занятой БД и начальная пауза между ними, с
+DEFAULT_BUSY_RETRIES = 8
+DEFAULT_BUSY_BACKOFF = 0.005
+MAX_BUSY_BACKOFF = 1.0
+
+DateLike = Union[datetime, date, str]
+
+
+class BookingConflictError(ValueError):
+    """Номер уже занят на выбранные даты"""
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    """Ошибка блокировки БД другим соединением (SQLITE_BUSY/SQLITE_LOCKED)"""
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return "locked" in str(error) or "busy" in str(error)
+
+
+def _to_db_datetime(value: DateLike) -> str:
+    """Приведение даты к формату хранения (ISO-строка datetime)"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return datetime.combine(value, time()).isoformat()
+    return value
+
+
+def _row_params(item, columns: tuple) -> tuple:
+    """Параметры INSERT: to_row() сущности или значения словаря по столбцам"""
+    if isinstance(item, dict):
+        return tuple([item[column] for column in columns])
+    return item.to_row()
+
+
+def _room_params(room) -> tuple:
+    return _row_params(room, ROOM_COLUMNS)
+
+
+def _guest_params(guest) -> tuple:
+    return _row_params(guest, GUEST_COLUMNS)
+
+
+def _reservation_params(reservation) -> tuple:
+    return _row_params(reservation, RESERVATION_COLUMNS)
+
+
+# Параметры INSERT схемы v2: даты в секундах эпохи
+def _room_params_v2(room) -> tuple:
+    params = _room_params(room)
+    return params[:5] + (int(params[5]), to_epoch(params[6]))
+
+
+def _guest_params_v2(guest) -> tuple:
+    params = _guest_params(guest)
+    return params[:5] + (to_epoch(params[5]),)
+
+
+def _reservation_params_v2(reservation) -> tuple:
+    params = _reservation_params(reservation)
+    return (
+        params[:3]
+        + (to_epoch(params[3]), to_epoch(params[4]))
+        + params[5:8]
+        + (to_epoch(params[8]),)
+    )
+
+
+# Строки выборок схемы v2: даты из секунд эпохи в ISO-строки
+def _decode_room(row: tuple) -> tuple:
+    id, number, room_type, price, capacity, is_available, created_at = row
+    return (
+        id,
+        number,
+        room_type,
+        price,
+        capacity,
+        is_available,
+        from_epoch(created_at),
+    )
+
+
+def _decode_guest(row: tuple) -> tuple:
+    id, name, email, phone, passport, created_at = row
+    return (id, name, email, phone, passport, from_epoch(created_at))
+
+
+def _decode_reservation(row: tuple) -> tuple:
+    id, guest_id, room_id, check_in, check_out, guests, cost, status, created = row
+    return (
+        id,
+        guest_id,
+        room_id,
+        from_epoch(check_in),
+        from_epoch(check_out),
+        guests,
+        cost,
+        status,
+        from_epoch(created),
+    )
+
+
+def _decode_fact(row: tuple) -> tuple:
+    check_in, check_out, total_cost, status, room_type = row
+    return (from_epoch(check_in), from_epoch(check_out), total_cost, status, room_type)
+
+
+DECODERS = {
+    1: dict.fromkeys(("rooms", "guests", "reservations", "facts")),
+    2: {
+        "rooms": _decode_room,
+        "guests": _decode_guest,
+        "reservations": _decode_reservation,
+        "facts": _decode_fact,
+    },
+}
+
+PARAMS = {
+    1: (_room_params, _guest_params, _reservation_params),
+    2: (_room_params_v2, _guest_params_v2, _reservation_params_v2),
+}
+
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    """Версия схемы БД: PRAGMA user_version, 1 для таблиц без версии, 0 для пустой"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version:
+        return version
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rooms'"
+    ).fetchone()
+    return 1 if exists else 0
+
+
+def _one_row(result) -> int:
+    return 1
+
+
+@instrument_class(
+    "db",
+    rows={
+        "save_room": _one_row,
+        "save_guest": _one_row,
+        "save_reservation": _one_row,
+        "book_if_free": _one_row,
+        "update_reservation_costs": int,
+        "set_reservation_status": int,
+        "prune_change_log": int,
+    },
+    # Контекстный менеджер: время вызова не отражает длительность транзакции
+    exclude=("transaction",),
+)
 class DatabaseManager:
-    """Менеджер базы данных для сохранения результатов"""
+    """Менеджер базы данных для сохранения результатов
+
+    Держит по одному долгоживущему соединению на поток вместо открытия
+    нового соединения на каждый вызов. Соединения закрываются через
+    close() или при выходе из блока with. При read_only=True база
+    открывается только на чтение и схема не создается.
 
-    def __init__(self, db_path: str = "hotel.db"):
+    Новая база создается со схемой schema_version (по умолчанию
+    последней); у существующей версия читается из файла, и методы
+    работают с ней одинаково (см. hotel_management.schema).
+    """
+
+    def __init__(
+        self,
+        db_path: str = "hotel.db",
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        cache_size: int = -16000,
+        mmap_size: int = 64 * 1024 * 1024,
+        timeout: float = 30.0,
+        cached_statements: int = 256,
+        read_only: bool = False,
+        schema_version: Optional[int] = None,
+    ):
+        if schema_version is not None and schema_version not in QUERIES:
+            raise ValueError(f"Неизвестная версия схемы: {schema_version}")
         self.db_path = db_path
-        self._init_database()
-
-    def _init_database(self):
-        """Инициализация базы данных и создание таблиц"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            # Таблица комнат
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS rooms (
-                    id INTEGER PRIMARY KEY,
-                    number INTEGER UNIQUE NOT NULL,
-                    room_type TEXT NOT NULL,
-                    price_per_night REAL NOT NULL,
-                    capacity INTEGER NOT NULL,
-                    is_available BOOLEAN NOT NULL,
-                    created_at TEXT NOT NULL
-                )
-            """
+        self.read_only = read_only
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.pragmas = {
+            "journal_mode": journal_mode,
+            "synchronous": synchronous,
+            "cache_size": cache_size,
+            "mmap_size": mmap_size,
+            # Удаление конфликтующих строк при REPLACE запускает триггеры
+            # DELETE (журнал изменений)
+            "recursive_triggers": "ON",
+        }
+        self._local = threading.local()
+        # Соединения по потокам-владельцам: соединения завершившихся
+        # потоков закрываются при следующем открытии
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        # Версия до чтения из файла: транзакции _init_database ее сверяют
+        self.schema_version = 0
+        if read_only:
+            # Режим журнала задает только пишущее соединение
+            self.pragmas["journal_mode"] = None
+            version = _schema_version(self.connection) or SCHEMA_VERSION
+        else:
+            version = self._init_database(schema_version or SCHEMA_VERSION)
+        self._use_schema(version)
+
+    def reload_schema(self) -> int:
+        """Повторное чтение версии схемы из файла (после миграции)"""
+        self._use_schema(_schema_version(self.connection))
+        return self.schema_version
+
+    def _use_schema(self, version: int):
+        """Выбор текста запросов и формата параметров для версии схемы"""
+        if version not in QUERIES:
+            raise ValueError(f"Версия схемы БД {version} не поддерживается")
+        self.schema_version = version
+        self._queries = QUERIES[version]
+        self._decoders = DECODERS[version]
+        (
+            self._room_params,
+            self._guest_params,
+            self._reservation_params,
+        ) = PARAMS[version]
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открытие нового соединения с настройкой PRAGMA"""
+        # isolation_level=None: транзакциями управляем явно через transaction()
+        conn = sqlite3.connect(
+            (
+                f"file:{pathname2url(self.db_path)}?mode=ro"
+                if self.read_only
+                else self.db_path
+            ),
+            timeout=self.timeout,
+            uri=self.read_only,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        for name, value in self.pragmas.items():
+            if value is not None:
+                conn.execute(f"PRAGMA {name}={value}")
+        with self._lock:
+            finished = [thread for thread in self._connections if not thread.is_alive()]
+            stale = [self._connections.pop(thread) for thread in finished]
+            self._connections[threading.current_thread()] = conn
+        for old in stale:
+            old.close()
+        return conn
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Соединение текущего потока (создается при первом обращении)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """Явная транзакция на соединении текущего потока
+
+        Вложенный вызов присоединяется к уже открытой транзакции. В начале
+        транзакции версия схемы сверяется с файлом: после миграции другим
+        процессом запросы переключаются на новую схему.
+        """
+        conn = self.connection
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            self._sync_schema(conn)
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def _sync_schema(self, conn: sqlite3.Connection):
+        """Переход на схему, на которую БД перевели после открытия менеджера
+
+        Запись через представления v1 идет триггерами INSTEAD OF, и
+        lastrowid для таких строк не обновляется, поэтому текст запросов
+        должен соответствовать схеме файла.
+        """
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version and version != self.schema_version:
+            self._use_schema(version)
+
+    def release_thread_connection(self):
+        """Закрытие соединения текущего потока (в конце фоновой задачи)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            if self._connections.get(threading.current_thread()) is conn:
+                del self._connections[threading.current_thread()]
+        conn.close()
+
+    def close(self):
+        """Закрытие всех открытых соединений
+
+        После закрытия менеджер можно использовать снова: соединения
+        будут открыты заново при следующем обращении.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, {}
+            self._local = threading.local()
+        for conn in connections.values():
+            conn.close()
+
+    def __enter__(self) -> "DatabaseManager":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _init_database(self, schema_version: int) -> int:
+        """Создание схемы в новой БД, возвращает версию схемы"""
+        version = _schema_version(self.connection)
+        if version == 0:
+            with self.transaction(immediate=True) as conn:
+                # Схему мог успеть создать другой процесс
+                version = _schema_version(conn)
+                if version == 0:
+                    version = schema_version
+                    self._create_schema(conn, version)
+        with self.transaction() as conn:
+            # Таблицы v1 досоздаются, как и до появления версий
+            for sql in (V1_TABLES if version == 1 else ()) + COMMON_TABLES:
+                conn.execute(sql)
+            columns = {
+                row[1] for row in conn.execute("PRAGMA table_info(import_checkpoints)")
+            }
+            if "reasons" not in columns:
+                conn.execute(IMPORT_REASONS_COLUMN_SQL)
+        return version
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection, version: int):
+        if version == 1:
+            for sql in V1_TABLES:
+                conn.execute(sql)
+            return
+        for sql in V2_TABLES + V2_VIEWS:
+            conn.execute(sql)
+        conn.executemany(INSERT_ROOM_TYPE_SQL, [(name,) for name in Room.ROOM_TYPES])
+        conn.execute(f"PRAGMA user_version = {version}")
+
+    def _add_room_types(self, conn: sqlite3.Connection, params: List[tuple]):
+        """Типы номеров из параметров INSERT в таблицу room_types (схема v2)"""
+        if self.schema_version >= 2:
+            conn.executemany(INSERT_ROOM_TYPE_SQL, {(p[2],) for p in params})
+
+    def save_room(self, room_data) -> int:
+        """Сохранение комнаты (Room или dict) в БД"""
+        with self.transaction() as conn:
+            params = self._room_params(room_data)
+            self._add_room_types(conn, [params])
+            return conn.execute(self._queries["insert_room"], params).lastrowid
+
+    def save_guest(self, guest_data) -> int:
+        """Сохранение гостя (Guest или dict) в БД"""
+        with self.transaction() as conn:
+            return conn.execute(
+                self._queries["insert_guest"], self._guest_params(guest_data)
+            ).lastrowid
+
+    def save_reservation(self, reservation_data) -> int:
+        """Сохранение бронирования (Reservation или dict) в БД"""
+        with self.transaction() as conn:
+            return conn.execute(
+                self._queries["insert_reservation"],
+                self._reservation_params(reservation_data),
+            ).lastrowid
+
+    def book_if_free(
+        self,
+        reservation_data,
+        retries: int = DEFAULT_BUSY_RETRIES,
+        backoff: float = DEFAULT_BUSY_BACKOFF,
+    ) -> int:
+        """Сохранение бронирования, только если номер свободен на его даты
+
+        Проверка пересечений и вставка выполняются в одной короткой
+        транзакции BEGIN IMMEDIATE, поэтому два процесса не забронируют
+        номер дважды. Если БД занята дольше timeout соединения, захват
+        повторяется до retries раз с растущей случайной паузой. Внутри
+        уже открытой транзакции работает в ней (она должна быть начата
+        через transaction(immediate=True)).
+        """
+        conn = self.connection
+        if conn.in_transaction:
+            return self._insert_if_free(conn, reservation_data)
+        started = perf_counter()
+        for attempt in range(retries + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as e:
+                if attempt == retries or not _is_busy(e):
+                    raise
+                delay = min(backoff * 2**attempt, MAX_BUSY_BACKOFF)
+                sleep(delay * random.uniform(0.5, 1.5))
+        if METRICS.enabled:
+            METRICS.record("db.book_if_free.lock_wait", perf_counter() - started)
+        try:
+            self._sync_schema(conn)
+            reservation_id = self._insert_if_free(conn, reservation_data)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        return reservation_id
+
+    def _insert_if_free(self, conn: sqlite3.Connection, reservation_data) -> int:
+        params = self._reservation_params(reservation_data)
+        room_id, check_in, check_out = params[2], params[3], params[4]
+        if check_out <= check_in:
+            raise ValueError("Минимальное время проживания - 1 ночь")
+        if (
+            params[7] != "cancelled"
+            and conn.execute(
+                self._queries["overlap"], (room_id, check_out, check_in)
+            ).fetchone()
+        ):
+            raise BookingConflictError("Номер уже забронирован на эти даты")
+        return conn.execute(self._queries["book_reservation"], params).lastrowid
+
+    def get_double_bookings(self) -> List[Tuple[int, int]]:
+        """Пары пересекающихся активных бронирований одного номера"""
+        return self.connection.execute(self._queries["double_bookings"]).fetchall()
+
+    def _save_many(
+        self,
+        entity: str,
+        items: Iterable,
+        chunk_size: int,
+        prepare: Optional[Callable] = None,
+    ) -> List[int]:
+        """Пакетная запись через executemany в одной транзакции
+
+        Элементы читаются из итератора порциями по chunk_size, поэтому
+        генератор не материализуется целиком. Запрос и формат параметров
+        сущности entity выбираются в транзакции, после сверки схемы.
+        """
+        if chunk_size <= 0:
+            raise ValueError("Размер пачки должен быть положительным")
+        ids = []
+        iterator = iter(items)
+        with self.transaction() as conn:
+            sql = self._queries[f"insert_{entity}"]
+            to_params: Callable[[object], tuple] = getattr(self, f"_{entity}_params")
+            while True:
+                chunk = [to_params(item) for item in islice(iterator, chunk_size)]
+                if not chunk:
+                    break
+                if prepare is not None:
+                    prepare(conn, chunk)
+                with_id = [params for params in chunk if params[0] is not None]
+                conn.executemany(sql, with_id)
+                ids.extend(params[0] for params in with_id)
+                # Строки без id получают его от SQLite, executemany его не вернет
+                for params in chunk:
+                    if params[0] is None:
+                        ids.append(conn.execute(sql, params).lastrowid)
+        return ids
+
+    def save_rooms_many(
+        self, rooms: Iterable, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> List[int]:
+        """Пакетное сохранение комнат (Room или dict), возвращает их id"""
+        return self._save_many("room", rooms, chunk_size, self._add_room_types)
+
+    def save_guests_many(
+        self, guests: Iterable, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> List[int]:
+        """Пакетное сохранение гостей (Guest или dict), возвращает их id"""
+        return self._save_many("guest", guests, chunk_size)
+
+    def save_reservations_many(
+        self,
+        reservations: Iterable,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[int]:
+        """Пакетное сохранение бронирований (Reservation или dict), возвращает их id"""
+        return self._save_many("reservation", reservations, chunk_size)
+
+    def get_import_checkpoint(self, source: str) -> Optional[tuple]:
+        """Сохраненная позиция импорта:
+        (position, records, imported, rejected, {причина: число отказов})"""
+        row = self.connection.execute(
+            "SELECT position, records, imported, rejected, reasons "
+            "FROM import_checkpoints WHERE source = ?",
+            (source,),
+        ).fetchone()
+        if row is None:
+            return None
+        return row[:4] + (json.loads(row[4]),)
+
+    def save_import_checkpoint(
+        self,
+        source: str,
+        position: str,
+        records: int,
+        imported: int,
+        rejected: int,
+        reasons: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Запись позиции импорта (вызывается в транзакции вместе с пачкой)"""
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO import_checkpoints "
+                "(source, position, records, imported, rejected, updated_at, reasons) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    source,
+                    position,
+                    records,
+                    imported,
+                    rejected,
+                    datetime.now().isoformat(),
+                    json.dumps(reasons or {}, ensure_ascii=False),
+                ),
             )
 
-            # Таблица гостей
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS guests (
-                    id INTEGER PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    phone TEXT NOT NULL,
-                    passport TEXT UNIQUE NOT NULL,
-                    created_at TEXT NOT NULL
-                )
-            """
+    def delete_import_checkpoint(self, source: str) -> None:
+        """Удаление позиции завершенного импорта"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM import_checkpoints WHERE source = ?", (source,))
+
+    def enable_change_log(self) -> str:
+        """Включение журнала изменений строк (только схема v2)
+
+        Возвращает токен базы: он создается один раз и отличает базу
+        от других файлов (снимок чужой базы не применяется).
+        """
+        if self.schema_version < 2:
+            raise ValueError("Журнал изменений требует схему БД v2")
+        with self.transaction(immediate=True) as conn:
+            for sql in CHANGE_LOG_TABLES + CHANGE_LOG_TRIGGERS:
+                conn.execute(sql)
+            conn.execute(
+                "INSERT OR IGNORE INTO change_log_state (id, token, pruned) "
+                "VALUES (1, ?, 0)",
+                (uuid.uuid4().hex,),
             )
+            return conn.execute("SELECT token FROM change_log_state").fetchone()[0]
+
+    def get_change_log_state(self) -> Optional[Tuple[str, int, int]]:
+        """(токен, последний удаленный seq, последний seq) журнала изменений
+
+        None, если журнал не включен.
+        """
+        conn = self.connection
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type = 'table' AND name = 'change_log_state'"
+        ).fetchone()
+        if exists is None:
+            return None
+        state = conn.execute("SELECT token, pruned FROM change_log_state").fetchone()
+        if state is None:
+            return None
+        mark = conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'"
+        ).fetchone()
+        return state + (mark[0] if mark else 0,)
+
+    def get_changes(self, after: int) -> Dict[str, Set[int]]:
+        """id строк каждой таблицы, измененных после seq after"""
+        changes: Dict[str, Set[int]] = {
+            table: set() for table in ("rooms", "guests", "reservations")
+        }
+        cursor = self.connection.execute(
+            "SELECT table_name, row_id FROM change_log WHERE seq > ?", (after,)
+        )
+        for table, row_id in cursor:
+            changes[table].add(row_id)
+        return changes
+
+    def prune_change_log(self, mark: int) -> int:
+        """Удаление записей журнала с seq <= mark, возвращает их число"""
+        with self.transaction(immediate=True) as conn:
+            deleted = conn.execute(
+                "DELETE FROM change_log WHERE seq <= ?", (mark,)
+            ).rowcount
+            conn.execute("UPDATE change_log_state SET pruned = max(pruned, ?)", (mark,))
+        return deleted
 
-            # Таблица бронирований
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS reservations (
-                    id INTEGER PRIMARY KEY,
-                    guest_id INTEGER NOT NULL,
-                    room_id INTEGER NOT NULL,
-                    check_in_date TEXT NOT NULL,
-                    check_out_date TEXT NOT NULL,
-                    num_guests INTEGER NOT NULL,
-                    total_cost REAL NOT NULL,
-                    status TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (guest_id) REFERENCES guests (id),
-                    FOREIGN KEY (room_id) REFERENCES rooms (id)
-                )
-            """
+    def update_reservation_costs(
+        self, costs: Iterable[tuple], chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> int:
+        """Пакетное обновление total_cost по парам (total_cost, id)"""
+        if chunk_size <= 0:
+            raise ValueError("Размер пачки должен быть положительным")
+        updated = 0
+        iterator = iter(costs)
+        with self.transaction() as conn:
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                updated += conn.executemany(
+                    self._queries["update_cost"], chunk
+                ).rowcount
+        return updated
+
+    def set_reservation_status(self, reservation_id: int, status: str) -> int:
+        """Смена статуса бронирования, возвращает число измененных строк"""
+        if status not in ("active", "cancelled", "completed"):
+            raise ValueError("Некорректный статус бронирования")
+        with self.transaction() as conn:
+            return conn.execute(
+                self._queries["set_status"], (status, reservation_id)
+            ).rowcount
+
+    def _bound(self, value: Optional[DateLike]):
+        """Граница периода в формате хранения дат (None - без границы)"""
+        if self.schema_version >= 2:
+            return float("-inf") if value is None else to_epoch(value)
+        return "" if value is None else _to_db_datetime(value)
+
+    def _fetch_dicts(
+        self, sql: str, params: tuple = (), decode: Optional[Callable] = None
+    ) -> List[dict]:
+        """Выполнение запроса с результатом в виде списка словарей"""
+        cursor = self.connection.execute(sql, params)
+        columns = [col[0] for col in cursor.description]
+        rows = cursor.fetchall()
+        if decode is not None:
+            rows = map(decode, rows)
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get_all_rooms(self) -> List[Room]:
+        """Получение всех комнат из БД (через Room.from_row)"""
+        return list(
+            self._iter_rows(
+                "rooms", ROOM_COLUMNS, Room, DEFAULT_CHUNK_SIZE, row_format="entity"
             )
+        )
 
-            conn.commit()
-
-    def save_room(self, room_data: dict) -> int:
-        """Сохранение комнаты в БД"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO rooms 
-                (id, number, room_type, price_per_night, capacity, is_available, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    room_data["id"],
-                    room_data["number"],
-                    room_data["room_type"],
-                    room_data["price_per_night"],
-                    room_data["capacity"],
-                    room_data["is_available"],
-                    room_data["created_at"],
-                ),
+    def get_all_reservations(self) -> List[Reservation]:
+        """Получение всех бронирований из БД (через Reservation.from_row)"""
+        return list(
+            self._iter_rows(
+                "reservations",
+                RESERVATION_COLUMNS,
+                Reservation,
+                DEFAULT_CHUNK_SIZE,
+                row_format="entity",
             )
-            conn.commit()
-            return cursor.lastrowid
-
-    def save_guest(self, guest_data: dict) -> int:
-        """Сохранение гостя в БД"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO guests 
-                (id, name, email, phone, passport, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    guest_data["id"],
-                    guest_data["name"],
-                    guest_data["email"],
-                    guest_data["phone"],
-                    guest_data["passport"],
-                    guest_data["created_at"],
-                ),
+        )
+
+    def get_room_reservations(
+        self,
+        room_id: int,
+        start: DateLike,
+        end: DateLike,
+        include_cancelled: bool = False,
+    ) -> List[dict]:
+        """Бронирования номера, пересекающиеся с периодом [start, end)"""
+        return self._fetch_dicts(
+            self._queries["room_reservations"],
+            (room_id, self._bound(end), self._bound(start), include_cancelled),
+            self._decoders["reservations"],
+        )
+
+    def get_guest_active_reservations(self, guest_id: int) -> List[dict]:
+        """Активные бронирования гостя"""
+        return self._fetch_dicts(
+            self._queries["guest_reservations"],
+            (guest_id,),
+            self._decoders["reservations"],
+        )
+
+    def get_reservations_by_status(
+        self, status: str, limit: Optional[int] = None
+    ) -> List[dict]:
+        """Бронирования с заданным статусом"""
+        return self._fetch_dicts(
+            self._queries["reservations_by_status"],
+            (status, -1 if limit is None else limit),
+            self._decoders["reservations"],
+        )
+
+    def get_reservations_page_by_status(
+        self,
+        status: str,
+        after_id: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        since: Optional[DateLike] = None,
+    ) -> List[tuple]:
+        """Страница бронирований со статусом status и выездом после since"""
+        rows = self.connection.execute(
+            self._queries["status_page"],
+            (status, after_id, self._bound(since), limit),
+        ).fetchall()
+        decode = self._decoders["reservations"]
+        return rows if decode is None else [decode(row) for row in rows]
+
+    def _row_converter(self, row_format: str, columns: tuple, entity_cls, decode=None):
+        """Функция преобразования строки курсора в запрошенный формат"""
+        if row_format not in ROW_FORMATS:
+            raise ValueError(
+                f"Формат строк должен быть одним из: {', '.join(ROW_FORMATS)}"
             )
-            conn.commit()
-            return cursor.lastrowid
-
-    def save_reservation(self, reservation_data: dict) -> int:
-        """Сохранение бронирования в БД"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO reservations 
-                (id, guest_id, room_id, check_in_date, check_out_date, 
-                 num_guests, total_cost, status, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    reservation_data["id"],
-                    reservation_data["guest_id"],
-                    reservation_data["room_id"],
-                    reservation_data["check_in_date"],
-                    reservation_data["check_out_date"],
-                    reservation_data["num_guests"],
-                    reservation_data["total_cost"],
-                    reservation_data["status"],
-                    reservation_data["created_at"],
-                ),
+        if row_format == "dict":
+            if decode is not None:
+                return lambda row: dict(zip(columns, decode(row)))
+            return lambda row: dict(zip(columns, row))
+        if row_format == "entity":
+            if decode is not None:
+                return lambda row: entity_cls.from_row(decode(row))
+            return entity_cls.from_row
+        return decode
+
+    def _iter_rows(
+        self,
+        table: str,
+        columns: tuple,
+        entity_cls,
+        batch_size: int,
+        row_format: str,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+    ) -> Iterator:
+        """Потоковое чтение таблицы по возрастанию id порциями fetchmany"""
+        if batch_size <= 0:
+            raise ValueError("Размер порции должен быть положительным")
+        queries, decode = self._queries, self._decoders[table]
+        cursor = self.connection.cursor()
+        if row_format == "row":
+            cursor.row_factory = sqlite3.Row
+            # sqlite3.Row не пересобрать: даты v2 переводит представление
+            queries, decode = QUERIES[1], None
+        convert = self._row_converter(row_format, columns, entity_cls, decode)
+        cursor.execute(
+            queries[f"select_{table}"] + " WHERE t.id > ? ORDER BY t.id LIMIT ?",
+            (after_id, -1 if limit is None else limit),
+        )
+        return self._fetch_batches(cursor, batch_size, convert)
+
+    @staticmethod
+    def _fetch_batches(cursor: sqlite3.Cursor, batch_size: int, convert) -> Iterator:
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if convert is None:
+                    yield from rows
+                else:
+                    yield from map(convert, rows)
+        finally:
+            cursor.close()
+
+    def iter_active_reservations(
+        self, since: Optional[DateLike] = None, batch_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[tuple]:
+        """Потоковый обход неотмененных бронирований с выездом после since"""
+        if batch_size <= 0:
+            raise ValueError("Размер порции должен быть положительным")
+        cursor = self.connection.execute(
+            self._queries["active_reservations"], (self._bound(since),)
+        )
+        return self._fetch_batches(cursor, batch_size, self._decoders["reservations"])
+
+    def get_max_ids(self) -> dict:
+        """Максимальные id в таблицах (0 для пустой таблицы)"""
+        return {
+            table: self.connection.execute(
+                f"SELECT COALESCE(MAX(id), 0) FROM {table}"
+            ).fetchone()[0]
+            for table in ("rooms", "guests", "reservations")
+        }
+
+    def get_id_bounds(self, table: str) -> Tuple[int, int]:
+        """Минимальный и максимальный id в таблице ((0, 0) для пустой)"""
+        if table not in ("rooms", "guests", "reservations"):
+            raise ValueError(f"Неизвестная таблица: {table}")
+        return self.connection.execute(
+            f"SELECT COALESCE(MIN(id), 0), COALESCE(MAX(id), 0) FROM {table}"
+        ).fetchone()
+
+    def iter_reservation_facts(
+        self, first_id: int, last_id: int, batch_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[tuple]:
+        """Бронирования с id в [first_id, last_id] для отчетов
+
+        Строки: (заезд, выезд, total_cost, статус, тип номера).
+        """
+        if batch_size <= 0:
+            raise ValueError("Размер порции должен быть положительным")
+        cursor = self.connection.execute(
+            self._queries["reservation_facts"], (first_id, last_id)
+        )
+        return self._fetch_batches(cursor, batch_size, self._decoders["facts"])
+
+    def get_row_counts(self) -> dict:
+        """Количество строк в таблицах"""
+        return {
+            table: self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[
+                0
+            ]
+            for table in ("rooms", "guests", "reservations")
+        }
+
+    def get_id_at(self, table: str, offset: int) -> Optional[int]:
+        """id строки с номером offset в порядке id (None за концом таблицы)"""
+        if table not in ("rooms", "guests", "reservations"):
+            raise ValueError(f"Неизвестная таблица: {table}")
+        row = self.connection.execute(
+            f"SELECT id FROM {table} ORDER BY id LIMIT 1 OFFSET ?", (offset,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def get_statistics_aggregates(self) -> dict:
+        """Агрегаты для статистики: один проход GROUP BY по каждой таблице
+
+        rooms: (тип, количество, доступных); guests: количество;
+        reservations: (тип номера, месяц заезда YYYY-MM, статус,
+        количество, сумма total_cost).
+        """
+        connection = self.connection
+        rooms = connection.execute(self._queries["room_statistics"]).fetchall()
+        guests = connection.execute("SELECT COUNT(*) FROM guests").fetchone()[0]
+        reservations = connection.execute(
+            self._queries["reservation_statistics"]
+        ).fetchall()
+        return {"rooms": rooms, "guests": guests, "reservations": reservations}
+
+    def iter_rooms(
+        self, batch_size: int = DEFAULT_CHUNK_SIZE, row_format: str = "tuple"
+    ) -> Iterator:
+        """Потоковый обход всех комнат с постоянным расходом памяти"""
+        return self._iter_rows("rooms", ROOM_COLUMNS, Room, batch_size, row_format)
+
+    def iter_guests(
+        self, batch_size: int = DEFAULT_CHUNK_SIZE, row_format: str = "tuple"
+    ) -> Iterator:
+        """Потоковый обход всех гостей с постоянным расходом памяти"""
+        return self._iter_rows("guests", GUEST_COLUMNS, Guest, batch_size, row_format)
+
+    def iter_reservations(
+        self, batch_size: int = DEFAULT_CHUNK_SIZE, row_format: str = "tuple"
+    ) -> Iterator:
+        """Потоковый обход всех бронирований с постоянным расходом памяти"""
+        return self._iter_rows(
+            "reservations", RESERVATION_COLUMNS, Reservation, batch_size, row_format
+        )
+
+    def get_rows(
+        self, table: str, ids: Iterable[int], chunk_size: int = 500
+    ) -> List[tuple]:
+        """Строки таблицы с заданными id (кортежи, как в iter_*) по возрастанию id
+
+        chunk_size - число параметров IN (...) в одном запросе (старые
+        сборки SQLite ограничивают его 999).
+        """
+        if table not in ("rooms", "guests", "reservations"):
+            raise ValueError(f"Неизвестная таблица: {table}")
+        ids = sorted(set(ids))
+        sql, decode = self._queries[f"select_{table}"], self._decoders[table]
+        rows = []
+        for offset in range(0, len(ids), chunk_size):
+            chunk = ids[offset : offset + chunk_size]
+            rows += self.connection.execute(
+                f"{sql} WHERE t.id IN ({', '.join('?' * len(chunk))})", chunk
+            ).fetchall()
+        rows.sort()
+        return rows if decode is None else [decode(row) for row in rows]
+
+    def get_rooms_page(
+        self,
+        after_id: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        row_format: str = "tuple",
+    ) -> list:
+        """Страница комнат с id больше after_id (keyset-пагинация)"""
+        return list(
+            self._iter_rows(
+                "rooms", ROOM_COLUMNS, Room, limit, row_format, after_id, limit
+            )
+        )
+
+    def get_guests_page(
+        self,
+        after_id: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        row_format: str = "tuple",
+    ) -> list:
+        """Страница гостей с id больше after_id (keyset-пагинация)"""
+        return list(
+            self._iter_rows(
+                "guests", GUEST_COLUMNS, Guest, limit, row_format, after_id, limit
+            )
+        )
+
+    def get_reservations_page(
+        self,
+        after_id: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        row_format: str = "tuple",
+    ) -> list:
+        """Страница бронирований с id больше after_id (keyset-пагинация)"""
+        return list(
+            self._iter_rows(
+                "reservations",
+                RESERVATION_COLUMNS,
+                Reservation,
+                limit,
+                row_format,
+                after_id,
+                limit,
             )
-            conn.commit()
-            return cursor.lastrowid
-
-    def get_all_rooms(self) -> List[dict]:
-        """Получение всех комнат из БД"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM rooms")
-            columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-    def get_all_reservations(self) -> List[dict]:
-        """Получение всех бронирований из БД"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM reservations")
-            columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        )
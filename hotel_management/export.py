@@ -0,0 +1,165 @@
+import argparse
+import sqlite3
+import sys
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from openpyxl import Workbook
+
+from .database import DEFAULT_CHUNK_SIZE, DatabaseManager
+
+# Предел строк на листе Excel
+EXCEL_MAX_ROWS = 1_048_576
+
+ROOM_HEADERS = ["ID", "Номер", "Тип", "Цена за ночь", "Вместимость", "Доступен"]
+RESERVATION_HEADERS = [
+    "ID",
+    "ID Гостя",
+    "ID Номера",
+    "Дата заезда",
+    "Дата выезда",
+    "Кол-во гостей",
+    "Общая стоимость",
+    "Статус",
+]
+
+# progress(выгружено строк, всего строк)
+Progress = Callable[[int, int], None]
+
+
+def _room_rows(db: DatabaseManager, batch_size: int) -> Iterator[list]:
+    for id, number, room_type, price, capacity, is_available, _ in db.iter_rooms(
+        batch_size
+    ):
+        yield [id, number, room_type, price, capacity, bool(is_available)]
+
+
+def _reservation_rows(db: DatabaseManager, batch_size: int) -> Iterator[list]:
+    for row in db.iter_reservations(batch_size):
+        id, guest_id, room_id, check_in, check_out, num_guests, cost, status, _ = row
+        # В БД даты лежат в ISO-формате, первые 10 символов - это %Y-%m-%d
+        yield [
+            id,
+            guest_id,
+            room_id,
+            check_in[:10],
+            check_out[:10],
+            num_guests,
+            cost,
+            status,
+        ]
+
+
+class _Counter:
+    """Счетчик выгруженных строк с редким вызовом progress"""
+
+    def __init__(self, total: int, progress: Optional[Progress], every: int):
+        self.total = total
+        self.done = 0
+        self.progress = progress
+        self.every = every
+
+    def step(self):
+        self.done += 1
+        if self.progress is not None and self.done % self.every == 0:
+            self.progress(self.done, self.total)
+
+    def finish(self):
+        if self.progress is not None:
+            self.progress(self.done, self.total)
+
+
+def _write_sheets(
+    workbook: Workbook,
+    title: str,
+    headers: List[str],
+    rows: Iterable[list],
+    max_rows: int,
+    counter: _Counter,
+) -> None:
+    """Запись строк на листы title, title (2), ... не длиннее max_rows"""
+    part = 1
+    sheet = workbook.create_sheet(title)
+    sheet.append(headers)
+    used = 1
+    for row in rows:
+        if used >= max_rows:
+            part += 1
+            sheet = workbook.create_sheet(f"{title} ({part})")
+            sheet.append(headers)
+            used = 1
+        sheet.append(row)
+        used += 1
+        counter.step()
+
+
+def export_to_xlsx(
+    db: DatabaseManager,
+    path: str = "hotel_report.xlsx",
+    progress: Optional[Progress] = None,
+    max_rows: int = EXCEL_MAX_ROWS,
+    batch_size: int = DEFAULT_CHUNK_SIZE,
+    progress_every: int = 10000,
+) -> int:
+    """Потоковая выгрузка номеров и бронирований в XLSX
+
+    Строки читаются курсором порциями и сразу пишутся в книгу в режиме
+    write-only, поэтому расход памяти не зависит от числа строк. Лист,
+    дошедший до max_rows строк, продолжается на следующем. Все чтения
+    идут в одной транзакции, поэтому итог для прогресса и листы отражают
+    одно состояние БД при параллельной записи. Возвращает число
+    выгруженных строк данных.
+    """
+    if max_rows < 2:
+        raise ValueError("На листе должно помещаться хотя бы две строки")
+    workbook = Workbook(write_only=True)
+    with db.transaction():
+        counts = db.get_row_counts()
+        counter = _Counter(
+            counts["rooms"] + counts["reservations"], progress, progress_every
+        )
+        _write_sheets(
+            workbook,
+            "Номера",
+            ROOM_HEADERS,
+            _room_rows(db, batch_size),
+            max_rows,
+            counter,
+        )
+        _write_sheets(
+            workbook,
+            "Бронирования",
+            RESERVATION_HEADERS,
+            _reservation_rows(db, batch_size),
+            max_rows,
+            counter,
+        )
+    workbook.save(path)
+    counter.finish()
+    return counter.done
+
+
+def main(argv: Optional[List[str]] = None):
+    """Выгрузка отчета из командной строки (например, по cron)"""
+    parser = argparse.ArgumentParser(description="Выгрузка отчета отеля в XLSX")
+    parser.add_argument("db_path", nargs="?", default="hotel.db", help="файл БД")
+    parser.add_argument("output", nargs="?", default="hotel_report.xlsx")
+    parser.add_argument("--quiet", action="store_true", help="без вывода прогресса")
+    args = parser.parse_args(argv)
+
+    def report(done: int, total: int):
+        print(f"\rВыгружено {done} из {total}", end="", file=sys.stderr)
+
+    # Только чтение: ошибка в пути не создает пустую базу
+    try:
+        db = DatabaseManager(args.db_path, read_only=True)
+    except sqlite3.OperationalError as e:
+        parser.error(f"Не удалось открыть БД {args.db_path}: {e}")
+    with db:
+        rows = export_to_xlsx(db, args.output, None if args.quiet else report)
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"{rows} строк выгружено в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,68 @@
 import re
+from typing import Callable, Dict, List, Optional
 from .base import BaseEntity
+from .metrics import instrument
+
+# Шаблоны компилируются один раз при импорте модуля
+EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+PHONE_PATTERN = re.compile(r"^\+?[1-9]\d{1,14}$")
+
+
+def check_name(value) -> Optional[str]:
+    """Ошибка в имени или None"""
+    if not isinstance(value, str) or len(value.strip()) == 0:
+        return "Имя не может быть пустым"
+    return None
+
+
+def check_email(value) -> Optional[str]:
+    """Ошибка в email или None"""
+    if not isinstance(value, str) or EMAIL_PATTERN.match(value) is None:
+        return "Некорректный email адрес"
+    return None
+
+
+def check_phone(value) -> Optional[str]:
+    """Ошибка в номере телефона или None"""
+    if not isinstance(value, str) or PHONE_PATTERN.match(value) is None:
+        return "Некорректный номер телефона"
+    return None
+
+
+def check_passport(value) -> Optional[str]:
+    """Ошибка в паспортных данных или None"""
+    if not isinstance(value, str) or len(value) < 5:
+        return "Некорректные паспортные данные"
+    return None
+
+
+# Правила проверки полей гостя, общие для сеттеров и пакетной валидации
+GUEST_RULES: Dict[str, Callable[[object], Optional[str]]] = {
+    "name": check_name,
+    "email": check_email,
+    "phone": check_phone,
+    "passport": check_passport,
+}
+
+
+def guest_errors(record: dict) -> List[str]:
+    """Список ошибок в данных гостя (пустой, если данные корректны)"""
+    errors = []
+    for field, rule in GUEST_RULES.items():
+        if field not in record:
+            errors.append(f"{field}: поле отсутствует")
+            continue
+        error = rule(record[field])
+        if error is not None:
+            errors.append(f"{field}: {error}")
+    return errors
 
 
 class Guest(BaseEntity):
     """Класс для представления гостя отеля"""
 
+    __slots__ = ("_name", "_email", "_phone", "_passport")
+
     def __init__(self, id: int, name: str, email: str, phone: str, passport: str):
         super().__init__(id)
         self._name = name
@@ -18,9 +76,12 @@ class Guest(BaseEntity):
 
     @name.setter
     def name(self, value: str):
-        if not value or len(value.strip()) == 0:
-            raise ValueError("Имя не может быть пустым")
-        self._name = value.strip()
+        error = check_name(value)
+        if error is not None:
+            raise ValueError(error)
+        old, self._name = self._name, value.strip()
+        if self._observers:
+            self._notify("name", old, self._name)
 
     @property
     def email(self) -> str:
@@ -28,9 +89,12 @@ class Guest(BaseEntity):
 
     @email.setter
     def email(self, value: str):
-        if not self._validate_email(value):
-            raise ValueError("Некорректный email адрес")
-        self._email = value
+        error = check_email(value)
+        if error is not None:
+            raise ValueError(error)
+        old, self._email = self._email, value
+        if self._observers:
+            self._notify("email", old, self._email)
 
     @property
     def phone(self) -> str:
@@ -38,9 +102,12 @@ class Guest(BaseEntity):
 
     @phone.setter
     def phone(self, value: str):
-        if not self._validate_phone(value):
-            raise ValueError("Некорректный номер телефона")
-        self._phone = value
+        error = check_phone(value)
+        if error is not None:
+            raise ValueError(error)
+        old, self._phone = self._phone, value
+        if self._observers:
+            self._notify("phone", old, self._phone)
 
     @property
     def passport(self) -> str:
@@ -48,19 +115,12 @@ class Guest(BaseEntity):
 
     @passport.setter
     def passport(self, value: str):
-        if not value or len(value) < 5:
-            raise ValueError("Некорректные паспортные данные")
-        self._passport = value
-
-    def _validate_email(self, email: str) -> bool:
-        """Валидация email адреса"""
-        pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-        return re.match(pattern, email) is not None
-
-    def _validate_phone(self, phone: str) -> bool:
-        """Валидация номера телефона"""
-        pattern = r"^\+?[1-9]\d{1,14}$"
-        return re.match(pattern, phone) is not None
+        error = check_passport(value)
+        if error is not None:
+            raise ValueError(error)
+        old, self._passport = self._passport, value
+        if self._observers:
+            self._notify("passport", old, self._passport)
 
     def to_dict(self) -> dict:
         return {
@@ -72,14 +132,32 @@ class Guest(BaseEntity):
             "created_at": self.created_at.isoformat(),
         }
 
-    def validate(self) -> bool:
+    def to_row(self) -> tuple:
         return (
-            bool(self.name)
-            and self._validate_email(self.email)
-            and self._validate_phone(self.phone)
-            and bool(self.passport)
+            self._id,
+            self._name,
+            self._email,
+            self._phone,
+            self._passport,
+            self._created_at.isoformat(),
         )
 
+    @classmethod
+    def from_row(cls, row) -> "Guest":
+        """Восстановление гостя из строки таблицы guests"""
+        id, name, email, phone, passport, created_at = row
+        guest = cls._restore(id, created_at)
+        guest._name = name
+        guest._email = email
+        guest._phone = phone
+        guest._passport = passport
+        return guest
+
+    @instrument("guest.validate")
+    def validate(self) -> bool:
+        """Проверка по тем же правилам, что и пакетная валидация"""
+        return not guest_errors({field: getattr(self, field) for field in GUEST_RULES})
+
     def __getitem__(self, key: str):
         """Доступ к атрибутам через квадратные скобки"""
         if hasattr(self, key):
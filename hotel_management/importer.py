@@ -0,0 +1,487 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from .base import BaseEntity
+from .database import (
+    GUEST_COLUMNS,
+    RESERVATION_COLUMNS,
+    ROOM_COLUMNS,
+    BookingConflictError,
+    DatabaseManager,
+)
+from .guest import Guest, guest_errors
+from .reservation import Reservation
+from .room import Room
+
+DEFAULT_BATCH_SIZE = 10000
+FORMATS = ("csv", "jsonl")
+
+_REQUIRED = object()
+_TRUE = {"1", "true", "yes", "да"}
+_FALSE = {"0", "false", "no", "нет", ""}
+
+
+def _int(value) -> int:
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError("ожидается целое число")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError("ожидается целое число") from None
+
+
+def _float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError("ожидается число") from None
+
+
+def _bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError("ожидается логическое значение")
+
+
+def _text(value) -> str:
+    if not isinstance(value, str):
+        raise ValueError("ожидается строка")
+    return value
+
+
+@lru_cache(maxsize=4096)
+def _parse_datetime(value: str) -> str:
+    return datetime.fromisoformat(value).isoformat()
+
+
+def _datetime(value) -> str:
+    # Даты в выгрузках часто повторяются, разбор кэшируется
+    try:
+        return _parse_datetime(value)
+    except (TypeError, ValueError):
+        raise ValueError("ожидается дата в формате ISO") from None
+
+
+def _room_errors(room: Room) -> List[str]:
+    # Сеттеры Room содержат правила и тексты ошибок
+    errors = []
+    for field in ("number", "room_type", "price_per_night", "capacity"):
+        try:
+            setattr(room, field, getattr(room, field))
+        except (TypeError, ValueError) as e:
+            errors.append(f"{field}: {e}")
+    return errors
+
+
+def _guest_errors(guest: Guest) -> List[str]:
+    return guest_errors(
+        {
+            "name": guest.name,
+            "email": guest.email,
+            "phone": guest.phone,
+            "passport": guest.passport,
+        }
+    )
+
+
+def _reservation_errors(reservation: Reservation) -> List[str]:
+    errors = []
+    if reservation.guest_id <= 0:
+        errors.append("guest_id: должен быть положительным")
+    if reservation.room_id <= 0:
+        errors.append("room_id: должен быть положительным")
+    if reservation.check_out_date <= reservation.check_in_date:
+        errors.append("check_out_date: Дата выезда должна быть после даты заезда")
+    if reservation.total_cost < 0:
+        errors.append("total_cost: Стоимость не может быть отрицательной")
+    # Проверка даты заезда в прошлом не применяется: импортируется история
+    for field in ("num_guests", "status"):
+        try:
+            setattr(reservation, field, getattr(reservation, field))
+        except ValueError as e:
+            errors.append(f"{field}: {e}")
+    return errors
+
+
+def _save_many(save_many: Callable) -> Callable:
+    """Запись пачки методом save_*_many без отказов на уровне БД"""
+
+    def save(db: DatabaseManager, entities: List[BaseEntity]) -> List[tuple]:
+        save_many(db, entities, chunk_size=len(entities))
+        return []
+
+    return save
+
+
+def _book_reservations(
+    db: DatabaseManager, reservations: List[Reservation]
+) -> List[Tuple[int, str]]:
+    """Запись бронирований через book_if_free в транзакции пачки
+
+    Занятый на эти даты номер и уже существующий id не перезаписывают
+    данные, а возвращаются как (индекс в пачке, причина отказа).
+    """
+    rejected = []
+    for index, reservation in enumerate(reservations):
+        try:
+            db.book_if_free(reservation)
+        except BookingConflictError as e:
+            rejected.append((index, f"room_id: {e}"))
+        except sqlite3.IntegrityError:
+            rejected.append((index, "id: бронирование с таким id уже есть"))
+    return rejected
+
+
+class ImportSpec(NamedTuple):
+    """Описание импорта одной таблицы"""
+
+    entity_cls: type
+    columns: Tuple[str, ...]
+    # Поле -> (преобразование, значение по умолчанию или _REQUIRED)
+    fields: Dict[str, Tuple[Callable, object]]
+    errors: Callable[[BaseEntity], List[str]]
+    # Запись пачки (db, сущности) -> [(индекс в пачке, причина отказа)]
+    save: Callable[[DatabaseManager, List[BaseEntity]], List[Tuple[int, str]]]
+
+
+SPECS: Dict[str, ImportSpec] = {
+    "rooms": ImportSpec(
+        Room,
+        ROOM_COLUMNS,
+        {
+            "id": (_int, None),
+            "number": (_int, _REQUIRED),
+            "room_type": (_text, _REQUIRED),
+            "price_per_night": (_float, _REQUIRED),
+            "capacity": (_int, _REQUIRED),
+            "is_available": (_bool, True),
+            "created_at": (_datetime, None),
+        },
+        _room_errors,
+        _save_many(DatabaseManager.save_rooms_many),
+    ),
+    "guests": ImportSpec(
+        Guest,
+        GUEST_COLUMNS,
+        {
+            "id": (_int, None),
+            "name": (_text, _REQUIRED),
+            "email": (_text, _REQUIRED),
+            "phone": (_text, _REQUIRED),
+            "passport": (_text, _REQUIRED),
+            "created_at": (_datetime, None),
+        },
+        _guest_errors,
+        _save_many(DatabaseManager.save_guests_many),
+    ),
+    "reservations": ImportSpec(
+        Reservation,
+        RESERVATION_COLUMNS,
+        {
+            "id": (_int, None),
+            "guest_id": (_int, _REQUIRED),
+            "room_id": (_int, _REQUIRED),
+            "check_in_date": (_datetime, _REQUIRED),
+            "check_out_date": (_datetime, _REQUIRED),
+            "num_guests": (_int, _REQUIRED),
+            "total_cost": (_float, 0.0),
+            "status": (_text, "active"),
+            "created_at": (_datetime, None),
+        },
+        _reservation_errors,
+        _book_reservations,
+    ),
+}
+
+
+class ImportReport(NamedTuple):
+    """Итог импорта (с учетом прерванных ранее запусков)"""
+
+    records: int
+    imported: int
+    rejected: int
+    elapsed: float
+    resumed_from: int
+    reasons: Dict[str, int]
+
+    @property
+    def rate(self) -> float:
+        """Записей в секунду в этом запуске"""
+        processed = self.records - self.resumed_from
+        return processed / self.elapsed if self.elapsed else 0.0
+
+
+def parse_record(spec: ImportSpec, record: dict, created_at: str):
+    """Сущность из записи файла или (None, список ошибок)"""
+    if not isinstance(record, dict):
+        return None, ["запись: ожидается объект"]
+    values, errors = [], []
+    for column in spec.columns:
+        convert, default = spec.fields[column]
+        value = record.get(column)
+        if value is None or value == "":
+            if default is _REQUIRED:
+                errors.append(f"{column}: поле отсутствует")
+                continue
+            values.append(created_at if column == "created_at" else default)
+            continue
+        try:
+            values.append(convert(value))
+        except ValueError as e:
+            errors.append(f"{column}: {e}")
+    if errors:
+        return None, errors
+    entity = spec.entity_cls.from_row(tuple(values))
+    errors = spec.errors(entity)
+    return (None, errors) if errors else (entity, [])
+
+
+def _lines(file) -> Iterator[str]:
+    # readline() вместо итерации по файлу: так доступен file.tell()
+    while True:
+        line = file.readline()
+        if not line:
+            return
+        yield line
+
+
+def read_records(
+    path: str, file_format: str, position: Optional[str] = None
+) -> Iterator[Tuple[object, Callable[[], int]]]:
+    """Потоковое чтение записей: (запись, функция позиции файла)
+
+    Функция позиции возвращает смещение сразу после записи, пока не
+    запрошена следующая: tell() текстового файла дорог, поэтому он
+    вызывается только при сохранении контрольной точки. Некорректная
+    строка возвращается как ValueError вместо записи.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Формат должен быть одним из: {', '.join(FORMATS)}")
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        lines = _lines(file)
+        if file_format == "csv":
+            reader = csv.reader(lines)
+            header = next(reader, None)
+            if header is None:
+                return
+            if position is not None:
+                file.seek(int(position))
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) != len(header):
+                    yield ValueError("строка: неверное число полей"), file.tell
+                else:
+                    yield dict(zip(header, row)), file.tell
+            return
+        if position is not None:
+            file.seek(int(position))
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = ValueError("строка: некорректный JSON")
+            yield record, file.tell
+
+
+def detect_format(path: str) -> str:
+    """Формат по расширению файла"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Не удалось определить формат файла {path}")
+
+
+def import_file(
+    db: DatabaseManager,
+    kind: str,
+    path: str,
+    file_format: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    resume: bool = True,
+    on_reject: Optional[Callable[[int, object, List[str]], None]] = None,
+    progress: Optional[Callable[[int, int, int], None]] = None,
+) -> ImportReport:
+    """Потоковый импорт CSV или JSON Lines в таблицу kind
+
+    Записи проверяются правилами сущностей и пишутся пачками по
+    batch_size в одной транзакции вместе с позицией в файле, поэтому
+    после сбоя импорт продолжается с последней записанной пачки.
+    В памяти находится не больше одной пачки. Бронирования пишутся
+    через book_if_free: пересечение с занятыми датами номера и уже
+    существующий id отклоняют запись. Отклоненные записи передаются в
+    on_reject(номер записи, запись, ошибки).
+    """
+    if kind not in SPECS:
+        raise ValueError(f"Тип данных должен быть одним из: {', '.join(SPECS)}")
+    if batch_size <= 0:
+        raise ValueError("Размер пачки должен быть положительным")
+    spec = SPECS[kind]
+    file_format = file_format or detect_format(path)
+    source = f"{kind}:{os.path.abspath(path)}"
+
+    position, records, imported, rejected = None, 0, 0, 0
+    reasons: Counter = Counter()
+    checkpoint = db.get_import_checkpoint(source) if resume else None
+    if checkpoint is not None:
+        position, records, imported, rejected, saved_reasons = checkpoint
+        reasons.update(saved_reasons)
+    resumed_from = records
+    started = time.perf_counter()
+    created_at = datetime.now().isoformat()
+
+    batch: List[BaseEntity] = []
+    # (номер записи, запись) для каждой сущности пачки
+    batch_sources: List[tuple] = []
+    batch_rejects: List[tuple] = []
+
+    def flush(position: Optional[str]):
+        """Запись пачки; без позиции импорт завершен и точка удаляется"""
+        nonlocal imported, rejected
+        # IMMEDIATE: проверка пересечений бронирований и вставка под одной
+        # блокировкой
+        with db.transaction(immediate=True):
+            if batch:
+                for index, reason in spec.save(db, batch):
+                    imported -= 1
+                    rejected += 1
+                    reasons[reason] += 1
+                    batch_rejects.append(batch_sources[index] + ([reason],))
+                batch_rejects.sort(key=lambda reject: reject[0])
+            if position is None:
+                db.delete_import_checkpoint(source)
+            else:
+                db.save_import_checkpoint(
+                    source, position, records, imported, rejected, reasons
+                )
+        # Отклоненные записи сообщаются после фиксации пачки, чтобы
+        # при повторе после сбоя они не попали в отчет дважды
+        if on_reject is not None:
+            for reject in batch_rejects:
+                on_reject(*reject)
+        batch.clear()
+        batch_sources.clear()
+        batch_rejects.clear()
+        if progress is not None:
+            progress(records, imported, rejected)
+
+    tell = None
+    for record, tell in read_records(path, file_format, position):
+        records += 1
+        if isinstance(record, ValueError):
+            entity, errors = None, [str(record)]
+        else:
+            entity, errors = parse_record(spec, record, created_at)
+        if entity is None:
+            rejected += 1
+            reasons.update(errors)
+            batch_rejects.append((records, record, errors))
+        else:
+            imported += 1
+            batch.append(entity)
+            batch_sources.append((records, record))
+        if len(batch) + len(batch_rejects) >= batch_size:
+            flush(str(tell()))
+    flush(None)
+    return ImportReport(
+        records,
+        imported,
+        rejected,
+        time.perf_counter() - started,
+        resumed_from,
+        dict(reasons),
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    """Импорт из командной строки"""
+    parser = argparse.ArgumentParser(
+        description="Импорт номеров, гостей или бронирований из CSV или JSON Lines"
+    )
+    parser.add_argument("kind", choices=sorted(SPECS), help="тип данных")
+    parser.add_argument("path", help="файл CSV или JSON Lines")
+    parser.add_argument("--db", default="hotel.db", help="файл БД")
+    parser.add_argument("--format", choices=FORMATS, help="формат (по расширению)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="начать с начала")
+    parser.add_argument("--rejects", help="CSV для отклоненных записей")
+    parser.add_argument("--quiet", action="store_true", help="без вывода прогресса")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+
+    def report(records: int, imported: int, rejected: int):
+        rate = records / max(time.perf_counter() - started, 1e-9)
+        print(
+            f"\rОбработано {records}, импортировано {imported}, "
+            f"отклонено {rejected} ({rate:,.0f} записей/с)",
+            end="",
+            file=sys.stderr,
+        )
+
+    rejects_file = writer = None
+    if args.rejects:
+        rejects_file = open(args.rejects, "a", encoding="utf-8", newline="")
+        writer = csv.writer(rejects_file)
+
+    def reject(number: int, record, errors: List[str]):
+        if writer is not None:
+            record = json.dumps(record, ensure_ascii=False, default=str)
+            writer.writerow([number, "; ".join(errors), record])
+
+    try:
+        with DatabaseManager(args.db) as db:
+            result = import_file(
+                db,
+                args.kind,
+                args.path,
+                args.format,
+                args.batch_size,
+                not args.restart,
+                reject,
+                None if args.quiet else report,
+            )
+    finally:
+        if rejects_file is not None:
+            rejects_file.close()
+    if not args.quiet:
+        print(file=sys.stderr)
+    if result.resumed_from:
+        print(f"Продолжено с записи {result.resumed_from + 1}")
+    print(
+        f"Записей: {result.records}, импортировано: {result.imported}, "
+        f"отклонено: {result.rejected}"
+    )
+    print(f"Время: {result.elapsed:.2f} с, {result.rate:,.0f} записей/с")
+    for reason, count in sorted(result.reasons.items(), key=lambda item: -item[1]):
+        print(f"  {count:>8}  {reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence
+
+from .database import DEFAULT_PAGE_SIZE, DatabaseManager
+
+# Высота строки и заголовка ttk.Treeview по умолчанию, пикселей
+ROW_HEIGHT = 20
+HEADER_HEIGHT = 25
+# Сколько страниц DatabaseSource держит в памяти
+CACHED_PAGES = 8
+
+
+class SyncStats(NamedTuple):
+    """Число операций с Treeview при синхронизации"""
+
+    inserted: int
+    updated: int
+    removed: int
+    moved: int
+
+
+class TreeviewSync:
+    """Синхронизация ttk.Treeview с коллекцией сущностей по разнице строк
+
+    Идентификатор строки в дереве - id сущности. При sync() удаляются,
+    добавляются, обновляются и переставляются только изменившиеся строки,
+    поэтому выделение и прокрутка сохраняются, а число вызовов Tk
+    пропорционально числу изменений, а не размеру коллекции.
+    """
+
+    def __init__(self, tree, row_values: Callable[[object], tuple]):
+        self.tree = tree
+        self._row_values = row_values
+        # Значения строк в порядке отображения
+        self._rows: Dict[str, tuple] = {}
+
+    def sync(self, items: Iterable) -> SyncStats:
+        """Приведение дерева к содержимому items"""
+        tree, row_values, rows = self.tree, self._row_values, self._rows
+        new_rows: Dict[str, tuple] = {}
+        for item in items:
+            new_rows[str(item.id)] = tuple(row_values(item))
+
+        removed = [iid for iid in rows if iid not in new_rows]
+        if removed:
+            tree.delete(*removed)
+        # Порядок оставшихся строк меняется редко: обычно строки только
+        # дописываются в конец или удаляются
+        kept = [iid for iid in rows if iid in new_rows]
+        reordered = kept != [iid for iid in new_rows if iid in rows]
+
+        inserted = updated = moved = 0
+        for index, (iid, values) in enumerate(new_rows.items()):
+            old = rows.get(iid)
+            if old is None:
+                tree.insert("", index, iid=iid, values=values)
+                inserted += 1
+                continue
+            if old != values:
+                tree.item(iid, values=values)
+                updated += 1
+            if reordered:
+                tree.move(iid, "", index)
+                moved += 1
+        self._rows = new_rows
+        return SyncStats(inserted, updated, len(removed), moved)
+
+    def clear(self) -> None:
+        """Удаление всех строк"""
+        if self._rows:
+            self.tree.delete(*self._rows)
+        self._rows = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class DatabaseSource(Sequence):
+    """Строки таблицы как последовательность сущностей, читаемая страницами
+
+    Срез [start:stop] загружает только нужные страницы: начало страницы
+    находится по позиции (get_id_at), дальше - keyset-пагинация по id.
+    Последние загруженные страницы кэшируются.
+    """
+
+    _PAGES = {
+        "rooms": DatabaseManager.get_rooms_page,
+        "guests": DatabaseManager.get_guests_page,
+        "reservations": DatabaseManager.get_reservations_page,
+    }
+
+    def __init__(
+        self, db: DatabaseManager, table: str, page_size: int = DEFAULT_PAGE_SIZE
+    ):
+        if table not in self._PAGES:
+            raise ValueError(f"Неизвестная таблица: {table}")
+        self.db = db
+        self.table = table
+        self.page_size = page_size
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Сброс кэша после изменения таблицы"""
+        self._count = None
+        self._pages: "OrderedDict[int, list]" = OrderedDict()
+        # Последний id перед началом страницы, если он уже известен
+        self._anchors: Dict[int, int] = {0: 0}
+
+    def _page(self, number: int) -> list:
+        page = self._pages.get(number)
+        if page is not None:
+            self._pages.move_to_end(number)
+            return page
+        after_id = self._anchors.get(number)
+        if after_id is None:
+            first_id = self.db.get_id_at(self.table, number * self.page_size)
+            if first_id is None:
+                return []
+            after_id = first_id - 1
+        page = self._PAGES[self.table](self.db, after_id, self.page_size, "entity")
+        if page:
+            self._anchors[number + 1] = page[-1].id
+        self._pages[number] = page
+        if len(self._pages) > CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return page
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = self.db.get_row_counts()[self.table]
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("Шаг среза не поддерживается")
+            items: List = []
+            number = start // self.page_size
+            while start + len(items) < stop:
+                page = self._page(number)
+                if not page:
+                    break
+                skip = start + len(items) - number * self.page_size
+                items.extend(page[skip : skip + stop - start - len(items)])
+                number += 1
+            return items
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        page = self._page(index // self.page_size)
+        return page[index % self.page_size]
+
+
+class VirtualTreeview:
+    """Виртуальный список: в Treeview находятся только видимые строки
+
+    Источник - любая последовательность со срезами (список, LazyCollection,
+    DatabaseSource). Полоса прокрутки управляется вручную, а при прокрутке
+    окно строк обновляется через TreeviewSync.
+    """
+
+    def __init__(
+        self,
+        tree,
+        scrollbar,
+        row_values: Callable[[object], tuple],
+        row_height: int = ROW_HEIGHT,
+    ):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_height = row_height
+        self.visible_rows = int(tree.cget("height"))
+        self.offset = 0
+        self.source: Sequence = ()
+        self._sync = TreeviewSync(tree, row_values)
+        scrollbar.configure(command=self.yview)
+        tree.bind("<Configure>", self._on_configure)
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        tree.bind("<Button-5>", lambda event: self.scroll(3))
+
+    def set_source(self, source: Sequence) -> None:
+        """Показ новой коллекции с начала"""
+        self.source = source
+        self.offset = 0
+        self.render()
+
+    def render(self) -> SyncStats:
+        """Вывод видимого окна строк с текущей позиции"""
+        total = len(self.source)
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+        rows = self.source[self.offset : self.offset + self.visible_rows]
+        stats = self._sync.sync(rows)
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + len(rows)) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        return stats
+
+    def scroll(self, rows: int) -> None:
+        """Прокрутка на rows строк (отрицательное значение - вверх)"""
+        self.scroll_to(self.offset + rows)
+
+    def scroll_to(self, offset: int) -> None:
+        """Переход к строке с номером offset"""
+        self.offset = offset
+        self.render()
+
+    def yview(self, *args) -> None:
+        """Обработчик команд полосы прокрутки"""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.source)))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def _on_wheel(self, event) -> None:
+        self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_configure(self, event) -> None:
+        rows = max(1, (event.height - HEADER_HEIGHT) // self.row_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
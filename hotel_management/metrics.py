@@ -0,0 +1,286 @@
+import cProfile
+import functools
+import inspect
+import json
+import threading
+import time
+from bisect import bisect_left
+from types import GeneratorType
+from typing import Callable, Dict, Iterable, Optional
+
+# Границы корзин задержки, с: от 1 мкс до ~134 с с шагом 2**(1/4)
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** (k / 4) for k in range(109))
+# В Prometheus выгружается каждая 4-я граница (шаг x2), чтобы файл был короче
+PROMETHEUS_BUCKET_STEP = 4
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Гистограмма задержек с фиксированными корзинами"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        # Последняя корзина - значения больше всех границ
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля линейной интерполяцией внутри корзины"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(LATENCY_BUCKETS):
+                    return self.max
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                upper = min(LATENCY_BUCKETS[index], self.max)
+                return lower + (upper - lower) * max(rank - seen, 0) / count
+            seen += count
+        return self.max
+
+
+class OperationMetrics:
+    """Счетчики одной операции"""
+
+    __slots__ = ("calls", "errors", "rows", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.latency = Histogram()
+
+    def to_dict(self) -> dict:
+        latency = self.latency
+        result = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_seconds": latency.total,
+            "mean_seconds": latency.total / latency.count if latency.count else 0.0,
+            "max_seconds": latency.max,
+        }
+        for q in QUANTILES:
+            result[f"p{round(q * 100)}_seconds"] = latency.quantile(q)
+        return result
+
+
+def _count_rows(result) -> int:
+    """Строки результата по умолчанию: длина списка"""
+    return len(result) if isinstance(result, list) else 0
+
+
+class MetricsRegistry:
+    """Реестр метрик инструментированных операций
+
+    Выключен по умолчанию: обертка тогда только проверяет флаг enabled
+    и вызывает исходную функцию. Включается и выключается в любой
+    момент через enable()/disable().
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.operations: Dict[str, OperationMetrics] = {}
+        self._lock = threading.Lock()
+        # (операция, файл) для однократной записи профиля cProfile
+        self._profile: Optional[tuple] = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.operations = {}
+
+    def record(self, name: str, elapsed: float, rows: int = 0, error: bool = False):
+        with self._lock:
+            operation = self.operations.get(name)
+            if operation is None:
+                operation = self.operations[name] = OperationMetrics()
+            operation.calls += 1
+            operation.rows += rows
+            if error:
+                operation.errors += 1
+            operation.latency.observe(elapsed)
+
+    def profile_next(self, name: str, path: str):
+        """Запись профиля cProfile следующего вызова операции name в path
+
+        Включает сбор метрик, так как профиль снимается оберткой.
+        """
+        self._profile = (name, path)
+        self.enable()
+
+    def _take_profile(self, name: str) -> Optional[str]:
+        with self._lock:
+            if self._profile is None or self._profile[0] != name:
+                return None
+            path, self._profile = self._profile[1], None
+            return path
+
+    def _measure_iterator(self, name: str, iterator, started: float):
+        """Итератор засекается до исчерпания, строки считаются по мере чтения"""
+        rows = 0
+        error = False
+        try:
+            for item in iterator:
+                rows += 1
+                yield item
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, rows, error)
+
+    def instrument(
+        self, name: str, rows: Callable[[object], int] = _count_rows
+    ) -> Callable:
+        """Декоратор: число вызовов, задержка, строки и ошибки операции"""
+
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                profile_path = (
+                    self._take_profile(name) if self._profile is not None else None
+                )
+                started = time.perf_counter()
+                try:
+                    if profile_path is None:
+                        result = func(*args, **kwargs)
+                    else:
+                        profiler = cProfile.Profile()
+                        try:
+                            result = profiler.runcall(func, *args, **kwargs)
+                        finally:
+                            profiler.dump_stats(profile_path)
+                except BaseException:
+                    self.record(name, time.perf_counter() - started, 0, True)
+                    raise
+                if isinstance(result, GeneratorType):
+                    return self._measure_iterator(name, result, started)
+                self.record(name, time.perf_counter() - started, rows(result))
+                return result
+
+            return wrapper
+
+        return decorate
+
+    def instrument_class(
+        self,
+        prefix: str,
+        names: Optional[Iterable[str]] = None,
+        rows: Optional[Dict[str, Callable[[object], int]]] = None,
+        exclude: Iterable[str] = (),
+    ) -> Callable:
+        """Декоратор класса: инструментирует методы names
+
+        По умолчанию - все публичные методы, объявленные в классе.
+        Метрики называются "<prefix>.<метод>".
+        """
+        rows = rows or {}
+
+        def decorate(cls):
+            selected = (
+                names
+                if names is not None
+                else [
+                    name
+                    for name, value in vars(cls).items()
+                    if inspect.isfunction(value)
+                    and not name.startswith("_")
+                    and name not in exclude
+                ]
+            )
+            for name in selected:
+                instrument = self.instrument(
+                    f"{prefix}.{name}", rows.get(name, _count_rows)
+                )
+                setattr(cls, name, instrument(vars(cls)[name]))
+            return cls
+
+        return decorate
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            operations = {
+                name: operation.to_dict()
+                for name, operation in sorted(self.operations.items())
+            }
+        return {"enabled": self.enabled, "operations": operations}
+
+    def to_prometheus(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        with self._lock:
+            operations = sorted(self.operations.items())
+            lines = [
+                "# HELP hotel_operation_duration_seconds Длительность операций",
+                "# TYPE hotel_operation_duration_seconds histogram",
+            ]
+            for name, operation in operations:
+                latency = operation.latency
+                cumulative = 0
+                for index, count in enumerate(latency.counts[:-1]):
+                    cumulative += count
+                    if index % PROMETHEUS_BUCKET_STEP == 0:
+                        lines.append(
+                            "hotel_operation_duration_seconds_bucket"
+                            f'{{operation="{name}",le="{LATENCY_BUCKETS[index]:.6g}"}}'
+                            f" {cumulative}"
+                        )
+                lines.append(
+                    "hotel_operation_duration_seconds_bucket"
+                    f'{{operation="{name}",le="+Inf"}} {latency.count}'
+                )
+                lines.append(
+                    "hotel_operation_duration_seconds_sum"
+                    f'{{operation="{name}"}} {latency.total!r}'
+                )
+                lines.append(
+                    "hotel_operation_duration_seconds_count"
+                    f'{{operation="{name}"}} {latency.count}'
+                )
+            for metric, help_text in (
+                ("calls", "Число вызовов"),
+                ("errors", "Число вызовов с исключением"),
+                ("rows", "Обработано строк"),
+            ):
+                lines.append(f"# HELP hotel_operation_{metric}_total {help_text}")
+                lines.append(f"# TYPE hotel_operation_{metric}_total counter")
+                for name, operation in operations:
+                    lines.append(
+                        f'hotel_operation_{metric}_total{{operation="{name}"}} '
+                        f"{getattr(operation, metric)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str):
+        """Запись метрик в файл: .prom/.txt - Prometheus, иначе JSON"""
+        if path.endswith((".prom", ".txt")):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+# Общий реестр пакета
+METRICS = MetricsRegistry()
+instrument = METRICS.instrument
+instrument_class = METRICS.instrument_class
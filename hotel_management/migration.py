@@ -0,0 +1,163 @@
+import argparse
+import os
+import time
+from typing import Callable, Optional
+
+from .database import DatabaseManager
+from .schema import (
+    COPY_ROOM_TYPES_SQL,
+    COPY_SQL,
+    MIGRATION_TABLE,
+    SCHEMA_VERSION,
+    SYNC_TRIGGER_NAMES,
+    SYNC_TRIGGERS,
+    TABLES,
+    V2_TABLES,
+    V2_VIEWS,
+    v2_table,
+)
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def start_migration(db: DatabaseManager) -> None:
+    """Таблицы v2 и триггеры, копирующие в них изменения таблиц v1
+
+    Повторный вызов ничего не меняет: прерванная миграция продолжается
+    с сохраненных в schema_migration позиций.
+    """
+    with db.transaction(immediate=True) as conn:
+        for sql in V2_TABLES + (MIGRATION_TABLE,) + SYNC_TRIGGERS:
+            conn.execute(sql)
+        conn.executemany(
+            "INSERT OR IGNORE INTO schema_migration VALUES (?, 0)",
+            [(table,) for table in TABLES],
+        )
+
+
+def copy_batch(db: DatabaseManager, table: str, batch_size: int) -> int:
+    """Перенос следующей пачки строк таблицы в v2, возвращает число строк"""
+    with db.transaction(immediate=True) as conn:
+        (last_id,) = conn.execute(
+            "SELECT last_id FROM schema_migration WHERE table_name = ?", (table,)
+        ).fetchone()
+        upper, count = conn.execute(
+            f"SELECT MAX(id), COUNT(*) FROM "
+            f"(SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?)",
+            (last_id, batch_size),
+        ).fetchone()
+        if not count:
+            return 0
+        if table == "rooms":
+            conn.execute(COPY_ROOM_TYPES_SQL, (last_id, upper))
+        conn.execute(COPY_SQL[table], (last_id, upper))
+        conn.execute(
+            "UPDATE schema_migration SET last_id = ? WHERE table_name = ?",
+            (upper, table),
+        )
+    return count
+
+
+def finish_migration(db: DatabaseManager) -> None:
+    """Переключение на v2: таблицы v1 заменяются представлениями
+
+    Строки, записанные после переноса их пачки, уже скопированы
+    триггерами, поэтому достаточно сверить количество строк.
+    """
+    with db.transaction(immediate=True) as conn:
+        for table in TABLES:
+            old, new = (
+                conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+                for name in (table, v2_table(table))
+            )
+            if old != new:
+                raise ValueError(
+                    f"Таблица {table} перенесена не полностью: {new} из {old}"
+                )
+        for name in SYNC_TRIGGER_NAMES:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for table in reversed(TABLES):
+            conn.execute(f"DROP TABLE {table}")
+        for sql in V2_VIEWS:
+            conn.execute(sql)
+        conn.execute("DROP TABLE schema_migration")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    db.reload_schema()
+
+
+def migrate(
+    db: DatabaseManager,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pause: float = 0.0,
+    max_batches: Optional[int] = None,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> bool:
+    """Миграция БД на последнюю версию схемы пачками по batch_size строк
+
+    Каждая пачка - отдельная короткая транзакция вместе с позицией
+    миграции, так что другие соединения пишут в БД между пачками (pause
+    секунд), а прерванная миграция продолжается повторным вызовом.
+    После max_batches пачек возвращает False; True - схема обновлена.
+    """
+    if batch_size <= 0:
+        raise ValueError("Размер пачки должен быть положительным")
+    if db.reload_schema() >= SCHEMA_VERSION:
+        return True
+    start_migration(db)
+    batches = 0
+    for table in TABLES:
+        while max_batches is None or batches < max_batches:
+            copied = copy_batch(db, table, batch_size)
+            if not copied:
+                break
+            batches += 1
+            if progress is not None:
+                progress(table, copied)
+            if pause:
+                time.sleep(pause)
+        else:
+            return False
+    finish_migration(db)
+    return True
+
+
+def vacuum(db: DatabaseManager) -> None:
+    """Сжатие файла после миграции: место удаленных таблиц v1 освобождается"""
+    db.connection.execute("VACUUM")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Миграция БД гостиницы на последнюю версию схемы"
+    )
+    parser.add_argument("--db", default="hotel.db", help="путь к файлу БД")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--pause", type=float, default=0.0, help="пауза между пачками, с"
+    )
+    parser.add_argument(
+        "--vacuum", action="store_true", help="сжать файл после миграции"
+    )
+    args = parser.parse_args()
+
+    copied = dict.fromkeys(TABLES, 0)
+
+    def report(table: str, count: int):
+        copied[table] += count
+        print(f"{table}: перенесено {copied[table]}", flush=True)
+
+    started = time.perf_counter()
+    with DatabaseManager(args.db) as db:
+        before = db.schema_version
+        migrate(db, args.batch_size, args.pause, progress=report)
+        if args.vacuum:
+            vacuum(db)
+        print(
+            f"Схема: v{before} -> v{db.schema_version}, "
+            f"{time.perf_counter() - started:.2f} с, "
+            f"размер файла {os.path.getsize(args.db) / 2**20:.1f} МБ"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+from array import array
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .availability import DayLike, to_day
+from .database import DatabaseManager
+from .reservation import Reservation
+from .room import Room
+
+# Горизонт календаря по умолчанию, дней
+DEFAULT_HORIZON = 730
+# Ключ общего счетчика занятых номеров: не совпадает ни с одним типом,
+# включая None у номеров без типа
+_ALL = object()
+
+
+def _mask(start: int, end: int) -> int:
+    """Биты с start по end - 1"""
+    return ((1 << (end - start)) - 1) << start
+
+
+def _bits(value: int, start: int, end: int) -> Iterable[int]:
+    """Номера установленных битов value на отрезке [start, end)"""
+    return (bit for bit in range(start, end) if value >> bit & 1)
+
+
+def _runs(value: int) -> Iterable[Tuple[int, int]]:
+    """Серии установленных битов value как полуоткрытые отрезки"""
+    while value:
+        start = (value & -value).bit_length() - 1
+        shifted = value >> start
+        length = (~shifted & (shifted + 1)).bit_length() - 1
+        yield start, start + length
+        value &= ~_mask(start, start + length)
+
+
+class OccupancyCalendar:
+    """Календарь занятости: битовая маска ночей на каждый номер
+
+    Бит i маски номера означает, что ночь origin + i занята. Календарь
+    покрывает скользящий горизонт из horizon дней, начиная с origin;
+    свободные номера и загрузка считаются побитовыми операциями над
+    масками сразу для всего периода. Для посуточной доступности
+    дополнительно хранятся счетчики занятых номеров по дням.
+    """
+
+    def __init__(self, origin: DayLike, horizon: int = DEFAULT_HORIZON):
+        if horizon <= 0:
+            raise ValueError("Горизонт календаря должен быть положительным")
+        self.origin = to_day(origin)
+        self.horizon = horizon
+        self._occupied: Dict[int, int] = {}
+        self._room_types: Dict[int, str] = {}
+        self._rooms_by_type: Dict[str, List[int]] = {}
+        # Число занятых номеров по дням: всего (ключ _ALL) и по типам
+        self._busy: Dict[object, array] = {_ALL: self._zeros(horizon)}
+        self._bookings: Dict[int, Tuple[int, int, int]] = {}
+        self._room_bookings: Dict[int, Set[int]] = {}
+
+    @classmethod
+    def from_database(
+        cls,
+        db: DatabaseManager,
+        origin: Optional[DayLike] = None,
+        horizon: int = DEFAULT_HORIZON,
+    ) -> "OccupancyCalendar":
+        """Календарь по таблицам rooms и reservations начиная с origin"""
+        calendar = cls(date.today() if origin is None else origin, horizon)
+        for room_id, _, room_type, *_ in db.iter_rooms():
+            calendar.add_room(room_id, room_type)
+        since = date.fromordinal(calendar.origin)
+        calendar._load(row[:5] for row in db.iter_active_reservations(since))
+        return calendar
+
+    def _load(self, rows: Iterable[tuple]) -> None:
+        """Массовая загрузка бронирований (id, _, room_id, check_in, check_out)
+
+        Маски номеров собираются целиком, а счетчики по дням считаются
+        один раз по сериям занятых ночей каждой маски.
+        """
+        masks: Dict[int, int] = {}
+        # Дат в горизонте немного, поэтому разбор строк кэшируется
+        days: Dict[DayLike, int] = {}
+        for reservation_id, _, room_id, check_in, check_out in rows:
+            start_day = days.get(check_in)
+            if start_day is None:
+                start_day = days[check_in] = to_day(check_in)
+            end_day = days.get(check_out)
+            if end_day is None:
+                end_day = days[check_out] = to_day(check_out)
+            if end_day <= start_day:
+                continue
+            if room_id not in self._occupied:
+                self.add_room(room_id)
+            self._bookings[reservation_id] = (room_id, start_day, end_day)
+            self._room_bookings.setdefault(room_id, set()).add(reservation_id)
+            start, end = self._clip(start_day, end_day)
+            if start < end:
+                masks[room_id] = masks.get(room_id, 0) | _mask(start, end)
+        # Разности по дням: +1 в начале серии занятых ночей, -1 после нее
+        deltas = {key: [0] * (self.horizon + 1) for key in self._busy}
+        for room_id, value in masks.items():
+            old = self._occupied[room_id]
+            value |= old
+            self._occupied[room_id] = value
+            counters = (deltas[_ALL], deltas[self._room_types[room_id]])
+            for start, end in _runs(value & ~old):
+                for delta in counters:
+                    delta[start] += 1
+                    delta[end] -= 1
+        for key, delta in deltas.items():
+            busy = self._busy[key]
+            total = 0
+            for index in range(self.horizon):
+                total += delta[index]
+                busy[index] += total
+
+    @staticmethod
+    def _zeros(count: int) -> array:
+        return array("I", bytes(4 * count))
+
+    def _window(self, check_in: DayLike, check_out: DayLike) -> Tuple[int, int]:
+        """Период в битах календаря с проверкой горизонта"""
+        start = to_day(check_in) - self.origin
+        end = to_day(check_out) - self.origin
+        if end <= start:
+            raise ValueError("Дата выезда должна быть после даты заезда")
+        if start < 0 or end > self.horizon:
+            raise ValueError("Период выходит за горизонт календаря")
+        return start, end
+
+    def _clip(self, start_day: int, end_day: int) -> Tuple[int, int]:
+        """Пересечение периода в днях с горизонтом, в битах календаря"""
+        start = max(start_day - self.origin, 0)
+        end = min(end_day - self.origin, self.horizon)
+        return start, end
+
+    def add_room(self, room: Union[Room, int], room_type: Optional[str] = None):
+        """Регистрация номера (объект Room или id и тип)"""
+        if isinstance(room, Room):
+            room, room_type = room.id, room.room_type
+        if room in self._occupied:
+            return
+        self._occupied[room] = 0
+        self._room_types[room] = room_type
+        self._rooms_by_type.setdefault(room_type, []).append(room)
+        if room_type not in self._busy:
+            self._busy[room_type] = self._zeros(self.horizon)
+
+    def _set_occupied(self, room_id: int, value: int) -> None:
+        """Новая маска номера с пересчетом счетчиков по изменившимся дням"""
+        old = self._occupied[room_id]
+        changed = old ^ value
+        if not changed:
+            return
+        self._occupied[room_id] = value
+        counters = (self._busy[_ALL], self._busy[self._room_types[room_id]])
+        first = (changed & -changed).bit_length() - 1
+        for bit in _bits(changed, first, changed.bit_length()):
+            delta = 1 if value >> bit & 1 else -1
+            for busy in counters:
+                busy[bit] += delta
+
+    def _rebuild(self, room_id: int) -> None:
+        value = 0
+        for reservation_id in self._room_bookings.get(room_id, ()):
+            _, start_day, end_day = self._bookings[reservation_id]
+            start, end = self._clip(start_day, end_day)
+            if start < end:
+                value |= _mask(start, end)
+        self._set_occupied(room_id, value)
+
+    def add_booking(
+        self, reservation_id: int, room_id: int, check_in: DayLike, check_out: DayLike
+    ) -> None:
+        """Учет бронирования номера на ночи [check_in, check_out)"""
+        if reservation_id in self._bookings:
+            self.cancel_reservation(reservation_id)
+        if room_id not in self._occupied:
+            self.add_room(room_id)
+        start_day, end_day = to_day(check_in), to_day(check_out)
+        if end_day <= start_day:
+            return
+        self._bookings[reservation_id] = (room_id, start_day, end_day)
+        self._room_bookings.setdefault(room_id, set()).add(reservation_id)
+        start, end = self._clip(start_day, end_day)
+        if start < end:
+            self._set_occupied(room_id, self._occupied[room_id] | _mask(start, end))
+
+    def add_reservation(self, reservation: Reservation) -> None:
+        """Учет бронирования и подписка на изменение его статуса"""
+        reservation.subscribe(self._on_status_change)
+        if reservation.status == "active":
+            self.add_booking(
+                reservation.id,
+                reservation.room_id,
+                reservation.check_in_date,
+                reservation.check_out_date,
+            )
+
+    def _on_status_change(self, reservation: Reservation, field: str, old, new):
+        if field != "status" or old == new:
+            return
+        if new == "cancelled":
+            self.cancel_reservation(reservation.id)
+        elif new == "completed":
+            self.complete_reservation(reservation.id)
+
+    def cancel_reservation(self, reservation_id: int) -> bool:
+        """Освобождение всех ночей бронирования"""
+        booking = self._bookings.pop(reservation_id, None)
+        if booking is None:
+            return False
+        room_id = booking[0]
+        self._room_bookings[room_id].discard(reservation_id)
+        self._rebuild(room_id)
+        return True
+
+    def complete_reservation(
+        self, reservation_id: int, day: Optional[DayLike] = None
+    ) -> bool:
+        """Завершение проживания: ночи начиная с day (сегодня) освобождаются"""
+        booking = self._bookings.get(reservation_id)
+        if booking is None:
+            return False
+        room_id, start_day, end_day = booking
+        day = to_day(date.today() if day is None else day)
+        if day <= start_day:
+            return self.cancel_reservation(reservation_id)
+        if day < end_day:
+            self._bookings[reservation_id] = (room_id, start_day, day)
+            self._rebuild(room_id)
+        return True
+
+    def advance(self, origin: DayLike) -> None:
+        """Сдвиг горизонта: прошедшие дни отбрасываются, новые заполняются"""
+        shift = to_day(origin) - self.origin
+        if shift <= 0:
+            return
+        self.origin += shift
+        for room_id, value in self._occupied.items():
+            self._occupied[room_id] = value >> shift
+        for key, busy in self._busy.items():
+            if shift >= self.horizon:
+                self._busy[key] = self._zeros(self.horizon)
+            else:
+                del busy[:shift]
+                busy.extend(self._zeros(shift))
+        rebuild = set()
+        for reservation_id, (room_id, _, end_day) in list(self._bookings.items()):
+            if end_day <= self.origin:
+                # Прошедшие бронирования больше не нужны
+                del self._bookings[reservation_id]
+                self._room_bookings[room_id].discard(reservation_id)
+            elif end_day > self.origin + self.horizon - shift:
+                # Бронирование заходит в открывшиеся дни
+                rebuild.add(room_id)
+        for room_id in rebuild:
+            self._rebuild(room_id)
+
+    def _room_ids(self, room_type: Optional[str]) -> Iterable[int]:
+        if room_type is None:
+            return self._occupied.keys()
+        return self._rooms_by_type.get(room_type, ())
+
+    def is_room_free(self, room_id: int, check_in: DayLike, check_out: DayLike) -> bool:
+        """Свободен ли номер на все ночи периода"""
+        start, end = self._window(check_in, check_out)
+        return not self._occupied.get(room_id, 0) & _mask(start, end)
+
+    def free_rooms(
+        self, check_in: DayLike, check_out: DayLike, room_type: Optional[str] = None
+    ) -> List[int]:
+        """id номеров, свободных на все ночи периода"""
+        start, end = self._window(check_in, check_out)
+        mask = _mask(start, end)
+        occupied = self._occupied
+        return sorted(
+            room_id
+            for room_id in self._room_ids(room_type)
+            if not occupied[room_id] & mask
+        )
+
+    def occupancy_rate(
+        self, check_in: DayLike, check_out: DayLike, room_type: Optional[str] = None
+    ) -> float:
+        """Доля занятых номеро-ночей за период"""
+        start, end = self._window(check_in, check_out)
+        mask = _mask(start, end)
+        occupied = self._occupied
+        room_ids = self._room_ids(room_type)
+        if not room_ids:
+            return 0.0
+        busy = sum((occupied[room_id] & mask).bit_count() for room_id in room_ids)
+        return busy / (len(room_ids) * (end - start))
+
+    def daily_free(
+        self, check_in: DayLike, check_out: DayLike, room_type: Optional[str] = None
+    ) -> List[int]:
+        """Число свободных номеров на каждую ночь периода"""
+        start, end = self._window(check_in, check_out)
+        total = len(self._room_ids(room_type))
+        busy = self._busy.get(_ALL if room_type is None else room_type)
+        if busy is None:
+            return [total] * (end - start)
+        return [total - count for count in busy[start:end]]
+
+    def __len__(self) -> int:
+        return len(self._occupied)
@@ -0,0 +1,173 @@
+import math
+from datetime import datetime, time
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него расчет идет обычным циклом
+    np = None
+
+from .database import DEFAULT_CHUNK_SIZE, DatabaseManager, DateLike
+
+# Те же константы и сообщения, что в Reservation.calculate_stay_cost
+# и Reservation.calculate_booking_deposit
+DEPOSIT_RATE = 0.2
+NIGHTS_ERROR = "Минимальное время проживания - 1 ночь"
+ROOM_ERROR = "Номер не найден"
+
+
+class PricingResult(NamedTuple):
+    """Результат пакетного расчета (массивы NumPy или списки)
+
+    Для строк с ошибкой стоимость равна NaN, а текст ошибки лежит
+    в errors по индексу строки.
+    """
+
+    nights: Sequence[int]
+    stay_cost: Sequence[float]
+    deposit: Sequence[float]
+    errors: Dict[int, str]
+
+
+class RepricingReport(NamedTuple):
+    """Итог пересчета бронирований в БД"""
+
+    updated: int
+    errors: Dict[int, str]
+
+
+def _to_datetime(value) -> datetime:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        return datetime.combine(value, time())
+    return value
+
+
+def _price_python(check_in, check_out, room_ids, room_prices) -> PricingResult:
+    nights, stay_cost, deposit, errors = [], [], [], {}
+    for index, (start, end, room_id) in enumerate(zip(check_in, check_out, room_ids)):
+        count = (_to_datetime(end) - _to_datetime(start)).days
+        nights.append(count)
+        price = room_prices.get(room_id)
+        if price is None:
+            errors[index] = ROOM_ERROR
+            stay_cost.append(math.nan)
+            deposit.append(math.nan)
+            continue
+        deposit.append(price * DEPOSIT_RATE)
+        if count <= 0:
+            errors[index] = NIGHTS_ERROR
+            stay_cost.append(math.nan)
+        else:
+            stay_cost.append(price * count)
+    return PricingResult(nights, stay_cost, deposit, errors)
+
+
+def _as_datetime64(values):
+    values = [
+        value if isinstance(value, (str, datetime)) else _to_datetime(value)
+        for value in values
+    ]
+    return np.array(values, dtype="datetime64[us]")
+
+
+def _price_numpy(check_in, check_out, room_ids, room_prices) -> PricingResult:
+    # Целая часть деления на сутки с округлением вниз совпадает с timedelta.days
+    nights = (_as_datetime64(check_out) - _as_datetime64(check_in)) // np.timedelta64(
+        1, "D"
+    )
+    room_ids = np.asarray(room_ids, dtype=np.int64)
+    keys = np.fromiter(room_prices.keys(), dtype=np.int64, count=len(room_prices))
+    values = np.fromiter(room_prices.values(), dtype=np.float64, count=len(room_prices))
+    order = np.argsort(keys)
+    keys, values = keys[order], values[order]
+    positions = np.searchsorted(keys, room_ids)
+    positions = np.minimum(positions, max(len(keys) - 1, 0))
+    if len(keys):
+        found = keys[positions] == room_ids
+        prices = np.where(found, values[positions], np.nan)
+    else:
+        found = np.zeros(len(room_ids), dtype=bool)
+        prices = np.full(len(room_ids), np.nan)
+
+    bookable = found & (nights > 0)
+    stay_cost = np.where(bookable, prices * nights, np.nan)
+    deposit = prices * DEPOSIT_RATE
+
+    errors = {int(index): ROOM_ERROR for index in np.flatnonzero(~found)}
+    errors.update(
+        (int(index), NIGHTS_ERROR) for index in np.flatnonzero(found & ~bookable)
+    )
+    return PricingResult(nights, stay_cost, deposit, dict(sorted(errors.items())))
+
+
+def price_batch(
+    check_in: Iterable[DateLike],
+    check_out: Iterable[DateLike],
+    room_ids: Iterable[int],
+    room_prices: Mapping[int, float],
+    use_numpy: Optional[bool] = None,
+) -> PricingResult:
+    """Пакетный расчет ночей, стоимости проживания и депозита
+
+    Результаты совпадают с Reservation.calculate_stay_cost и
+    calculate_booking_deposit для каждой строки. Ошибка "меньше одной
+    ночи" не прерывает расчет, а попадает в errors для своей строки.
+    По умолчанию используется NumPy, если он установлен.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise RuntimeError("Для векторного расчета требуется NumPy")
+    check_in, check_out, room_ids = list(check_in), list(check_out), list(room_ids)
+    if not len(check_in) == len(check_out) == len(room_ids):
+        raise ValueError("Массивы дат и номеров должны быть одной длины")
+    if use_numpy:
+        return _price_numpy(check_in, check_out, room_ids, room_prices)
+    return _price_python(check_in, check_out, room_ids, room_prices)
+
+
+def reprice_reservations(
+    db: DatabaseManager,
+    room_prices: Optional[Mapping[int, float]] = None,
+    since: Optional[DateLike] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    use_numpy: Optional[bool] = None,
+) -> RepricingReport:
+    """Пересчет total_cost активных бронирований с записью в БД
+
+    Без room_prices берутся текущие цены из таблицы rooms. При заданном
+    since пересчитываются только бронирования с выездом после этой даты.
+    Бронирования читаются страницами по id через индекс по статусу
+    (отбор по статусу и дате выезда - в запросе), а новые суммы записываются
+    пачками в одной транзакции.
+    """
+    if room_prices is None:
+        room_prices = {row[0]: row[3] for row in db.iter_rooms()}
+    since = None if since is None else _to_datetime(since)
+    updated, errors = 0, {}
+    after_id = 0
+    with db.transaction():
+        while True:
+            rows = db.get_reservations_page_by_status(
+                "active", after_id, chunk_size, since
+            )
+            if not rows:
+                break
+            after_id = rows[-1][0]
+            result = price_batch(
+                [row[3] for row in rows],
+                [row[4] for row in rows],
+                [row[2] for row in rows],
+                room_prices,
+                use_numpy,
+            )
+            costs: List[tuple] = []
+            for index, (row, cost) in enumerate(zip(rows, result.stay_cost)):
+                if index in result.errors:
+                    errors[row[0]] = result.errors[index]
+                else:
+                    costs.append((float(cost), row[0]))
+            updated += db.update_reservation_costs(costs)
+    return RepricingReport(updated, errors)
@@ -0,0 +1,229 @@
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .database import DatabaseManager
+
+# Частей на процесс: мелкие диапазоны выравнивают нагрузку между процессами
+PARTITIONS_PER_WORKER = 4
+# Статусы, которые дают выручку и занятые ночи
+REVENUE_STATUSES = ("active", "completed")
+
+
+def _add_exact(partials: List[float], value: float):
+    """Точное накопление суммы в виде неперекрывающихся частей (Shewchuk)
+
+    math.fsum(partials) дает корректно округленную сумму всех
+    добавленных чисел независимо от их порядка, поэтому суммы частей
+    отчета, посчитанные в разных процессах, сливаются без погрешности.
+    """
+    i = 0
+    for other in partials:
+        if abs(value) < abs(other):
+            value, other = other, value
+        high = value + other
+        low = other - (high - value)
+        if low:
+            partials[i] = low
+            i += 1
+        value = high
+    partials[i:] = [value]
+
+
+class ReportRow(NamedTuple):
+    """Строка отчета"""
+
+    reservations: int
+    nights: int
+    revenue: float
+
+    @property
+    def average_stay(self) -> float:
+        """Средняя продолжительность проживания, ночей"""
+        return self.nights / self.reservations if self.reservations else 0.0
+
+    @property
+    def average_daily_rate(self) -> float:
+        """Средняя цена проданной ночи (ADR)"""
+        return self.revenue / self.nights if self.nights else 0.0
+
+
+class PartialReport:
+    """Частичные агрегаты по (месяц заезда, тип номера)
+
+    Результаты разных диапазонов бронирований объединяются через merge().
+    """
+
+    __slots__ = ("cells", "cancelled")
+
+    def __init__(self):
+        # (месяц, тип) -> [бронирований, ночей, части суммы выручки]
+        self.cells: Dict[Tuple[str, Optional[str]], list] = {}
+        self.cancelled = 0
+
+    def add(self, month: str, room_type: Optional[str], nights: int, cost: float):
+        cell = self.cells.get((month, room_type))
+        if cell is None:
+            cell = self.cells[(month, room_type)] = [0, 0, []]
+        cell[0] += 1
+        cell[1] += nights
+        _add_exact(cell[2], cost)
+
+    def merge(self, other: "PartialReport") -> "PartialReport":
+        for key, (count, nights, partials) in other.cells.items():
+            cell = self.cells.get(key)
+            if cell is None:
+                self.cells[key] = [count, nights, list(partials)]
+                continue
+            cell[0] += count
+            cell[1] += nights
+            for value in partials:
+                _add_exact(cell[2], value)
+        self.cancelled += other.cancelled
+        return self
+
+
+def _group(cells: dict, key_index: Optional[int]) -> dict:
+    groups = {}
+    for key, (count, nights, partials) in cells.items():
+        group = groups.setdefault(
+            None if key_index is None else key[key_index], [0, 0, []]
+        )
+        group[0] += count
+        group[1] += nights
+        group[2].extend(partials)
+    return {
+        key: ReportRow(count, nights, math.fsum(partials))
+        for key, (count, nights, partials) in sorted(
+            groups.items(), key=lambda item: (item[0] is None, item[0] or "")
+        )
+    }
+
+
+class RevenueReport(NamedTuple):
+    """Отчет по выручке и занятости за всю историю"""
+
+    total: ReportRow
+    by_month: Dict[str, ReportRow]
+    by_room_type: Dict[Optional[str], ReportRow]
+    cancelled: int
+
+    @classmethod
+    def from_partial(cls, partial: PartialReport) -> "RevenueReport":
+        return cls(
+            _group(partial.cells, None).get(None, ReportRow(0, 0, 0.0)),
+            _group(partial.cells, 0),
+            _group(partial.cells, 1),
+            partial.cancelled,
+        )
+
+
+def aggregate_range(db_path: str, first_id: int, last_id: int) -> PartialReport:
+    """Агрегация бронирований с id в [first_id, last_id]
+
+    Выполняется в процессе пула, поэтому открывает собственное
+    соединение только для чтения.
+    """
+    partial = PartialReport()
+    parsed = {}
+
+    def parse(value: str) -> datetime:
+        # Даты повторяются между бронированиями, разбираем каждую один раз
+        result = parsed.get(value)
+        if result is None:
+            result = parsed[value] = datetime.fromisoformat(value)
+        return result
+
+    add = partial.add
+    with DatabaseManager(db_path, read_only=True) as db:
+        for check_in, check_out, cost, status, room_type in db.iter_reservation_facts(
+            first_id, last_id
+        ):
+            if status not in REVENUE_STATUSES:
+                partial.cancelled += 1
+                continue
+            # Ночи считаются так же, как Reservation.get_stay_duration()
+            nights = (parse(check_out) - parse(check_in)).days
+            add(check_in[:7], room_type, nights, cost)
+    return partial
+
+
+def partition(first_id: int, last_id: int, parts: int) -> List[Tuple[int, int]]:
+    """Разбиение [first_id, last_id] на parts смежных диапазонов id"""
+    if parts <= 0:
+        raise ValueError("Количество частей должно быть положительным")
+    if last_id < first_id:
+        return []
+    size = -(-(last_id - first_id + 1) // parts)
+    return [
+        (start, min(start + size - 1, last_id))
+        for start in range(first_id, last_id + 1, size)
+    ]
+
+
+def build_report(db_path: str, workers: int = 0) -> RevenueReport:
+    """Отчет по выручке, средней продолжительности проживания и ADR
+
+    Таблица бронирований делится на диапазоны id, каждый агрегируется
+    отдельно, частичные результаты объединяются. При workers > 1
+    диапазоны обрабатываются в пуле процессов; результат совпадает с
+    однопоточным запуском, так как суммы выручки считаются точно.
+    """
+    with DatabaseManager(db_path, read_only=True) as db:
+        first_id, last_id = db.get_id_bounds("reservations")
+    if workers <= 1:
+        ranges = partition(first_id, last_id, 1)
+        partials = [aggregate_range(db_path, *bounds) for bounds in ranges]
+    else:
+        ranges = partition(first_id, last_id, workers * PARTITIONS_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(aggregate_range, db_path, *bounds) for bounds in ranges
+            ]
+            partials = [future.result() for future in futures]
+    result = PartialReport()
+    for partial in partials:
+        result.merge(partial)
+    return RevenueReport.from_partial(result)
+
+
+def _format_row(label: str, row: ReportRow) -> str:
+    return (
+        f"{label:<10} {row.reservations:>9} {row.nights:>10} {row.revenue:>15.2f} "
+        f"{row.average_stay:>8.2f} {row.average_daily_rate:>9.2f}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Отчет по выручке и занятости за всю историю"
+    )
+    parser.add_argument("--db", default="hotel.db", help="путь к базе данных")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="количество процессов (1 - без пула)",
+    )
+    args = parser.parse_args(argv)
+    report = build_report(args.db, args.workers)
+    header = (
+        f"{'':<10} {'броней':>9} {'ночей':>10} {'выручка':>15} "
+        f"{'ср.ночей':>8} {'ADR':>9}"
+    )
+    print(header)
+    for month, row in report.by_month.items():
+        print(_format_row(month, row))
+    print()
+    for room_type, row in report.by_room_type.items():
+        print(_format_row(room_type or "-", row))
+    print()
+    print(_format_row("Итого", report.total))
+    print(f"Отменено: {report.cancelled}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Type
+
+from .base import BaseEntity
+from .database import DatabaseManager
+from .guest import Guest
+from .reservation import Reservation
+from .room import Room
+
+TABLES = {Room: "rooms", Guest: "guests", Reservation: "reservations"}
+
+
+class LazyCollection:
+    """Коллекция, загружаемая из БД при первом обращении
+
+    Элементы, добавленные до загрузки, дописываются в конец
+    загруженного списка, если их там еще нет.
+    """
+
+    def __init__(self, loader: Callable[[], List]):
+        self._loader = loader
+        self._items: Optional[List] = None
+        self._pending: List = []
+
+    @property
+    def loaded(self) -> bool:
+        return self._items is not None
+
+    def _load(self) -> List:
+        if self._items is None:
+            items = self._loader()
+            seen = {id(item) for item in items}
+            items.extend(item for item in self._pending if id(item) not in seen)
+            self._items = items
+            self._pending = []
+        return self._items
+
+    def append(self, item) -> None:
+        if self._items is None:
+            self._pending.append(item)
+        else:
+            self._items.append(item)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+
+class HotelRepository:
+    """Восстановление сущностей из БД с картой идентичности
+
+    Каждая строка таблицы превращается ровно в один объект: повторная
+    загрузка возвращает уже существующие экземпляры. Вместо БД строки
+    может отдавать снимок (hotel_management.snapshot.Snapshot).
+    """
+
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self._identity: Dict[type, Dict[int, BaseEntity]] = {
+            entity_type: {} for entity_type in TABLES
+        }
+        max_ids = db.get_max_ids()
+        self._max_ids = {
+            entity_type: max_ids[table] for entity_type, table in TABLES.items()
+        }
+        self.reservations = LazyCollection(self.load_reservations)
+
+    def _hydrate(self, entity_type: Type[BaseEntity], rows: Iterable) -> List:
+        identity = self._identity[entity_type]
+        from_row = entity_type.from_row
+        entities = []
+        for row in rows:
+            entity = identity.get(row[0])
+            if entity is None:
+                entity = identity[row[0]] = from_row(row)
+            entities.append(entity)
+        return entities
+
+    def load_rooms(self) -> List[Room]:
+        """Все комнаты из БД"""
+        return self._hydrate(Room, self.db.iter_rooms())
+
+    def load_guests(self) -> List[Guest]:
+        """Все гости из БД"""
+        return self._hydrate(Guest, self.db.iter_guests())
+
+    def load_reservations(self) -> List[Reservation]:
+        """Все бронирования из БД"""
+        return self._hydrate(Reservation, self.db.iter_reservations())
+
+    def get(self, entity_type: Type[BaseEntity], id: int) -> Optional[BaseEntity]:
+        """Уже загруженная или зарегистрированная сущность по id"""
+        return self._identity[entity_type].get(id)
+
+    def register(self, entity: BaseEntity) -> None:
+        """Регистрация новой сущности в карте идентичности"""
+        entity_type = self._entity_type(entity)
+        self._identity[entity_type][entity.id] = entity
+        if entity.id > self._max_ids[entity_type]:
+            self._max_ids[entity_type] = entity.id
+
+    def unregister(self, entity: BaseEntity) -> None:
+        """Удаление сущности, не попавшей в БД, из карты идентичности"""
+        identity = self._identity[self._entity_type(entity)]
+        if identity.get(entity.id) is entity:
+            del identity[entity.id]
+
+    def next_id(self, entity_type: Type[BaseEntity]) -> int:
+        """Следующий свободный id (не резервирует его)"""
+        return self._max_ids[entity_type] + 1
+
+    @staticmethod
+    def _entity_type(entity: BaseEntity) -> type:
+        for entity_type in TABLES:
+            if isinstance(entity, entity_type):
+                return entity_type
+        raise TypeError(f"Неподдерживаемый тип сущности: {type(entity).__name__}")
@@ -1,10 +1,21 @@
 from datetime import datetime, timedelta
 from .base import BaseEntity
+from .metrics import instrument
 
 
 class Reservation(BaseEntity):
     """Класс для представления бронирования"""
 
+    __slots__ = (
+        "_guest_id",
+        "_room_id",
+        "_check_in_date",
+        "_check_out_date",
+        "_num_guests",
+        "_total_cost",
+        "_status",
+    )
+
     def __init__(
         self,
         id: int,
@@ -39,7 +50,9 @@ class Reservation(BaseEntity):
     def check_in_date(self, value: datetime):
         if value < datetime.now():
             raise ValueError("Дата заезда не может быть в прошлом")
-        self._check_in_date = value
+        old, self._check_in_date = self._check_in_date, value
+        if self._observers:
+            self._notify("check_in_date", old, value)
 
     @property
     def check_out_date(self) -> datetime:
@@ -49,7 +62,9 @@ class Reservation(BaseEntity):
     def check_out_date(self, value: datetime):
         if value <= self.check_in_date:
             raise ValueError("Дата выезда должна быть после даты заезда")
-        self._check_out_date = value
+        old, self._check_out_date = self._check_out_date, value
+        if self._observers:
+            self._notify("check_out_date", old, value)
 
     @property
     def num_guests(self) -> int:
@@ -59,7 +74,9 @@ class Reservation(BaseEntity):
     def num_guests(self, value: int):
         if value <= 0:
             raise ValueError("Количество гостей должно быть положительным")
-        self._num_guests = value
+        old, self._num_guests = self._num_guests, value
+        if self._observers:
+            self._notify("num_guests", old, value)
 
     @property
     def total_cost(self) -> float:
@@ -73,7 +90,9 @@ class Reservation(BaseEntity):
     def status(self, value: str):
         if value not in ["active", "cancelled", "completed"]:
             raise ValueError("Некорректный статус бронирования")
-        self._status = value
+        old, self._status = self._status, value
+        if self._observers:
+            self._notify("status", old, value)
 
     def calculate_stay_cost(self, room_price: float) -> float:
         """Расчет стоимости проживания"""
@@ -81,7 +100,9 @@ class Reservation(BaseEntity):
         if nights <= 0:
             raise ValueError("Минимальное время проживания - 1 ночь")
 
-        self._total_cost = room_price * nights
+        old, self._total_cost = self._total_cost, room_price * nights
+        if self._observers:
+            self._notify("total_cost", old, self._total_cost)
         return self._total_cost
 
     def calculate_booking_deposit(self, room_price: float) -> float:
@@ -109,6 +130,44 @@ class Reservation(BaseEntity):
             "created_at": self.created_at.isoformat(),
         }
 
+    def to_row(self) -> tuple:
+        return (
+            self._id,
+            self._guest_id,
+            self._room_id,
+            self._check_in_date.isoformat(),
+            self._check_out_date.isoformat(),
+            self._num_guests,
+            self._total_cost,
+            self._status,
+            self._created_at.isoformat(),
+        )
+
+    @classmethod
+    def from_row(cls, row) -> "Reservation":
+        """Восстановление бронирования из строки таблицы reservations"""
+        (
+            id,
+            guest_id,
+            room_id,
+            check_in_date,
+            check_out_date,
+            num_guests,
+            total_cost,
+            status,
+            created_at,
+        ) = row
+        reservation = cls._restore(id, created_at)
+        reservation._guest_id = guest_id
+        reservation._room_id = room_id
+        reservation._check_in_date = datetime.fromisoformat(check_in_date)
+        reservation._check_out_date = datetime.fromisoformat(check_out_date)
+        reservation._num_guests = num_guests
+        reservation._total_cost = total_cost
+        reservation._status = status
+        return reservation
+
+    @instrument("reservation.validate")
     def validate(self) -> bool:
         if (
             self.guest_id <= 0
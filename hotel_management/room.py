@@ -1,4 +1,5 @@
 from .base import BaseEntity
+from .metrics import instrument
 
 
 class Room(BaseEntity):
@@ -6,6 +7,14 @@ class Room(BaseEntity):
 
     ROOM_TYPES = ["single", "double", "suite", "deluxe"]
 
+    __slots__ = (
+        "_number",
+        "_room_type",
+        "_price_per_night",
+        "_capacity",
+        "_is_available",
+    )
+
     def __init__(
         self,
         id: int,
@@ -29,7 +38,11 @@ class Room(BaseEntity):
     def number(self, value: int):
         if value <= 0:
             raise ValueError("Номер комнаты должен быть положительным числом")
-        self._number = value
+        if self._guards:
+            self._check("number", self._number, value)
+        old, self._number = self._number, value
+        if self._observers:
+            self._notify("number", old, value)
 
     @property
     def room_type(self) -> str:
@@ -41,7 +54,9 @@ class Room(BaseEntity):
             raise ValueError(
                 f"Тип комнаты должен быть одним из: {', '.join(self.ROOM_TYPES)}"
             )
-        self._room_type = value
+        old, self._room_type = self._room_type, value
+        if self._observers:
+            self._notify("room_type", old, value)
 
     @property
     def price_per_night(self) -> float:
@@ -51,7 +66,9 @@ class Room(BaseEntity):
     def price_per_night(self, value: float):
         if value < 0:
             raise ValueError("Цена не может быть отрицательной")
-        self._price_per_night = value
+        old, self._price_per_night = self._price_per_night, value
+        if self._observers:
+            self._notify("price_per_night", old, value)
 
     @property
     def capacity(self) -> int:
@@ -61,7 +78,9 @@ class Room(BaseEntity):
     def capacity(self, value: int):
         if value <= 0:
             raise ValueError("Вместимость должна быть положительным числом")
-        self._capacity = value
+        old, self._capacity = self._capacity, value
+        if self._observers:
+            self._notify("capacity", old, value)
 
     @property
     def is_available(self) -> bool:
@@ -69,7 +88,9 @@ class Room(BaseEntity):
 
     @is_available.setter
     def is_available(self, value: bool):
-        self._is_available = value
+        old, self._is_available = self._is_available, value
+        if self._observers:
+            self._notify("is_available", old, value)
 
     def calculate_stay_cost(self, nights: int) -> float:
         """Расчет стоимости проживания"""
@@ -88,6 +109,30 @@ class Room(BaseEntity):
             "created_at": self.created_at.isoformat(),
         }
 
+    def to_row(self) -> tuple:
+        return (
+            self._id,
+            self._number,
+            self._room_type,
+            self._price_per_night,
+            self._capacity,
+            self._is_available,
+            self._created_at.isoformat(),
+        )
+
+    @classmethod
+    def from_row(cls, row) -> "Room":
+        """Восстановление комнаты из строки таблицы rooms"""
+        id, number, room_type, price_per_night, capacity, is_available, created_at = row
+        room = cls._restore(id, created_at)
+        room._number = number
+        room._room_type = room_type
+        room._price_per_night = price_per_night
+        room._capacity = capacity
+        room._is_available = bool(is_available)
+        return room
+
+    @instrument("room.validate")
     def validate(self) -> bool:
         if (
             self.number <= 0
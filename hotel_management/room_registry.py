@@ -0,0 +1,199 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .room import Room
+
+_NO_ID = float("inf")
+
+
+def _range(keys: List[Tuple], low, high) -> Tuple[int, int]:
+    """Границы среза отсортированного списка (значение, id) для low..high"""
+    start = 0 if low is None else bisect_left(keys, (low, -_NO_ID))
+    stop = len(keys) if high is None else bisect_right(keys, (high, _NO_ID))
+    return start, stop
+
+
+def _discard(keys: List[Tuple], key: Tuple) -> None:
+    """Удаление key из отсортированного списка, если он там есть"""
+    index = bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        del keys[index]
+
+
+class RoomRegistry:
+    """Индексированный реестр номеров в памяти
+
+    Хэш-индексы по id и номеру комнаты, группы по типу и отсортированные
+    индексы (значение, id) по цене (общий и для каждого типа) и
+    вместимости. Поиск по id и номеру - O(1), выборки по диапазону -
+    O(log n + k). Реестр подписывается на сеттеры Room, поэтому индексы
+    обновляются при изменении свойств номера, а занятый другим номером
+    номер комнаты отклоняется до присваивания.
+    """
+
+    def __init__(self, rooms: Iterable[Room] = ()):
+        self._by_id: Dict[int, Room] = {}
+        self._by_number: Dict[int, Room] = {}
+        self._by_type: Dict[str, Dict[int, Room]] = {}
+        self._by_price: List[Tuple[float, int]] = []
+        self._by_type_price: Dict[str, List[Tuple[float, int]]] = {}
+        self._by_capacity: List[Tuple[int, int]] = []
+        for room in rooms:
+            self.add(room)
+
+    def add(self, room: Room) -> None:
+        """Добавление номера в реестр"""
+        if room.id in self._by_id:
+            raise ValueError(f"Номер с id {room.id} уже есть в реестре")
+        if room.number in self._by_number:
+            raise ValueError(f"Комната {room.number} уже есть в реестре")
+        self._by_id[room.id] = room
+        self._by_number[room.number] = room
+        self._index_type(room, room.room_type)
+        insort(self._by_price, (room.price_per_night, room.id))
+        insort(self._by_capacity, (room.capacity, room.id))
+        room.guard(self._check_change)
+        room.subscribe(self._on_change)
+
+    def remove(self, room_id: int) -> Room:
+        """Удаление номера из реестра"""
+        room = self._by_id.pop(room_id)
+        room.unguard(self._check_change)
+        room.unsubscribe(self._on_change)
+        del self._by_number[room.number]
+        self._unindex_type(room, room.room_type, room.price_per_night)
+        _discard(self._by_price, (room.price_per_night, room_id))
+        _discard(self._by_capacity, (room.capacity, room_id))
+        return room
+
+    def _index_type(self, room: Room, room_type: str) -> None:
+        self._by_type.setdefault(room_type, {})[room.id] = room
+        insort(
+            self._by_type_price.setdefault(room_type, []),
+            (room.price_per_night, room.id),
+        )
+
+    def _unindex_type(self, room: Room, room_type: str, price: float) -> None:
+        del self._by_type[room_type][room.id]
+        _discard(self._by_type_price[room_type], (price, room.id))
+
+    def _check_change(self, room: Room, field: str, old, new) -> None:
+        if field == "number" and new != old:
+            other = self._by_number.get(new)
+            if other is not None and other is not room:
+                raise ValueError(f"Комната {new} уже есть в реестре")
+
+    def _on_change(self, room: Room, field: str, old, new) -> None:
+        if old == new:
+            return
+        if field == "number":
+            if self._by_number.get(old) is room:
+                del self._by_number[old]
+            self._by_number[new] = room
+        elif field == "room_type":
+            self._unindex_type(room, old, room.price_per_night)
+            self._index_type(room, new)
+        elif field == "price_per_night":
+            for keys in (self._by_price, self._by_type_price[room.room_type]):
+                _discard(keys, (old, room.id))
+                insort(keys, (new, room.id))
+        elif field == "capacity":
+            _discard(self._by_capacity, (old, room.id))
+            insort(self._by_capacity, (new, room.id))
+
+    def get(self, room_id: int) -> Optional[Room]:
+        """Номер по id"""
+        return self._by_id.get(room_id)
+
+    def get_by_number(self, number: int) -> Optional[Room]:
+        """Номер по номеру комнаты"""
+        return self._by_number.get(number)
+
+    def of_type(self, room_type: str) -> List[Room]:
+        """Номера заданного типа"""
+        return list(self._by_type.get(room_type, {}).values())
+
+    def by_price(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        room_type: Optional[str] = None,
+    ) -> List[Room]:
+        """Номера с ценой в диапазоне, по возрастанию цены"""
+        keys = self._price_keys(room_type)
+        start, stop = _range(keys, min_price, max_price)
+        by_id = self._by_id
+        return [by_id[room_id] for _, room_id in keys[start:stop]]
+
+    def by_capacity(
+        self, min_capacity: Optional[int] = None, max_capacity: Optional[int] = None
+    ) -> List[Room]:
+        """Номера с вместимостью в диапазоне, по возрастанию вместимости"""
+        start, stop = _range(self._by_capacity, min_capacity, max_capacity)
+        by_id = self._by_id
+        return [by_id[room_id] for _, room_id in self._by_capacity[start:stop]]
+
+    def find(
+        self,
+        room_type: Optional[str] = None,
+        min_capacity: Optional[int] = None,
+        max_price: Optional[float] = None,
+        available: Optional[bool] = None,
+        limit: Optional[int] = None,
+    ) -> List[Room]:
+        """Номера, подходящие под все условия, от дешевых к дорогим
+
+        Обходится меньший из диапазонов: ценовой индекс типа (или общий)
+        до max_price или индекс вместимости от min_capacity, остальные
+        условия проверяются на лету. Время - O(log n + m), где m - размер
+        меньшего диапазона (плюс сортировка по цене, если это диапазон
+        вместимости); при обходе по цене с заданным limit обход
+        заканчивается после limit найденных номеров.
+        """
+        keys = self._price_keys(room_type)
+        start, stop = _range(keys, None, max_price)
+        if min_capacity is not None:
+            low, high = _range(self._by_capacity, min_capacity, None)
+            if high - low < stop - start:
+                found = []
+                for _, room_id in self._by_capacity[low:high]:
+                    room = self._by_id[room_id]
+                    if room_type is not None and room.room_type != room_type:
+                        continue
+                    if max_price is not None and room.price_per_night > max_price:
+                        continue
+                    if available is not None and room.is_available != available:
+                        continue
+                    found.append(room)
+                found.sort(key=lambda room: (room.price_per_night, room.id))
+                return found if limit is None else found[:limit]
+        found = []
+        for index in range(start, stop):
+            room = self._by_id[keys[index][1]]
+            if min_capacity is not None and room.capacity < min_capacity:
+                continue
+            if available is not None and room.is_available != available:
+                continue
+            found.append(room)
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+
+    def cheapest(self, **conditions) -> Optional[Room]:
+        """Самый дешевый номер, подходящий под условия find()"""
+        found = self.find(limit=1, **conditions)
+        return found[0] if found else None
+
+    def _price_keys(self, room_type: Optional[str]) -> List[Tuple[float, int]]:
+        if room_type is None:
+            return self._by_price
+        return self._by_type_price.get(room_type, [])
+
+    def __contains__(self, room_id: int) -> bool:
+        return room_id in self._by_id
+
+    def __iter__(self) -> Iterator[Room]:
+        return iter(self._by_id.values())
+
+    def __len__(self) -> int:
+        return len(self._by_id)
@@ -0,0 +1,637 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, Tuple, Union
+
+# Версия схемы хранится в PRAGMA user_version (0 - база создана до версий)
+SCHEMA_VERSION = 2
+EPOCH = datetime(1970, 1, 1)
+
+# Виды столбцов: как логическое значение (строка таблицы v1 и from_row())
+# хранится в физическом столбце схемы v2
+PLAIN = "plain"
+DATETIME = "datetime"  # ISO-строка -> секунды эпохи (REAL, если есть доли)
+ROOM_TYPE = "room_type"  # название типа -> id в таблице room_types
+
+# Столбцы v2 в порядке логических столбцов: (физический, логический, вид)
+V2_COLUMNS: Dict[str, Tuple[Tuple[str, str, str], ...]] = {
+    "rooms": (
+        ("id", "id", PLAIN),
+        ("number", "number", PLAIN),
+        ("type_id", "room_type", ROOM_TYPE),
+        ("price_per_night", "price_per_night", PLAIN),
+        ("capacity", "capacity", PLAIN),
+        ("is_available", "is_available", PLAIN),
+        ("created_at", "created_at", DATETIME),
+    ),
+    "guests": (
+        ("id", "id", PLAIN),
+        ("name", "name", PLAIN),
+        ("email", "email", PLAIN),
+        ("phone", "phone", PLAIN),
+        ("passport", "passport", PLAIN),
+        ("created_at", "created_at", DATETIME),
+    ),
+    "reservations": (
+        ("id", "id", PLAIN),
+        ("guest_id", "guest_id", PLAIN),
+        ("room_id", "room_id", PLAIN),
+        ("check_in", "check_in_date", DATETIME),
+        ("check_out", "check_out_date", DATETIME),
+        ("num_guests", "num_guests", PLAIN),
+        ("total_cost", "total_cost", PLAIN),
+        ("status", "status", PLAIN),
+        ("created_at", "created_at", DATETIME),
+    ),
+}
+TABLES = tuple(V2_COLUMNS)
+
+
+def v2_table(table: str) -> str:
+    """Физическая таблица v2 для логической таблицы"""
+    return f"{table}_v2"
+
+
+def to_epoch(value: Union[datetime, date, str]) -> Union[int, float]:
+    """Дата в секундах эпохи: целое число, дробное - только при микросекундах"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+    delta = value - EPOCH
+    seconds = delta.days * 86400 + delta.seconds
+    if delta.microseconds:
+        return seconds + delta.microseconds / 1e6
+    return seconds
+
+
+@lru_cache(maxsize=65536)
+def from_epoch(value: Union[int, float]) -> str:
+    """Секунды эпохи -> ISO-строка, как datetime.isoformat()
+
+    Даты заездов повторяются, поэтому результат кэшируется.
+    """
+    seconds = int(value)
+    microseconds = round((value - seconds) * 1e6)
+    return (EPOCH + timedelta(seconds=seconds, microseconds=microseconds)).isoformat()
+
+
+def epoch_sql(expr: str) -> str:
+    """SQL: ISO-строка -> секунды эпохи, то же значение, что to_epoch()"""
+    return (
+        f"(CASE WHEN length({expr}) > 19 "
+        f"THEN CAST(strftime('%s', substr({expr}, 1, 19)) AS INTEGER)"
+        f" + CAST(substr({expr}, 21) AS INTEGER) / 1000000.0 "
+        f"ELSE CAST(strftime('%s', {expr}) AS INTEGER) END)"
+    )
+
+
+def iso_sql(expr: str) -> str:
+    """SQL: секунды эпохи -> ISO-строка, как datetime.isoformat()"""
+    whole = f"CAST({expr} AS INTEGER)"
+    return (
+        f"(strftime('%Y-%m-%dT%H:%M:%S', {whole}, 'unixepoch') "
+        f"|| CASE WHEN {expr} = {whole} THEN '' "
+        f"ELSE printf('.%06d', CAST(round(({expr} - {whole}) * 1000000) AS INTEGER))"
+        " END)"
+    )
+
+
+def month_sql(expr: str) -> str:
+    """SQL: секунды эпохи -> месяц YYYY-MM"""
+    return f"strftime('%Y-%m', CAST({expr} AS INTEGER), 'unixepoch')"
+
+
+def room_type_id_sql(expr: str) -> str:
+    return f"(SELECT id FROM room_types WHERE name = {expr})"
+
+
+def logical_columns(table: str, alias: str, decode: bool = True) -> str:
+    """Список SELECT, возвращающий строки v2 в виде строк таблицы v1
+
+    При decode=False даты остаются секундами эпохи: их переводит в
+    ISO-строки DatabaseManager, это быстрее strftime() в SQL.
+    """
+    columns = []
+    for physical, logical, kind in V2_COLUMNS[table]:
+        if kind == DATETIME and decode:
+            columns.append(f"{iso_sql(f'{alias}.{physical}')} AS {logical}")
+        elif kind == ROOM_TYPE:
+            columns.append(f"room_types.name AS {logical}")
+        else:
+            columns.append(f"{alias}.{physical} AS {logical}")
+    return ", ".join(columns)
+
+
+def logical_from(table: str, alias: str) -> str:
+    """FROM для logical_columns(): у комнат название типа берется из room_types"""
+    sql = f"{v2_table(table)} AS {alias}"
+    if table == "rooms":
+        sql += f" LEFT JOIN room_types ON room_types.id = {alias}.type_id"
+    return sql
+
+
+def _physical_value_list(table: str, row: str) -> list:
+    values = []
+    for _, logical, kind in V2_COLUMNS[table]:
+        value = f"{row}.{logical}"
+        if kind == DATETIME:
+            value = epoch_sql(value)
+        elif kind == ROOM_TYPE:
+            value = room_type_id_sql(value)
+        values.append(value)
+    return values
+
+
+def physical_values(table: str, row: str) -> str:
+    """Значения v2 из логических столбцов строки row (NEW или таблица v1)"""
+    return ", ".join(_physical_value_list(table, row))
+
+
+def physical_names(table: str) -> str:
+    return ", ".join(physical for physical, _, _ in V2_COLUMNS[table])
+
+
+def _ensure_room_type(row: str) -> str:
+    return (
+        f"INSERT INTO room_types (name) SELECT {row}.room_type "
+        f"WHERE NOT EXISTS (SELECT 1 FROM room_types WHERE name = {row}.room_type);"
+    )
+
+
+# Схема v1: даты ISO-строками, тип номера текстом
+V1_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS rooms (
+        id INTEGER PRIMARY KEY,
+        number INTEGER UNIQUE NOT NULL,
+        room_type TEXT NOT NULL,
+        price_per_night REAL NOT NULL,
+        capacity INTEGER NOT NULL,
+        is_available BOOLEAN NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS guests (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        phone TEXT NOT NULL,
+        passport TEXT UNIQUE NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reservations (
+        id INTEGER PRIMARY KEY,
+        guest_id INTEGER NOT NULL,
+        room_id INTEGER NOT NULL,
+        check_in_date TEXT NOT NULL,
+        check_out_date TEXT NOT NULL,
+        num_guests INTEGER NOT NULL,
+        total_cost REAL NOT NULL,
+        status TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY (guest_id) REFERENCES guests (id),
+        FOREIGN KEY (room_id) REFERENCES rooms (id)
+    )
+    """,
+    # Индексы для выборок бронирований без полного сканирования
+    """
+    CREATE INDEX IF NOT EXISTS idx_reservations_room_dates
+    ON reservations (room_id, check_in_date, check_out_date)
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_reservations_guest ON reservations (guest_id)",
+    "CREATE INDEX IF NOT EXISTS idx_reservations_status ON reservations (status)",
+)
+
+# Схема v2: даты - секунды эпохи, тип номера - ссылка на room_types
+V2_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS room_types (
+        id INTEGER PRIMARY KEY,
+        name TEXT UNIQUE NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rooms_v2 (
+        id INTEGER PRIMARY KEY,
+        number INTEGER UNIQUE NOT NULL,
+        type_id INTEGER NOT NULL REFERENCES room_types (id),
+        price_per_night REAL NOT NULL,
+        capacity INTEGER NOT NULL,
+        is_available INTEGER NOT NULL CHECK (is_available IN (0, 1)),
+        created_at INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS guests_v2 (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        phone TEXT NOT NULL,
+        passport TEXT UNIQUE NOT NULL,
+        created_at INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reservations_v2 (
+        id INTEGER PRIMARY KEY,
+        guest_id INTEGER NOT NULL REFERENCES guests_v2 (id),
+        room_id INTEGER NOT NULL REFERENCES rooms_v2 (id),
+        check_in INTEGER NOT NULL,
+        check_out INTEGER NOT NULL,
+        num_guests INTEGER NOT NULL,
+        total_cost REAL NOT NULL,
+        status TEXT NOT NULL,
+        created_at INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_reservations_v2_room_dates
+    ON reservations_v2 (room_id, check_in, check_out)
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_reservations_v2_guest ON reservations_v2 (guest_id)",
+    "CREATE INDEX IF NOT EXISTS idx_reservations_v2_status ON reservations_v2 (status)",
+)
+
+INSERT_ROOM_TYPE_SQL = "INSERT OR IGNORE INTO room_types (name) VALUES (?)"
+
+
+def _views() -> tuple:
+    """Представления rooms/guests/reservations с прежними столбцами поверх v2
+
+    Запросы и записи в старые имена таблиц (соединения, открытые до
+    миграции, внешние инструменты) продолжают работать: чтение идет
+    через представления, запись - через триггеры INSTEAD OF.
+    """
+    statements = []
+    for table in TABLES:
+        target = v2_table(table)
+        ensure = _ensure_room_type("NEW") if table == "rooms" else ""
+        assignments = ", ".join(
+            f"{physical} = {value}"
+            for (physical, _, _), value in zip(
+                V2_COLUMNS[table], _physical_value_list(table, "NEW")
+            )
+        )
+        statements += [
+            f"CREATE VIEW IF NOT EXISTS {table} AS "
+            f"SELECT {logical_columns(table, 't')} FROM {logical_from(table, 't')}",
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_insert INSTEAD OF INSERT ON {table}
+            BEGIN
+                {ensure}
+                INSERT INTO {target} ({physical_names(table)})
+                VALUES ({physical_values(table, "NEW")});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_update INSTEAD OF UPDATE ON {table}
+            BEGIN
+                {ensure}
+                UPDATE {target} SET {assignments} WHERE id = OLD.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_delete INSTEAD OF DELETE ON {table}
+            BEGIN
+                DELETE FROM {target} WHERE id = OLD.id;
+            END
+            """,
+        ]
+    return tuple(statements)
+
+
+V2_VIEWS = _views()
+
+# Таблицы, общие для всех версий
+COMMON_TABLES = (
+    # Позиции незавершенных импортов (hotel_management.importer)
+    """
+    CREATE TABLE IF NOT EXISTS import_checkpoints (
+        source TEXT PRIMARY KEY,
+        position TEXT NOT NULL,
+        records INTEGER NOT NULL,
+        imported INTEGER NOT NULL,
+        rejected INTEGER NOT NULL,
+        updated_at TEXT NOT NULL,
+        reasons TEXT NOT NULL DEFAULT '{}'
+    )
+    """,
+)
+
+# Досоздание столбца причин отказов в таблице точек импорта прежних баз
+IMPORT_REASONS_COLUMN_SQL = (
+    "ALTER TABLE import_checkpoints ADD COLUMN reasons TEXT NOT NULL DEFAULT '{}'"
+)
+
+# Журнал изменений строк v2 для обновления снимков (hotel_management.snapshot):
+# включается DatabaseManager.enable_change_log(), seq растет монотонно
+CHANGE_LOG_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS change_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL
+    )
+    """,
+    # Токен отличает базу от ее копий, pruned - последний удаленный seq
+    """
+    CREATE TABLE IF NOT EXISTS change_log_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        token TEXT NOT NULL,
+        pruned INTEGER NOT NULL
+    )
+    """,
+)
+
+
+def change_log_triggers() -> tuple:
+    """Триггеры на таблицах v2: id вставленных, измененных и удаленных строк"""
+    statements = []
+    for table in TABLES:
+        log = f"INSERT INTO change_log (table_name, row_id) VALUES ('{table}', "
+        statements += [
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_log_insert
+            AFTER INSERT ON {v2_table(table)}
+            BEGIN
+                {log}NEW.id);
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_log_update
+            AFTER UPDATE ON {v2_table(table)}
+            BEGIN
+                INSERT INTO change_log (table_name, row_id)
+                SELECT '{table}', OLD.id WHERE OLD.id != NEW.id;
+                {log}NEW.id);
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_log_delete
+            AFTER DELETE ON {v2_table(table)}
+            BEGIN
+                {log}OLD.id);
+            END
+            """,
+        ]
+    return tuple(statements)
+
+
+CHANGE_LOG_TRIGGERS = change_log_triggers()
+
+# Запросы DatabaseManager, текст которых зависит от версии схемы.
+# Чтения без условий на даты идут через имена rooms/guests/reservations:
+# в v1 это таблицы, в v2 - представления.
+_SELECT_V1 = {
+    table: f"SELECT {', '.join(logical for _, logical, _ in V2_COLUMNS[table])} "
+    f"FROM {table} AS t"
+    for table in TABLES
+}
+_SELECT_V2 = {
+    table: f"SELECT {logical_columns(table, 't', decode=False)} "
+    f"FROM {logical_from(table, 't')}"
+    for table in TABLES
+}
+
+QUERIES: Dict[int, Dict[str, str]] = {
+    1: {
+        **{f"select_{table}": sql for table, sql in _SELECT_V1.items()},
+        "insert_room": """
+            INSERT OR REPLACE INTO rooms
+            (id, number, room_type, price_per_night, capacity, is_available, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        "insert_guest": """
+            INSERT OR REPLACE INTO guests
+            (id, name, email, phone, passport, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        "insert_reservation": """
+            INSERT OR REPLACE INTO reservations
+            (id, guest_id, room_id, check_in_date, check_out_date,
+             num_guests, total_cost, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        # Активное бронирование номера, пересекающееся с периодом [заезд, выезд)
+        "overlap": """
+            SELECT id FROM reservations
+            WHERE room_id = ? AND status != 'cancelled'
+              AND check_in_date < ? AND check_out_date > ?
+            LIMIT 1
+        """,
+        "double_bookings": """
+            SELECT a.id, b.id FROM reservations AS a
+            JOIN reservations AS b
+              ON b.room_id = a.room_id AND b.id > a.id
+             AND b.check_in_date < a.check_out_date
+             AND b.check_out_date > a.check_in_date
+            WHERE a.status != 'cancelled' AND b.status != 'cancelled'
+            ORDER BY a.id, b.id
+        """,
+        "update_cost": "UPDATE reservations SET total_cost = ? WHERE id = ?",
+        "set_status": "UPDATE reservations SET status = ? WHERE id = ?",
+        "room_reservations": f"""
+            {_SELECT_V1['reservations']}
+            WHERE room_id = ? AND check_in_date < ? AND check_out_date > ?
+              AND (? OR status != 'cancelled')
+            ORDER BY check_in_date
+        """,
+        "guest_reservations": f"""
+            {_SELECT_V1['reservations']}
+            WHERE guest_id = ? AND status = 'active'
+            ORDER BY check_in_date
+        """,
+        "reservations_by_status": f"""
+            {_SELECT_V1['reservations']}
+            WHERE status = ? ORDER BY id LIMIT ?
+        """,
+        "status_page": f"""
+            {_SELECT_V1['reservations']}
+            WHERE status = ? AND id > ? AND check_out_date > ?
+            ORDER BY id LIMIT ?
+        """,
+        "active_reservations": f"""
+            {_SELECT_V1['reservations']}
+            WHERE status != 'cancelled' AND check_out_date > ?
+        """,
+        "reservation_facts": """
+            SELECT r.check_in_date, r.check_out_date, r.total_cost, r.status,
+                   rooms.room_type
+            FROM reservations AS r LEFT JOIN rooms ON rooms.id = r.room_id
+            WHERE r.id BETWEEN ? AND ?
+        """,
+        "room_statistics": """
+            SELECT room_type, COUNT(*), COALESCE(SUM(is_available), 0)
+            FROM rooms GROUP BY room_type
+        """,
+        "reservation_statistics": """
+            SELECT rooms.room_type, substr(r.check_in_date, 1, 7), r.status,
+                   COUNT(*), COALESCE(SUM(r.total_cost), 0)
+            FROM reservations AS r LEFT JOIN rooms ON rooms.id = r.room_id
+            GROUP BY 1, 2, 3
+        """,
+    },
+    2: {
+        # Даты в выборках - секунды эпохи, строки переводит DatabaseManager
+        **{f"select_{table}": sql for table, sql in _SELECT_V2.items()},
+        # Тип номера должен быть в room_types до вставки (DatabaseManager)
+        "insert_room": f"""
+            INSERT OR REPLACE INTO rooms_v2 ({physical_names('rooms')})
+            VALUES (?, ?, {room_type_id_sql('?')}, ?, ?, ?, ?)
+        """,
+        "insert_guest": f"""
+            INSERT OR REPLACE INTO guests_v2 ({physical_names('guests')})
+            VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        "insert_reservation": f"""
+            INSERT OR REPLACE INTO reservations_v2 ({physical_names('reservations')})
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        "overlap": """
+            SELECT id FROM reservations_v2
+            WHERE room_id = ? AND status != 'cancelled'
+              AND check_in < ? AND check_out > ?
+            LIMIT 1
+        """,
+        "double_bookings": """
+            SELECT a.id, b.id FROM reservations_v2 AS a
+            JOIN reservations_v2 AS b
+              ON b.room_id = a.room_id AND b.id > a.id
+             AND b.check_in < a.check_out
+             AND b.check_out > a.check_in
+            WHERE a.status != 'cancelled' AND b.status != 'cancelled'
+            ORDER BY a.id, b.id
+        """,
+        "update_cost": "UPDATE reservations_v2 SET total_cost = ? WHERE id = ?",
+        "set_status": "UPDATE reservations_v2 SET status = ? WHERE id = ?",
+        "room_reservations": f"""
+            {_SELECT_V2['reservations']}
+            WHERE t.room_id = ? AND t.check_in < ? AND t.check_out > ?
+              AND (? OR t.status != 'cancelled')
+            ORDER BY t.check_in
+        """,
+        "guest_reservations": f"""
+            {_SELECT_V2['reservations']}
+            WHERE t.guest_id = ? AND t.status = 'active'
+            ORDER BY t.check_in
+        """,
+        "reservations_by_status": f"""
+            {_SELECT_V2['reservations']}
+            WHERE t.status = ? ORDER BY t.id LIMIT ?
+        """,
+        "status_page": f"""
+            {_SELECT_V2['reservations']}
+            WHERE t.status = ? AND t.id > ? AND t.check_out > ?
+            ORDER BY t.id LIMIT ?
+        """,
+        "active_reservations": f"""
+            {_SELECT_V2['reservations']}
+            WHERE t.status != 'cancelled' AND t.check_out > ?
+        """,
+        "reservation_facts": """
+            SELECT r.check_in, r.check_out, r.total_cost, r.status, room_types.name
+            FROM reservations_v2 AS r
+            LEFT JOIN rooms_v2 ON rooms_v2.id = r.room_id
+            LEFT JOIN room_types ON room_types.id = rooms_v2.type_id
+            WHERE r.id BETWEEN ? AND ?
+        """,
+        "room_statistics": """
+            SELECT room_types.name, COUNT(*), COALESCE(SUM(r.is_available), 0)
+            FROM rooms_v2 AS r LEFT JOIN room_types ON room_types.id = r.type_id
+            GROUP BY r.type_id
+        """,
+        # Сначала группы по дням (целочисленное деление), месяц по дню
+        # вычисляется уже для групп: strftime() на каждую строку дороже
+        "reservation_statistics": f"""
+            SELECT room_types.name, {month_sql('g.day * 86400')}, g.status,
+                   SUM(g.count), SUM(g.total)
+            FROM (
+                SELECT rooms_v2.type_id AS type_id,
+                       CAST(r.check_in AS INTEGER) / 86400 AS day,
+                       r.status AS status, COUNT(*) AS count,
+                       COALESCE(SUM(r.total_cost), 0) AS total
+                FROM reservations_v2 AS r
+                LEFT JOIN rooms_v2 ON rooms_v2.id = r.room_id
+                GROUP BY 1, 2, 3
+            ) AS g
+            LEFT JOIN room_types ON room_types.id = g.type_id
+            GROUP BY 1, 2, 3
+        """,
+    },
+}
+
+for _queries in QUERIES.values():
+    # Без OR REPLACE: совпадение id с чужим бронированием - ошибка, а не перезапись
+    _queries["book_reservation"] = _queries["insert_reservation"].replace(
+        "INSERT OR REPLACE", "INSERT"
+    )
+
+
+def sync_triggers() -> tuple:
+    """Триггеры на таблицах v1: изменения во время миграции копируются в v2"""
+    statements = []
+    for table in TABLES:
+        target = v2_table(table)
+        ensure = _ensure_room_type("NEW") if table == "rooms" else ""
+        upsert = (
+            f"INSERT OR REPLACE INTO {target} ({physical_names(table)}) "
+            f"VALUES ({physical_values(table, 'NEW')});"
+        )
+        statements += [
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_sync_insert AFTER INSERT ON {table}
+            BEGIN
+                {ensure}
+                {upsert}
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_sync_update AFTER UPDATE ON {table}
+            BEGIN
+                DELETE FROM {target} WHERE id = OLD.id AND OLD.id != NEW.id;
+                {ensure}
+                {upsert}
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_sync_delete AFTER DELETE ON {table}
+            BEGIN
+                DELETE FROM {target} WHERE id = OLD.id;
+            END
+            """,
+        ]
+    return tuple(statements)
+
+
+SYNC_TRIGGERS = sync_triggers()
+SYNC_TRIGGER_NAMES = tuple(
+    f"{table}_sync_{event}"
+    for table in TABLES
+    for event in ("insert", "update", "delete")
+)
+
+# Перенос строк v1 с id в (?, ?] в таблицы v2
+COPY_SQL = {
+    table: f"""
+        INSERT OR REPLACE INTO {v2_table(table)} ({physical_names(table)})
+        SELECT {physical_values(table, table)} FROM {table}
+        WHERE id > ? AND id <= ?
+    """
+    for table in TABLES
+}
+COPY_ROOM_TYPES_SQL = """
+    INSERT INTO room_types (name)
+    SELECT DISTINCT room_type FROM rooms
+    WHERE id > ? AND id <= ? AND room_type NOT IN (SELECT name FROM room_types)
+"""
+
+# Позиция миграции: последний перенесенный id каждой таблицы
+MIGRATION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migration (
+        table_name TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL
+    )
+"""
@@ -0,0 +1,178 @@
+import heapq
+from array import array
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .guest import Guest
+
+# Поля в порядке важности для ранжирования
+SEARCH_FIELDS = ("name", "email", "phone", "passport")
+GRAM_SIZE = 3
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def _match_rank(query: str, fields: Tuple[str, ...]) -> Tuple[int, int]:
+    """Ранг совпадения: точное, с начала поля, с начала слова, подстрока"""
+    best = (4, 0)
+    for position, value in enumerate(fields):
+        index = value.find(query)
+        if index < 0:
+            continue
+        if value == query:
+            rank = (0, position)
+        elif index == 0:
+            rank = (1, position)
+        elif not value[index - 1].isalnum():
+            rank = (2, position)
+        else:
+            rank = (3, position)
+        if rank < best:
+            best = rank
+    return best
+
+
+class GuestSearchIndex:
+    """Триграммный инвертированный индекс для поиска гостей
+
+    Находит тех же гостей, что и оператор `query in guest`
+    (Guest.__contains__), но проверяет подстроку только у гостей из
+    самого короткого списка среди триграмм запроса. Индекс обновляется
+    при добавлении гостя и при изменении его полей через сеттеры.
+
+    Списки id хранятся компактно в array и только дополняются: после
+    изменения или удаления гостя устаревшие записи отсеиваются проверкой
+    текста и убираются при периодической перестройке списков.
+    """
+
+    def __init__(self, guests: Iterable[Guest] = ()):
+        self._postings: Dict[str, array] = {}
+        self._fields: Dict[int, Tuple[str, ...]] = {}
+        self._texts: Dict[int, str] = {}
+        self._guests: Dict[int, Guest] = {}
+        self._stale = 0
+        self._entries = 0
+        for guest in guests:
+            self.add(guest)
+
+    @staticmethod
+    def _fields_of(guest: Guest) -> Tuple[str, ...]:
+        return tuple(str(getattr(guest, field)).lower() for field in SEARCH_FIELDS)
+
+    def _index(self, guest_id: int, fields: Tuple[str, ...], old_grams=()) -> None:
+        # Тот же текст, что строит Guest.__contains__
+        text = " ".join(fields)
+        self._fields[guest_id] = fields
+        self._texts[guest_id] = text
+        postings = self._postings
+        new_grams = _grams(text)
+        added = new_grams.difference(old_grams)
+        for gram in added:
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("q")
+            posting.append(guest_id)
+        self._entries += len(added)
+        self._stale += len(set(old_grams).difference(new_grams))
+
+    def _unindex(self, guest_id: int) -> Set[str]:
+        """Удаление текста гостя; записи в списках становятся устаревшими"""
+        text = self._texts.pop(guest_id)
+        del self._fields[guest_id]
+        return _grams(text)
+
+    def _compact(self) -> None:
+        """Перестройка списков без устаревших записей"""
+        texts = self._texts
+        for gram, posting in list(self._postings.items()):
+            alive = array(
+                "q",
+                dict.fromkeys(
+                    guest_id
+                    for guest_id in posting
+                    if guest_id in texts and gram in texts[guest_id]
+                ),
+            )
+            if alive:
+                self._postings[gram] = alive
+            else:
+                del self._postings[gram]
+        self._entries = sum(len(posting) for posting in self._postings.values())
+        self._stale = 0
+
+    def _maybe_compact(self) -> None:
+        if self._stale > self._entries // 2:
+            self._compact()
+
+    def add(self, guest: Guest) -> None:
+        """Добавление гостя и подписка на изменения его полей"""
+        if guest.id in self._guests:
+            self.remove(guest.id)
+        self._guests[guest.id] = guest
+        self._index(guest.id, self._fields_of(guest))
+        guest.subscribe(self._on_change)
+
+    def update(self, guest: Guest) -> None:
+        """Переиндексация гостя после изменения данных"""
+        if guest.id not in self._guests:
+            self.add(guest)
+            return
+        fields = self._fields_of(guest)
+        if fields != self._fields[guest.id]:
+            # Граммы, уже записанные на этого гостя, повторно не добавляются
+            old_grams = self._unindex(guest.id)
+            self._index(guest.id, fields, old_grams)
+            self._maybe_compact()
+
+    def remove(self, guest_id: int) -> None:
+        """Удаление гостя из индекса"""
+        guest = self._guests.pop(guest_id)
+        guest.unsubscribe(self._on_change)
+        self._stale += len(self._unindex(guest_id))
+        self._maybe_compact()
+
+    def _on_change(self, guest: Guest, field: str, old, new) -> None:
+        if field in SEARCH_FIELDS:
+            self.update(guest)
+
+    def _candidates(self, query: str) -> Iterable[int]:
+        if len(query) < GRAM_SIZE:
+            # Слишком короткий запрос: триграмм нет, проверяем все тексты
+            return self._texts.keys()
+        shortest = None
+        for gram in _grams(query):
+            posting = self._postings.get(gram)
+            if not posting:
+                return ()
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+        # Повторы возможны после изменения данных гостя
+        return dict.fromkeys(shortest)
+
+    def search(self, query: str, limit: int = 20) -> List[Guest]:
+        """Гости, содержащие подстроку query, лучшие совпадения первыми"""
+        query = query.lower()
+        texts = self._texts
+        matches = [
+            guest_id
+            for guest_id in self._candidates(query)
+            if query in texts.get(guest_id, "")
+        ]
+        fields = self._fields
+        ranked = heapq.nsmallest(
+            limit,
+            matches,
+            key=lambda guest_id: (
+                _match_rank(query, fields[guest_id]),
+                fields[guest_id][0],
+                guest_id,
+            ),
+        )
+        return [self._guests[guest_id] for guest_id in ranked]
+
+    def __contains__(self, guest_id: int) -> bool:
+        return guest_id in self._guests
+
+    def __len__(self) -> int:
+        return len(self._guests)
@@ -0,0 +1,548 @@
+import argparse
+import asyncio
+import itertools
+import json
+from collections import OrderedDict
+from datetime import date, datetime, time
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from .async_db import AsyncDatabaseManager
+from .availability import AvailabilityEngine
+from .database import BookingConflictError, DatabaseManager
+from .occupancy import OccupancyCalendar
+from .reservation import Reservation
+from .room import Room
+from .room_registry import RoomRegistry
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+# Результатов поиска свободных номеров в кэше
+AVAILABILITY_CACHE_SIZE = 1024
+MAX_BODY_SIZE = 64 * 1024
+REFRESH_PAGE_SIZE = 1000
+# Интервал опроса БД на бронирования и отмены других клиентов, с
+SYNC_INTERVAL = 1.0
+
+
+def _parse_date(value: Optional[str], field: str) -> datetime:
+    if not value:
+        raise ValueError(f"{field}: поле отсутствует")
+    try:
+        return datetime.combine(date.fromisoformat(value), time())
+    except (TypeError, ValueError):
+        raise ValueError(f"{field}: ожидается дата YYYY-MM-DD") from None
+
+
+def _parse_int(value, field: str, default: Optional[int] = None) -> int:
+    if value is None or value == "":
+        if default is None:
+            raise ValueError(f"{field}: поле отсутствует")
+        return default
+    if isinstance(value, bool):
+        raise ValueError(f"{field}: ожидается целое число")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field}: ожидается целое число") from None
+
+
+def _encode(payload: dict) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _reservation_changes(db: DatabaseManager, after: int) -> tuple:
+    """Состояние журнала изменений и id бронирований, измененных после after"""
+    state = db.get_change_log_state()
+    return state, db.get_changes(after)["reservations"]
+
+
+def _load_indexes(db: DatabaseManager) -> tuple:
+    """Индексы занятости, заново построенные по БД"""
+    return (
+        AvailabilityEngine.from_database(db, date.today()),
+        OccupancyCalendar.from_database(db, date.today()),
+    )
+
+
+def _room_json(room: Room) -> dict:
+    return {
+        "id": room.id,
+        "number": room.number,
+        "room_type": room.room_type,
+        "price_per_night": room.price_per_night,
+        "capacity": room.capacity,
+    }
+
+
+class BookingService:
+    """Сервис бронирования поверх теплых индексов в памяти
+
+    Номера и занятость загружаются при запуске и обновляются самим
+    сервисом; записи идут через AsyncDatabaseManager, который
+    объединяет одновременные бронирования в общие транзакции.
+    Одинаковые запросы свободных номеров склеиваются: результат и
+    готовый JSON-ответ хранятся, пока бронирование на пересекающиеся
+    даты не изменит занятость. Бронирования и отмены других клиентов
+    БД подхватываются sync() по журналу изменений (в схеме v1 - только
+    новые бронирования по id).
+    """
+
+    def __init__(self, db_path: str = "hotel.db"):
+        with DatabaseManager(db_path) as db:
+            # Позиция журнала берется до загрузки индексов: изменения
+            # между ними будут применены повторно, а не потеряны
+            self._change_mark: Optional[int] = None
+            if db.schema_version >= 2:
+                db.enable_change_log()
+                self._change_mark = db.get_change_log_state()[2]
+            max_ids = db.get_max_ids()
+            self.rooms = RoomRegistry(db.iter_rooms(row_format="entity"))
+            self.availability, self.occupancy = _load_indexes(db)
+            self._guest_ids = {row[0] for row in db.iter_guests()}
+        self._max_room_id = max_ids["rooms"]
+        self._max_guest_id = max_ids["guests"]
+        self._max_reservation_id = max_ids["reservations"]
+        self._synced_at: Optional[float] = None
+        self.db = AsyncDatabaseManager(db_path)
+        # (заезд, выезд, тип, гостей) -> [id свободных номеров, JSON-ответ]
+        self._cache: OrderedDict = OrderedDict()
+        # JSON-описания номеров для сборки ответа без повторной сериализации
+        self._room_bodies: Dict[int, bytes] = {}
+        # Временные ключи бронирований до получения id от БД
+        self._pending_ids = itertools.count(-1, -1)
+        self.coalesced = 0
+
+    async def close(self):
+        await self.db.close()
+
+    async def _refresh(self):
+        """Подгрузка номеров и гостей, добавленных в БД другими клиентами"""
+        while True:
+            rooms = await self.db.get_rooms_page(
+                self._max_room_id, REFRESH_PAGE_SIZE, "entity"
+            )
+            for room in rooms:
+                # Параллельное обновление могло уже добавить этот номер
+                if room.id not in self.rooms:
+                    self.rooms.add(room)
+                    self.availability.add_room(room)
+                    self.occupancy.add_room(room)
+                self._max_room_id = max(self._max_room_id, room.id)
+            if len(rooms) < REFRESH_PAGE_SIZE:
+                break
+        while True:
+            guests = await self.db.get_guests_page(
+                self._max_guest_id, REFRESH_PAGE_SIZE
+            )
+            self._guest_ids.update(row[0] for row in guests)
+            if guests:
+                self._max_guest_id = max(self._max_guest_id, guests[-1][0])
+            if len(guests) < REFRESH_PAGE_SIZE:
+                break
+        self._cache.clear()
+
+    def _apply_reservation(self, reservation_id: int, row: Optional[tuple]):
+        """Занятость по строке бронирования из БД (None - строки нет)"""
+        for index in (self.availability, self.occupancy):
+            index.cancel_reservation(reservation_id)
+            if row is not None and row[7] != "cancelled":
+                index.add_booking(reservation_id, row[2], row[3], row[4])
+
+    async def sync(self):
+        """Бронирования и отмены, записанные в БД другими клиентами"""
+        if self._change_mark is None:
+            # Схема v1 без журнала: только новые бронирования
+            changed = False
+            while True:
+                rows = await self.db.get_reservations_page(
+                    self._max_reservation_id, REFRESH_PAGE_SIZE
+                )
+                for row in rows:
+                    self._apply_reservation(row[0], row)
+                if rows:
+                    changed = True
+                    self._max_reservation_id = rows[-1][0]
+                if len(rows) < REFRESH_PAGE_SIZE:
+                    break
+        else:
+            state, ids = await self.db.read(_reservation_changes, self._change_mark)
+            _, pruned, mark = state
+            if pruned > self._change_mark:
+                # Журнал очищен дальше нашей позиции: индексы строятся заново
+                self.availability, self.occupancy = await self.db.read(_load_indexes)
+                changed = True
+            else:
+                rows = await self.db.read(DatabaseManager.get_rows, "reservations", ids)
+                found = {row[0]: row for row in rows}
+                for reservation_id in ids:
+                    self._apply_reservation(reservation_id, found.get(reservation_id))
+                changed = bool(ids)
+            self._change_mark = mark
+        if changed:
+            self._cache.clear()
+
+    async def _maybe_sync(self):
+        """sync() не чаще раза в SYNC_INTERVAL"""
+        now = asyncio.get_running_loop().time()
+        if self._synced_at is None or now - self._synced_at >= SYNC_INTERVAL:
+            self._synced_at = now
+            await self.sync()
+
+    async def _load_room(self, room_id: int):
+        """Загрузка бронирований номера из БД после конфликта при записи"""
+        horizon = date.fromordinal(self.occupancy.origin + self.occupancy.horizon)
+        rows = await self.db.get_room_reservations(room_id, date.today(), horizon)
+        for row in rows:
+            for index in (self.availability, self.occupancy):
+                index.add_booking(
+                    row["id"], room_id, row["check_in_date"], row["check_out_date"]
+                )
+        self._cache.clear()
+
+    async def _room(self, room_id: int) -> Room:
+        room = self.rooms.get(room_id)
+        if room is None:
+            await self._refresh()
+            room = self.rooms.get(room_id)
+            if room is None:
+                raise LookupError("Номер не найден")
+        return room
+
+    def _invalidate(self, check_in: datetime, check_out: datetime):
+        """Сброс кэшированных поисков, пересекающихся с периодом"""
+        stale = [key for key in self._cache if key[0] < check_out and key[1] > check_in]
+        for key in stale:
+            del self._cache[key]
+
+    def _search(
+        self,
+        check_in: datetime,
+        check_out: datetime,
+        room_type: Optional[str],
+        guests: int,
+    ) -> list:
+        """Запись кэша поиска: [id свободных номеров, JSON-ответ]"""
+        if check_out <= check_in:
+            raise ValueError("Минимальное время проживания - 1 ночь")
+        if room_type is not None and room_type not in Room.ROOM_TYPES:
+            raise ValueError("Некорректный тип комнаты")
+        key = (check_in, check_out, room_type, guests)
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            self.coalesced += 1
+            return entry
+        get = self.rooms.get
+        room_ids = [
+            room_id
+            for room_id in self.availability.free_rooms(check_in, check_out, room_type)
+            if (room := get(room_id)) is not None and room.capacity >= guests
+        ]
+        entry = self._cache[key] = [room_ids, None]
+        if len(self._cache) > AVAILABILITY_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return entry
+
+    def find_available(
+        self,
+        check_in: datetime,
+        check_out: datetime,
+        room_type: Optional[str] = None,
+        guests: int = 1,
+    ) -> List[dict]:
+        """Свободные на период номера подходящего типа и вместимости"""
+        get = self.rooms.get
+        return [
+            _room_json(get(room_id))
+            for room_id in self._search(check_in, check_out, room_type, guests)[0]
+        ]
+
+    def _find_available_body(
+        self,
+        check_in: datetime,
+        check_out: datetime,
+        room_type: Optional[str],
+        guests: int,
+    ) -> bytes:
+        """Готовый JSON-ответ поиска из описаний номеров"""
+        entry = self._search(check_in, check_out, room_type, guests)
+        if entry[1] is None:
+            bodies = self._room_bodies
+            parts = []
+            for room_id in entry[0]:
+                body = bodies.get(room_id)
+                if body is None:
+                    body = bodies[room_id] = _encode(
+                        _room_json(self.rooms.get(room_id))
+                    )
+                parts.append(body)
+            entry[1] = b'{"rooms": [' + b", ".join(parts) + b"]}"
+        return entry[1]
+
+    def _reservation(
+        self,
+        room: Room,
+        guest_id: int,
+        check_in: datetime,
+        check_out: datetime,
+        num_guests: int,
+    ) -> Reservation:
+        reservation = Reservation(
+            None, guest_id, room.id, check_in, check_out, num_guests
+        )
+        reservation.calculate_stay_cost(room.price_per_night)
+        if not reservation.validate():
+            raise ValueError("Некорректные данные бронирования")
+        if reservation.get_available_beds(room.capacity) < 0:
+            raise ValueError("Количество гостей больше вместимости номера")
+        return reservation
+
+    async def quote(
+        self, room_id: int, check_in: datetime, check_out: datetime, num_guests: int
+    ) -> dict:
+        """Стоимость проживания, депозит и занятость номера на период"""
+        room = await self._room(room_id)
+        reservation = self._reservation(room, 1, check_in, check_out, num_guests)
+        return {
+            "room_id": room.id,
+            "nights": reservation.get_stay_duration(),
+            "stay_cost": reservation.total_cost,
+            "deposit": reservation.calculate_booking_deposit(room.price_per_night),
+            "available_beds": reservation.get_available_beds(room.capacity),
+            "available": self.availability.is_room_free(room.id, check_in, check_out),
+        }
+
+    async def book(
+        self,
+        guest_id: int,
+        room_id: int,
+        check_in: datetime,
+        check_out: datetime,
+        num_guests: int,
+    ) -> dict:
+        """Бронирование номера, если он свободен на весь период"""
+        room = await self._room(room_id)
+        if guest_id not in self._guest_ids:
+            await self._refresh()
+            if guest_id not in self._guest_ids:
+                raise LookupError("Гость не найден")
+        if check_in.date() < date.today():
+            raise ValueError("Дата заезда не может быть в прошлом")
+        reservation = self._reservation(room, guest_id, check_in, check_out, num_guests)
+        # Проверка и захват дат без await между ними: другие корутины
+        # видят номер занятым еще до записи в БД
+        if not self.availability.is_room_free(room.id, check_in, check_out):
+            raise BookingConflictError("Номер занят на выбранные даты")
+        pending_id = next(self._pending_ids)
+        self.availability.add_booking(pending_id, room.id, check_in, check_out)
+        self.occupancy.add_booking(pending_id, room.id, check_in, check_out)
+        self._invalidate(check_in, check_out)
+        try:
+            # Повторная проверка в БД: номер мог занять другой процесс
+            reservation_id = await self.db.book_if_free(reservation)
+        except BaseException as e:
+            self.availability.cancel_reservation(pending_id)
+            self.occupancy.cancel_reservation(pending_id)
+            self._invalidate(check_in, check_out)
+            if isinstance(e, BookingConflictError):
+                # Номер занял другой клиент БД: его бронирования
+                # загружаются, чтобы поиск перестал предлагать номер
+                await self._load_room(room.id)
+            raise
+        self.availability.cancel_reservation(pending_id)
+        self.availability.add_booking(reservation_id, room.id, check_in, check_out)
+        self.occupancy.cancel_reservation(pending_id)
+        self.occupancy.add_booking(reservation_id, room.id, check_in, check_out)
+        return {
+            "id": reservation_id,
+            "room_id": room.id,
+            "guest_id": guest_id,
+            "total_cost": reservation.total_cost,
+            "deposit": reservation.calculate_booking_deposit(room.price_per_night),
+        }
+
+    async def cancel(self, reservation_id: int) -> dict:
+        """Отмена бронирования"""
+        if not await self.db.set_reservation_status(reservation_id, "cancelled"):
+            raise LookupError("Бронирование не найдено")
+        self.occupancy.cancel_reservation(reservation_id)
+        if self.availability.cancel_reservation(reservation_id):
+            # Период отмененного бронирования не хранится отдельно
+            self._cache.clear()
+        return {"id": reservation_id, "status": "cancelled"}
+
+    def occupancy_report(
+        self, check_in: datetime, check_out: datetime, room_type: Optional[str]
+    ) -> dict:
+        """Загрузка номеров за период: доля занятых номеро-ночей и свободные по дням"""
+        if room_type is not None and room_type not in Room.ROOM_TYPES:
+            raise ValueError("Некорректный тип комнаты")
+        # Календарь сдвигается вслед за датой, пока сервис работает
+        self.occupancy.advance(date.today())
+        return {
+            "occupancy_rate": self.occupancy.occupancy_rate(
+                check_in, check_out, room_type
+            ),
+            "daily_free": self.occupancy.daily_free(check_in, check_out, room_type),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "rooms": len(self.rooms),
+            "coalesced": self.coalesced,
+            "writes": self.db.writes,
+            "commits": self.db.commits,
+        }
+
+    async def dispatch(
+        self, method: str, target: str, body: bytes
+    ) -> Tuple[int, Union[dict, bytes]]:
+        """Обработка HTTP-запроса: (код ответа, JSON-ответ или готовые байты)"""
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        parts = url.path.strip("/").split("/")
+        try:
+            await self._maybe_sync()
+            if method == "GET" and parts == ["availability"]:
+                return HTTPStatus.OK, self._find_available_body(
+                    _parse_date(query.get("check_in"), "check_in"),
+                    _parse_date(query.get("check_out"), "check_out"),
+                    query.get("room_type") or None,
+                    _parse_int(query.get("guests"), "guests", 1),
+                )
+            if method == "GET" and parts == ["quote"]:
+                return HTTPStatus.OK, await self.quote(
+                    _parse_int(query.get("room_id"), "room_id"),
+                    _parse_date(query.get("check_in"), "check_in"),
+                    _parse_date(query.get("check_out"), "check_out"),
+                    _parse_int(query.get("guests"), "guests", 1),
+                )
+            if method == "POST" and parts == ["reservations"]:
+                data = json.loads(body or b"{}")
+                if not isinstance(data, dict):
+                    raise ValueError("Ожидается JSON-объект")
+                return HTTPStatus.CREATED, await self.book(
+                    _parse_int(data.get("guest_id"), "guest_id"),
+                    _parse_int(data.get("room_id"), "room_id"),
+                    _parse_date(data.get("check_in"), "check_in"),
+                    _parse_date(data.get("check_out"), "check_out"),
+                    _parse_int(data.get("num_guests"), "num_guests", 1),
+                )
+            if method == "DELETE" and len(parts) == 2 and parts[0] == "reservations":
+                return HTTPStatus.OK, await self.cancel(_parse_int(parts[1], "id"))
+            if method == "GET" and parts == ["occupancy"]:
+                return HTTPStatus.OK, self.occupancy_report(
+                    _parse_date(query.get("check_in"), "check_in"),
+                    _parse_date(query.get("check_out"), "check_out"),
+                    query.get("room_type") or None,
+                )
+            if method == "GET" and parts == ["stats"]:
+                return HTTPStatus.OK, self.stats()
+            return HTTPStatus.NOT_FOUND, {"error": "Неизвестный запрос"}
+        except BookingConflictError as e:
+            return HTTPStatus.CONFLICT, {"error": str(e)}
+        except LookupError as e:
+            return HTTPStatus.NOT_FOUND, {"error": str(e.args[0])}
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Обслуживание соединения HTTP/1.1 с keep-alive"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    await self._respond(
+                        writer, HTTPStatus.BAD_REQUEST, {"error": "Плохой запрос"}
+                    )
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._respond(
+                        writer,
+                        HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                        {"error": "Слишком большой запрос"},
+                    )
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except Exception:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                        "error": "Внутренняя ошибка сервиса"
+                    }
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Union[dict, bytes],
+        keep_alive: bool = False,
+    ) -> None:
+        body = payload if isinstance(payload, bytes) else _encode(payload)
+        status = HTTPStatus(status)
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(
+    db_path: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+) -> None:
+    """Запуск HTTP-сервиса до остановки процесса"""
+    service = BookingService(db_path)
+    server = await asyncio.start_server(service.handle, host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Сервис бронирования: http://{address[0]}:{address[1]}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="HTTP/JSON-сервис бронирования")
+    parser.add_argument("--db", default="hotel.db", help="файл БД")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.db, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,758 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from datetime import date
+from functools import lru_cache
+from itertools import accumulate, compress
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .availability import AvailabilityEngine, DayLike, to_day
+from .database import DatabaseManager
+from .repository import HotelRepository
+from .schema import EPOCH, from_epoch, to_epoch
+from .statistics import HotelStatistics
+
+MAGIC = b"HOTELSNP"
+FORMAT_VERSION = 1
+# Заголовок: сигнатура, версия формата, версия схемы БД, число секций,
+# токен базы, seq журнала изменений, время записи (секунды эпохи)
+_HEADER = struct.Struct("<8sHHI32sqd")
+# Оглавление: имя секции, смещение от начала файла, длина, CRC32
+_SECTION = struct.Struct("<32sQQI")
+_ALIGN = 8
+# При большем числе изменений после снимка дешевле загрузка из БД
+DEFAULT_MAX_CHANGES = 100_000
+EPOCH_DAY = EPOCH.toordinal()
+
+# Виды столбцов кроме числовых (код типа array): секунды эпохи,
+# индекс в списке значений и строка UTF-8
+TIME = "time"
+CATEGORY = "category"
+TEXT = "text"
+# Столбцы таблиц в порядке from_row()
+COLUMNS = {
+    "rooms": (
+        ("id", "q"),
+        ("number", "q"),
+        ("room_type", CATEGORY),
+        ("price_per_night", "d"),
+        ("capacity", "q"),
+        ("is_available", "B"),
+        ("created_at", TIME),
+    ),
+    "guests": (
+        ("id", "q"),
+        ("name", TEXT),
+        ("email", TEXT),
+        ("phone", TEXT),
+        ("passport", TEXT),
+        ("created_at", TIME),
+    ),
+    "reservations": (
+        ("id", "q"),
+        ("guest_id", "q"),
+        ("room_id", "q"),
+        ("check_in_date", TIME),
+        ("check_out_date", TIME),
+        ("num_guests", "q"),
+        ("total_cost", "d"),
+        ("status", CATEGORY),
+        ("created_at", TIME),
+    ),
+}
+_TYPECODES = {TIME: "d", CATEGORY: "H"}
+_ENCODERS = {"q": int, "B": int, "d": float}
+
+# Интервалы номера в снимке (см. AvailabilityEngine.from_intervals)
+INTERVAL_COLUMNS = ("starts", "ends", "keys", "max_ends")
+
+StatisticsKey = Tuple[Optional[str], str, str]
+
+
+class SnapshotError(ValueError):
+    """Снимок поврежден, устарел или снят с другой базы"""
+
+
+@lru_cache(maxsize=65536)
+def _epoch(value) -> float:
+    """Дата строки таблицы в секундах эпохи (даты заездов повторяются)"""
+    return float(to_epoch(value))
+
+
+def _to_array(typecode: str, data) -> array:
+    """Массив из байтов секции (в файле - little-endian)"""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class _Table:
+    """Строки одной таблицы по столбцам в порядке возрастания id"""
+
+    def __init__(self, name: str, columns: list, categories: Dict[str, list]):
+        self.name = name
+        self.columns = columns
+        # Значения столбцов CATEGORY: в столбце хранится индекс значения
+        self.categories = categories
+
+    @classmethod
+    def empty(cls, name: str, categories: Optional[Dict[str, list]] = None):
+        columns = []
+        for column, kind in COLUMNS[name]:
+            columns.append([] if kind == TEXT else array(_TYPECODES.get(kind, kind)))
+        if categories is None:
+            categories = {
+                column: [] for column, kind in COLUMNS[name] if kind == CATEGORY
+            }
+        return cls(name, columns, categories)
+
+    @property
+    def ids(self) -> array:
+        return self.columns[0]
+
+    def __len__(self) -> int:
+        return len(self.columns[0])
+
+    def _encoders(self) -> list:
+        """Перевод значений строки таблицы в хранимые"""
+        encoders = []
+        for column, kind in COLUMNS[self.name]:
+            if kind == CATEGORY:
+                values = self.categories[column]
+                index = {value: code for code, value in enumerate(values)}
+
+                def encode(value, values=values, index=index):
+                    code = index.get(value)
+                    if code is None:
+                        code = index[value] = len(values)
+                        values.append(value)
+                    return code
+
+                encoders.append(encode)
+            else:
+                encoders.append(_ENCODERS.get(kind, _epoch if kind == TIME else None))
+        return encoders
+
+    def _decoders(self) -> list:
+        """Перевод хранимых значений в значения строки (как у DatabaseManager)"""
+        decoders = []
+        for column, kind in COLUMNS[self.name]:
+            if kind == TIME:
+                decoders.append(from_epoch)
+            elif kind == CATEGORY:
+                decoders.append(self.categories[column].__getitem__)
+            else:
+                decoders.append(None)
+        return decoders
+
+    def extend(self, rows: Iterable[tuple], chunk_size: int = 10000) -> None:
+        """Добавление строк с id больше последнего"""
+        encoders = self._encoders()
+        rows = iter(rows)
+        while True:
+            chunk = [row for _, row in zip(range(chunk_size), rows)]
+            if not chunk:
+                break
+            for column, encode, values in zip(self.columns, encoders, zip(*chunk)):
+                column.extend(values if encode is None else map(encode, values))
+
+    def rows(self) -> Iterator[tuple]:
+        """Строки таблицы по возрастанию id"""
+        return zip(
+            *(
+                column if decode is None else map(decode, column)
+                for column, decode in zip(self.columns, self._decoders())
+            )
+        )
+
+    def get(self, row_id: int) -> Optional[tuple]:
+        """Строка с заданным id или None"""
+        position = bisect_left(self.ids, row_id)
+        if position == len(self) or self.ids[position] != row_id:
+            return None
+        return tuple(
+            column[position] if decode is None else decode(column[position])
+            for column, decode in zip(self.columns, self._decoders())
+        )
+
+    def updated(self, changes: Dict[int, Optional[tuple]]) -> "_Table":
+        """Копия таблицы с новыми или измененными строками (None - удалена)
+
+        Неизмененные участки столбцов копируются срезами массивов.
+        """
+        table = _Table.empty(
+            self.name, {column: list(v) for column, v in self.categories.items()}
+        )
+        encoders = table._encoders()
+        ids, previous = self.ids, 0
+        for row_id in sorted(changes):
+            position = bisect_left(ids, row_id, previous)
+            for old, new in zip(self.columns, table.columns):
+                new.extend(old[previous:position])
+            row = changes[row_id]
+            if row is not None:
+                for column, encode, value in zip(table.columns, encoders, row):
+                    column.append(value if encode is None else encode(value))
+            found = position < len(ids) and ids[position] == row_id
+            previous = position + 1 if found else position
+        for old, new in zip(self.columns, table.columns):
+            new.extend(old[previous:])
+        return table
+
+    def sections(self) -> List[Tuple[str, bytes]]:
+        """Секции файла снимка со столбцами таблицы"""
+        sections = []
+        for (column, kind), values in zip(COLUMNS[self.name], self.columns):
+            name = f"{self.name}.{column}"
+            if kind == TEXT:
+                # Смещения в символах: строки - срезы одной декодированной
+                offsets = array("Q", accumulate(map(len, values), initial=0))
+                sections.append((f"{name}.offsets", _to_bytes(offsets)))
+                sections.append((name, "".join(values).encode()))
+            else:
+                sections.append((name, _to_bytes(values)))
+        return sections
+
+    @classmethod
+    def from_sections(cls, name: str, sections: dict, categories: dict) -> "_Table":
+        columns = []
+        for column, kind in COLUMNS[name]:
+            data = sections[f"{name}.{column}"]
+            if kind == TEXT:
+                offsets = _to_array("Q", sections[f"{name}.{column}.offsets"])
+                text = str(data, "utf-8")
+                columns.append([text[a:b] for a, b in zip(offsets, offsets[1:])])
+            else:
+                columns.append(_to_array(_TYPECODES.get(kind, kind), data))
+        if len({len(column) for column in columns}) > 1:
+            raise SnapshotError(f"Разная длина столбцов таблицы {name} в снимке")
+        return cls(
+            name,
+            columns,
+            {
+                column: categories[f"{name}.{column}"]
+                for column, kind in COLUMNS[name]
+                if kind == CATEGORY
+            },
+        )
+
+
+def _interval(row: Optional[tuple], since: int) -> Optional[tuple]:
+    """(номер, начало, конец, id) неотмененного бронирования с выездом после since"""
+    if row is None or row[7] == "cancelled":
+        return None
+    start, end = to_day(row[3]), to_day(row[4])
+    if end <= start or end <= since:
+        return None
+    return row[2], start, end, row[0]
+
+
+def _table_intervals(table: _Table, since: int) -> Dict[int, list]:
+    """Интервалы всех бронирований таблицы по номерам, как у _interval()"""
+    statuses = table.categories["status"]
+    cancelled = statuses.index("cancelled") if "cancelled" in statuses else -1
+    # Выезд в день since или раньше: секунды эпохи меньше начала следующего дня
+    bound = (since + 1 - EPOCH_DAY) * 86400
+    ids, _, rooms, check_ins, check_outs, _, _, codes, _ = table.columns
+    intervals: Dict[int, list] = {}
+    for row_id, room_id, check_in, check_out, code in zip(
+        ids, rooms, check_ins, check_outs, codes
+    ):
+        if check_out < bound or code == cancelled:
+            continue
+        start = int(check_in // 86400) + EPOCH_DAY
+        end = int(check_out // 86400) + EPOCH_DAY
+        if end > start:
+            intervals.setdefault(room_id, []).append((start, end, row_id))
+    return intervals
+
+
+def _statistics_key(row: tuple, room_types: dict) -> StatisticsKey:
+    """Группа агрегатов статистики: (тип номера, месяц заезда, статус)"""
+    return room_types.get(row[2]), row[3][:7], row[7]
+
+
+class Snapshot:
+    """Состояние базы на момент seq журнала изменений (mark)
+
+    Строки таблиц хранятся по столбцам, вместе с ними - интервалы
+    неотмененных бронирований с выездом после since по номерам (как в
+    AvailabilityEngine) и агрегаты статистики бронирований. Методы
+    iter_*() и get_max_ids() совпадают с DatabaseManager, поэтому снимок
+    служит источником строк для HotelRepository.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        schema_version: int,
+        mark: int,
+        since: int,
+        tables: Dict[str, _Table],
+        intervals: Dict[int, Tuple[array, ...]],
+        statistics: Dict[StatisticsKey, list],
+    ):
+        self.token = token
+        self.schema_version = schema_version
+        self.mark = mark
+        self.since = since
+        self.tables = tables
+        self.intervals = intervals
+        self._statistics = statistics
+
+    @classmethod
+    def capture(cls, db: DatabaseManager, since: DayLike) -> "Snapshot":
+        """Полный снимок базы (включает журнал изменений)
+
+        Строки, агрегаты и seq журнала читаются в одной транзакции,
+        поэтому снимок точно соответствует своему mark.
+        """
+        since = to_day(since)
+        token = db.enable_change_log()
+        tables = {name: _Table.empty(name) for name in COLUMNS}
+        with db.transaction():
+            _, _, mark = db.get_change_log_state()
+            tables["rooms"].extend(db.iter_rooms())
+            tables["guests"].extend(db.iter_guests())
+            tables["reservations"].extend(db.iter_reservations())
+            aggregates = db.get_statistics_aggregates()["reservations"]
+        intervals = _table_intervals(tables["reservations"], since)
+        return cls(
+            token,
+            db.schema_version,
+            mark,
+            since,
+            tables,
+            {room_id: _columns(items) for room_id, items in intervals.items()},
+            {tuple(row[:3]): list(row[3:]) for row in aggregates},
+        )
+
+    def refresh(
+        self,
+        db: DatabaseManager,
+        since: Optional[DayLike] = None,
+        max_changes: int = DEFAULT_MAX_CHANGES,
+    ) -> "Snapshot":
+        """Новый снимок: этот плюс изменения строк БД после mark
+
+        SnapshotError, если снимок снят с другой базы, журнал изменений
+        после mark уже очищен или изменений больше max_changes.
+        """
+        since = self.since if since is None else to_day(since)
+        if since < self.since:
+            raise SnapshotError("Снимок построен для более поздней даты")
+        with db.transaction():
+            mark, changes = self._changes(db, max_changes)
+            rows = {table: dict.fromkeys(ids) for table, ids in changes.items()}
+            for table, ids in changes.items():
+                for row in db.get_rows(table, ids):
+                    rows[table][row[0]] = row
+            old_types = self._room_types()
+            tables = {
+                name: table.updated(rows[name]) if rows[name] else table
+                for name, table in self.tables.items()
+            }
+            snapshot = Snapshot(
+                self.token,
+                self.schema_version,
+                mark,
+                since,
+                tables,
+                dict(self.intervals),
+                dict(self._statistics),
+            )
+            new_types = snapshot._room_types()
+            if any(old_types.get(i) != new_types.get(i) for i in rows["rooms"]):
+                # Бронирования номера переходят в группу другого типа
+                aggregates = db.get_statistics_aggregates()["reservations"]
+                snapshot._statistics = {
+                    tuple(row[:3]): list(row[3:]) for row in aggregates
+                }
+            else:
+                snapshot._update_statistics(self, rows["reservations"], new_types)
+        snapshot._update_intervals(self, rows["reservations"])
+        return snapshot
+
+    def _changes(self, db: DatabaseManager, max_changes: int) -> tuple:
+        """Последний seq журнала и id строк, измененных после mark
+
+        Заодно проверяется, что снимок не устарел.
+        """
+        state = db.get_change_log_state()
+        if state is None:
+            raise SnapshotError("В базе не включен журнал изменений")
+        token, pruned, mark = state
+        if token != self.token or db.schema_version != self.schema_version:
+            raise SnapshotError("Снимок снят с другой базы")
+        if self.mark < pruned:
+            raise SnapshotError("Журнал изменений после снимка уже очищен")
+        if self.mark > mark:
+            raise SnapshotError("Снимок новее базы")
+        changes = db.get_changes(self.mark)
+        if sum(map(len, changes.values())) > max_changes:
+            raise SnapshotError("После снимка слишком много изменений")
+        return mark, changes
+
+    def _room_types(self) -> Dict[int, str]:
+        table = self.tables["rooms"]
+        types = table.categories["room_type"]
+        return {
+            room_id: types[code] for room_id, code in zip(table.ids, table.columns[2])
+        }
+
+    def _update_statistics(
+        self, old: "Snapshot", rows: Dict[int, Optional[tuple]], room_types: dict
+    ) -> None:
+        statistics = self._statistics
+        for row_id, row in rows.items():
+            for sign, item in ((-1, old.tables["reservations"].get(row_id)), (1, row)):
+                if item is None:
+                    continue
+                key = _statistics_key(item, room_types)
+                count, revenue = statistics.get(key, (0, 0.0))
+                count += sign
+                if count:
+                    statistics[key] = [count, revenue + sign * item[6]]
+                else:
+                    statistics.pop(key, None)
+
+    def _update_intervals(
+        self, old: "Snapshot", rows: Dict[int, Optional[tuple]]
+    ) -> None:
+        """Правка интервалов измененных бронирований (копии массивов номера)"""
+        intervals, copied = self.intervals, set()
+
+        def room_columns(room_id: int) -> Tuple[array, array, array]:
+            if room_id not in copied:
+                copied.add(room_id)
+                columns = intervals.get(room_id, ((),) * 3)[:3]
+                intervals[room_id] = tuple(array("q", column) for column in columns)
+            return intervals[room_id]
+
+        reservations = old.tables["reservations"]
+        for row_id, row in rows.items():
+            for interval, add in (
+                (_interval(reservations.get(row_id), old.since), False),
+                (_interval(row, self.since), True),
+            ):
+                if interval is None:
+                    continue
+                columns = room_columns(interval[0])
+                position, found = _find_interval(columns, interval[1:])
+                if add and not found:
+                    for column, value in zip(columns, interval[1:]):
+                        column.insert(position, value)
+                elif not add and found:
+                    for column in columns:
+                        del column[position]
+        if self.since > old.since:
+            for room_id, (starts, ends, keys, *_) in list(intervals.items()):
+                keep = [end > self.since for end in ends]
+                if not all(keep):
+                    intervals[room_id] = tuple(
+                        array("q", compress(column, keep))
+                        for column in (starts, ends, keys)
+                    )
+        for room_id in [room_id for room_id, c in intervals.items() if not c[0]]:
+            del intervals[room_id]
+
+    def iter_rooms(self) -> Iterator[tuple]:
+        return self.tables["rooms"].rows()
+
+    def iter_guests(self) -> Iterator[tuple]:
+        return self.tables["guests"].rows()
+
+    def iter_reservations(self) -> Iterator[tuple]:
+        return self.tables["reservations"].rows()
+
+    def get_max_ids(self) -> dict:
+        """Максимальные id в таблицах (0 для пустой таблицы)"""
+        return {
+            name: table.ids[-1] if len(table) else 0
+            for name, table in self.tables.items()
+        }
+
+    def availability(self) -> AvailabilityEngine:
+        """Индекс занятости номеров без обхода бронирований"""
+        return AvailabilityEngine.from_intervals(
+            self._room_types().items(), self.intervals
+        )
+
+    def statistics(self) -> HotelStatistics:
+        """Статистика отеля из агрегатов снимка"""
+        rooms = self.tables["rooms"]
+        types = rooms.categories["room_type"]
+        by_type: Dict[str, list] = {}
+        for code, available in zip(rooms.columns[2], rooms.columns[5]):
+            totals = by_type.setdefault(types[code], [0, 0])
+            totals[0] += 1
+            totals[1] += available
+        return HotelStatistics.from_aggregates(
+            {
+                "rooms": [(name, *totals) for name, totals in by_type.items()],
+                "guests": len(self.tables["guests"]),
+                "reservations": [
+                    key + tuple(totals) for key, totals in self._statistics.items()
+                ],
+            }
+        )
+
+    def _sections(self) -> List[Tuple[str, bytes]]:
+        rooms = sorted(self.intervals)
+        columns = [array("q") for _ in range(4)]
+        bounds = array("q", [0])
+        for room_id in rooms:
+            starts, ends, keys, *max_ends = self.intervals[room_id]
+            if not max_ends:
+                max_ends = [accumulate(ends, max)]
+            for column, values in zip(columns, (starts, ends, keys, *max_ends)):
+                column.extend(values)
+            bounds.append(len(columns[0]))
+        meta = {
+            "since": self.since,
+            "categories": {
+                f"{name}.{column}": values
+                for name, table in self.tables.items()
+                for column, values in table.categories.items()
+            },
+            "statistics": [
+                key + tuple(totals) for key, totals in self._statistics.items()
+            ],
+        }
+        sections = [("meta", json.dumps(meta, ensure_ascii=False).encode())]
+        for table in self.tables.values():
+            sections += table.sections()
+        sections += [
+            ("availability.rooms", _to_bytes(array("q", rooms))),
+            ("availability.bounds", _to_bytes(bounds)),
+        ]
+        for name, column in zip(INTERVAL_COLUMNS, columns):
+            sections.append((f"availability.{name}", _to_bytes(column)))
+        return sections
+
+    def write(self, path: str) -> int:
+        """Запись снимка в файл (через временный файл), возвращает размер"""
+        sections = self._sections()
+        offset = _HEADER.size + len(sections) * _SECTION.size
+        directory = []
+        for name, data in sections:
+            offset += -offset % _ALIGN
+            directory.append((name, offset, data))
+            offset += len(data)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(
+                _HEADER.pack(
+                    MAGIC,
+                    FORMAT_VERSION,
+                    self.schema_version,
+                    len(sections),
+                    self.token.encode(),
+                    self.mark,
+                    time.time(),
+                )
+            )
+            for name, start, data in directory:
+                file.write(
+                    _SECTION.pack(name.encode(), start, len(data), zlib.crc32(data))
+                )
+            for _, start, data in directory:
+                file.write(b"\0" * (start - file.tell()))
+                file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+        return offset
+
+    @classmethod
+    def read(cls, path: str) -> "Snapshot":
+        """Чтение снимка из файла через mmap с проверкой контрольных сумм"""
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < _HEADER.size:
+                raise SnapshotError("Файл снимка обрезан")
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    return cls._parse(view)
+
+    @classmethod
+    def _parse(cls, view: memoryview) -> "Snapshot":
+        magic, version, schema_version, count, token, mark, _ = _HEADER.unpack_from(
+            view
+        )
+        if magic != MAGIC:
+            raise SnapshotError("Файл не является снимком")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Версия формата снимка {version} не поддерживается")
+        if _HEADER.size + count * _SECTION.size > len(view):
+            raise SnapshotError("Файл снимка обрезан")
+        sections, views = {}, []
+        try:
+            for i in range(count):
+                name, start, length, crc = _SECTION.unpack_from(
+                    view, _HEADER.size + i * _SECTION.size
+                )
+                name = name.rstrip(b"\0").decode()
+                if start + length > len(view):
+                    raise SnapshotError("Файл снимка обрезан")
+                data = sections[name] = view[start : start + length]
+                views.append(data)
+                if zlib.crc32(data) != crc:
+                    raise SnapshotError(f"Контрольная сумма секции {name} не совпадает")
+            meta = json.loads(bytes(sections["meta"]))
+            tables = {
+                name: _Table.from_sections(name, sections, meta["categories"])
+                for name in COLUMNS
+            }
+            rooms = _to_array("q", sections["availability.rooms"])
+            bounds = _to_array("q", sections["availability.bounds"])
+            columns = [
+                _to_array("q", sections[f"availability.{name}"])
+                for name in INTERVAL_COLUMNS
+            ]
+        except KeyError as error:
+            raise SnapshotError(f"В снимке нет секции {error}") from None
+        finally:
+            # Срезы должны быть освобождены до закрытия mmap
+            for data in views:
+                data.release()
+        intervals = {
+            room_id: tuple(column[lo:hi] for column in columns)
+            for room_id, lo, hi in zip(rooms, bounds, bounds[1:])
+        }
+        return cls(
+            token.decode(),
+            schema_version,
+            mark,
+            meta["since"],
+            tables,
+            intervals,
+            {tuple(row[:3]): list(row[3:]) for row in meta["statistics"]},
+        )
+
+
+def _find_interval(columns: tuple, item: tuple) -> Tuple[int, bool]:
+    """Позиция интервала (начало, конец, id) в упорядоченных массивах номера"""
+    starts, ends, keys = columns
+    start, end, key = item
+    position = bisect_left(starts, start)
+    while (
+        position < len(starts)
+        and starts[position] == start
+        and (ends[position], keys[position]) < (end, key)
+    ):
+        position += 1
+    found = position < len(starts) and (
+        starts[position],
+        ends[position],
+        keys[position],
+    ) == (start, end, key)
+    return position, found
+
+
+def _columns(items: list) -> Tuple[array, array, array]:
+    """Интервалы номера по (начало, конец, id) - в три массива"""
+    items.sort()
+    return tuple(array("q", column) for column in zip(*items))
+
+
+class LoadedState(NamedTuple):
+    """Состояние приложения после запуска"""
+
+    repository: HotelRepository
+    availability: AvailabilityEngine
+    statistics: HotelStatistics
+    # Снимок, из которого загружено состояние (None - загружено из БД)
+    snapshot: Optional[Snapshot]
+    # Почему снимок не использован
+    reason: Optional[str]
+
+
+def load_state(
+    db: DatabaseManager,
+    path: str,
+    since: DayLike,
+    max_changes: int = DEFAULT_MAX_CHANGES,
+) -> LoadedState:
+    """Загрузка из снимка с изменениями БД после него, иначе - из БД
+
+    Поврежденный, устаревший или отсутствующий снимок не ошибка: его
+    причина возвращается в reason, а состояние строится запросами к БД.
+    """
+    try:
+        snapshot = Snapshot.read(path).refresh(db, max_changes=max_changes)
+        if snapshot.since > to_day(since):
+            raise SnapshotError("Снимок построен для более поздней даты")
+    except (OSError, ValueError) as error:
+        return LoadedState(
+            HotelRepository(db),
+            AvailabilityEngine.from_database(db, since),
+            HotelStatistics.from_database(db),
+            None,
+            str(error),
+        )
+    return LoadedState(
+        HotelRepository(snapshot),
+        snapshot.availability(),
+        snapshot.statistics(),
+        snapshot,
+        None,
+    )
+
+
+def save_snapshot(
+    db: DatabaseManager,
+    path: str,
+    since: DayLike,
+    previous: Optional[Snapshot] = None,
+) -> Snapshot:
+    """Запись снимка базы и очистка журнала изменений до его mark
+
+    Если задан previous, снимок строится из него и изменений после
+    него, иначе (или если previous устарел) - полным чтением базы.
+    """
+    snapshot = None
+    if previous is not None:
+        try:
+            snapshot = previous.refresh(db, since)
+        except SnapshotError:
+            pass
+    if snapshot is None:
+        snapshot = Snapshot.capture(db, since)
+    snapshot.write(path)
+    db.prune_change_log(snapshot.mark)
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Снимок состояния БД гостиницы")
+    parser.add_argument("--db", default="hotel.db", help="путь к файлу БД")
+    parser.add_argument("--path", default="hotel.snapshot", help="файл снимка")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    with DatabaseManager(args.db) as db:
+        snapshot = save_snapshot(db, args.path, date.today())
+    print(
+        f"Снимок на seq {snapshot.mark}: "
+        f"{os.path.getsize(args.path) / 2**20:.1f} МБ, "
+        f"{time.perf_counter() - started:.2f} с"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+from typing import Dict, NamedTuple, Optional
+
+from .database import DatabaseManager
+from .guest import Guest
+from .reservation import Reservation
+from .room import Room
+
+
+class Breakdown(NamedTuple):
+    """Итоги бронирований по одному ключу (тип номера или месяц)"""
+
+    reservations: int
+    active: int
+    revenue: float
+
+
+class _Totals:
+    __slots__ = ("reservations", "active", "revenue")
+
+    def __init__(self):
+        self.reservations = 0
+        self.active = 0
+        self.revenue = 0.0
+
+    def add(self, reservations: int, active: int, revenue: float) -> None:
+        self.reservations += reservations
+        self.active += active
+        self.revenue += revenue
+
+
+def _month(value) -> str:
+    """Месяц заезда в виде YYYY-MM (как substr(check_in_date, 1, 7) в SQL)"""
+    return value.isoformat()[:7]
+
+
+class HotelStatistics:
+    """Постоянно обновляемая статистика отеля
+
+    Счетчики и суммы меняются за O(1) при добавлении комнаты, гостя или
+    бронирования и при изменении полей отслеживаемых сущностей через
+    сеттеры, поэтому чтение статистики не обходит коллекции. Доход,
+    как и раньше, считается по total_cost всех бронирований.
+    """
+
+    def __init__(self):
+        self.total_rooms = 0
+        self.available_rooms = 0
+        self.total_guests = 0
+        self.total_revenue = 0.0
+        self._statuses: Dict[str, int] = {}
+        self._rooms_by_type: Dict[str, list] = {}
+        self._by_type: Dict[Optional[str], _Totals] = {}
+        self._by_month: Dict[str, _Totals] = {}
+        # Тип номера по id комнаты и тип, к которому отнесено бронирование
+        self._room_types: Dict[int, str] = {}
+        self._reservation_types: Dict[int, Optional[str]] = {}
+
+    @classmethod
+    def from_database(cls, db: DatabaseManager) -> "HotelStatistics":
+        """Начальные значения из агрегирующих запросов к БД"""
+        return cls.from_aggregates(db.get_statistics_aggregates())
+
+    @classmethod
+    def from_aggregates(cls, aggregates: dict) -> "HotelStatistics":
+        """Начальные значения из агрегатов в формате get_statistics_aggregates()"""
+        stats = cls()
+        for room_type, count, available in aggregates["rooms"]:
+            stats._add_rooms(room_type, count, available)
+        stats.total_guests = aggregates["guests"]
+        for room_type, month, status, count, revenue in aggregates["reservations"]:
+            stats._add_reservations(room_type, month, status, count, revenue)
+        return stats
+
+    def _add_rooms(self, room_type: str, count: int, available: int) -> None:
+        self.total_rooms += count
+        self.available_rooms += available
+        totals = self._rooms_by_type.setdefault(room_type, [0, 0])
+        totals[0] += count
+        totals[1] += available
+
+    def _add_reservations(
+        self, room_type, month: str, status: str, count: int, revenue: float
+    ) -> None:
+        self._statuses[status] = self._statuses.get(status, 0) + count
+        self.total_revenue += revenue
+        active = count if status == "active" else 0
+        for key, buckets in ((room_type, self._by_type), (month, self._by_month)):
+            totals = buckets.get(key)
+            if totals is None:
+                totals = buckets[key] = _Totals()
+            totals.add(count, active, revenue)
+
+    def track_room(self, room: Room) -> None:
+        """Отслеживание уже учтенной комнаты (например, загруженной из БД)"""
+        self._room_types[room.id] = room.room_type
+        room.subscribe(self._on_room_change)
+
+    def add_room(self, room: Room) -> None:
+        """Учет новой комнаты"""
+        self._add_rooms(room.room_type, 1, int(room.is_available))
+        self.track_room(room)
+
+    def remove_room(self, room: Room) -> None:
+        """Отмена учета комнаты (например, не записанной в БД)"""
+        self._add_rooms(room.room_type, -1, -int(room.is_available))
+        self._room_types.pop(room.id, None)
+        room.unsubscribe(self._on_room_change)
+
+    def add_guest(self, guest: Guest) -> None:
+        """Учет нового гостя"""
+        self.total_guests += 1
+
+    def remove_guest(self, guest: Guest) -> None:
+        """Отмена учета гостя"""
+        self.total_guests -= 1
+
+    def track_reservation(self, reservation: Reservation) -> None:
+        """Отслеживание уже учтенного бронирования"""
+        self._reservation_types[reservation.id] = self._room_types.get(
+            reservation.room_id
+        )
+        reservation.subscribe(self._on_reservation_change)
+
+    def add_reservation(self, reservation: Reservation) -> None:
+        """Учет нового бронирования"""
+        self._add_reservations(
+            self._room_types.get(reservation.room_id),
+            _month(reservation.check_in_date),
+            reservation.status,
+            1,
+            reservation.total_cost,
+        )
+        self.track_reservation(reservation)
+
+    def _on_room_change(self, room: Room, field: str, old, new) -> None:
+        if field == "is_available" and bool(old) != bool(new):
+            delta = 1 if new else -1
+            self.available_rooms += delta
+            self._rooms_by_type[room.room_type][1] += delta
+        elif field == "room_type" and old != new:
+            available = int(room.is_available)
+            self._add_rooms(old, -1, -available)
+            self._add_rooms(new, 1, available)
+            self._room_types[room.id] = new
+
+    def _on_reservation_change(
+        self, reservation: Reservation, field: str, old, new
+    ) -> None:
+        room_type = self._reservation_types.get(reservation.id)
+        month = _month(reservation.check_in_date)
+        if field == "status" and old != new:
+            self._add_reservations(room_type, month, old, -1, 0.0)
+            self._add_reservations(room_type, month, new, 1, 0.0)
+        elif field == "total_cost" and old != new:
+            self._add_reservations(room_type, month, reservation.status, 0, new - old)
+        elif field == "check_in_date" and _month(old) != month:
+            status, cost = reservation.status, reservation.total_cost
+            self._add_reservations(room_type, _month(old), status, -1, -cost)
+            self._add_reservations(room_type, month, status, 1, cost)
+
+    @property
+    def active_reservations(self) -> int:
+        return self._statuses.get("active", 0)
+
+    @property
+    def total_reservations(self) -> int:
+        return sum(self._statuses.values())
+
+    def reservations_by_status(self) -> Dict[str, int]:
+        """Количество бронирований по статусам"""
+        return {status: count for status, count in self._statuses.items() if count}
+
+    def rooms_by_type(self) -> Dict[str, tuple]:
+        """(всего, доступных) номеров по типам"""
+        return {
+            room_type: tuple(totals)
+            for room_type, totals in sorted(self._rooms_by_type.items())
+            if totals[0]
+        }
+
+    def by_room_type(self) -> Dict[Optional[str], Breakdown]:
+        """Бронирования и доход по типам номеров"""
+        return self._breakdown(self._by_type)
+
+    def by_month(self) -> Dict[str, Breakdown]:
+        """Бронирования и доход по месяцам заезда"""
+        return self._breakdown(self._by_month)
+
+    @staticmethod
+    def _breakdown(buckets: dict) -> dict:
+        return {
+            key: Breakdown(totals.reservations, totals.active, totals.revenue)
+            for key, totals in sorted(
+                buckets.items(), key=lambda item: (item[0] is None, item[0] or "")
+            )
+            if totals.reservations
+        }
@@ -0,0 +1,103 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+
+from .guest import GUEST_RULES, Guest, guest_errors
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+class ValidationResult(NamedTuple):
+    """Результат проверки одной записи"""
+
+    index: int
+    record: dict
+    errors: List[str]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _as_record(item) -> dict:
+    if isinstance(item, Guest):
+        return {field: getattr(item, field) for field in GUEST_RULES}
+    return item
+
+
+def _validate_chunk(records: List[dict]) -> List[Tuple[int, List[str]]]:
+    """Проверка порции записей, возвращает только ошибочные позиции"""
+    rules = tuple(GUEST_RULES.items())
+    found = []
+    for position, record in enumerate(records):
+        for field, rule in rules:
+            if field not in record or rule(record[field]) is not None:
+                # Тексты ошибок собираются только для некорректных записей
+                found.append((position, guest_errors(record)))
+                break
+    return found
+
+
+def _chunks(records: Iterable, chunk_size: int) -> Iterator[List[dict]]:
+    iterator = iter(records)
+    while True:
+        chunk = [_as_record(item) for item in islice(iterator, chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def _results(start: int, chunk: List[dict], found) -> Iterator[ValidationResult]:
+    errors_by_position = dict(found)
+    make = ValidationResult._make
+    for position, record in enumerate(chunk):
+        errors = errors_by_position.get(position)
+        yield make((start + position, record, [] if errors is None else errors))
+
+
+def validate_guests(
+    records: Iterable,
+    workers: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[ValidationResult]:
+    """Потоковая проверка записей гостей (dict или Guest)
+
+    Возвращает результат для каждой записи в исходном порядке и не
+    прерывается на первой ошибке. При workers > 1 порции проверяются
+    в пуле процессов; в обработке одновременно не больше 2 * workers
+    порций, поэтому весь файл в памяти не держится.
+    """
+    if chunk_size <= 0:
+        raise ValueError("Размер порции должен быть положительным")
+    chunks = _chunks(records, chunk_size)
+    start = 0
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _results(start, chunk, _validate_chunk(chunk))
+            start += len(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append((chunk, pool.submit(_validate_chunk, chunk)))
+            if len(in_flight) >= 2 * workers:
+                chunk, future = in_flight.popleft()
+                yield from _results(start, chunk, future.result())
+                start += len(chunk)
+        while in_flight:
+            chunk, future = in_flight.popleft()
+            yield from _results(start, chunk, future.result())
+            start += len(chunk)
+
+
+def invalid_guests(
+    records: Iterable,
+    workers: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[ValidationResult]:
+    """Только записи с ошибками"""
+    for result in validate_guests(records, workers, chunk_size):
+        if result.errors:
+            yield result
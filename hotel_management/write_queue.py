@@ -0,0 +1,87 @@
+import sqlite3
+from typing import Dict, List, Tuple
+
+from .database import BookingConflictError, DEFAULT_CHUNK_SIZE, DatabaseManager
+from .guest import Guest
+from .reservation import Reservation
+from .room import Room
+
+
+class WriteQueue:
+    """Очередь отложенной записи сущностей в БД пачками
+
+    Сущности накапливаются в памяти и сбрасываются методами
+    save_*_many одной транзакцией при вызове flush(); put() только
+    ставит в очередь, а full сообщает, что набралось batch_size
+    сущностей. Бронирования пишутся через
+    book_if_free с проверкой пересечений. Если пачка нарушает
+    ограничения БД или занимает уже занятый номер, сущности пишутся по
+    одной, а отвергнутые откладываются в failed вместе с ошибкой и
+    больше не повторяются.
+    """
+
+    def __init__(self, db: DatabaseManager, batch_size: int = DEFAULT_CHUNK_SIZE):
+        if batch_size <= 0:
+            raise ValueError("Размер пачки должен быть положительным")
+        self.db = db
+        self.batch_size = batch_size
+        # Порядок ключей задает порядок записи: сначала комнаты и гости,
+        # затем ссылающиеся на них бронирования
+        self._pending: Dict[type, list] = {Room: [], Guest: [], Reservation: []}
+        self.failed: List[Tuple[object, Exception]] = []
+
+    def put(self, entity) -> None:
+        """Постановка сущности в очередь"""
+        for entity_type, pending in self._pending.items():
+            if isinstance(entity, entity_type):
+                pending.append(entity)
+                break
+        else:
+            raise TypeError(f"Неподдерживаемый тип сущности: {type(entity).__name__}")
+
+    @property
+    def full(self) -> bool:
+        """Набралась ли пачка для записи"""
+        return len(self) >= self.batch_size
+
+    def flush(self) -> Dict[str, List[int]]:
+        """Запись всех накопленных сущностей, возвращает id по таблицам"""
+        savers = {
+            Room: ("rooms", self.db.save_rooms_many),
+            Guest: ("guests", self.db.save_guests_many),
+            Reservation: ("reservations", self._book_many),
+        }
+        saved = {}
+        try:
+            # IMMEDIATE: проверка пересечений и вставка под одной блокировкой
+            with self.db.transaction(immediate=True):
+                for entity_type, pending in self._pending.items():
+                    if pending:
+                        table, save_many = savers[entity_type]
+                        saved[table] = save_many(pending, self.batch_size)
+        except (sqlite3.IntegrityError, BookingConflictError):
+            saved = self._flush_one_by_one(savers)
+        for pending in self._pending.values():
+            pending.clear()
+        return saved
+
+    def _book_many(self, reservations: List[Reservation], chunk_size: int) -> List[int]:
+        """Запись бронирований, только если номера свободны на их даты"""
+        return [self.db.book_if_free(reservation) for reservation in reservations]
+
+    def _flush_one_by_one(self, savers: dict) -> Dict[str, List[int]]:
+        """Запись по одной сущности после ошибки пачки"""
+        saved = {}
+        for entity_type, pending in self._pending.items():
+            table, save_many = savers[entity_type]
+            for entity in pending:
+                try:
+                    ids = save_many([entity], 1)
+                except (sqlite3.IntegrityError, BookingConflictError) as e:
+                    self.failed.append((entity, e))
+                else:
+                    saved.setdefault(table, []).extend(ids)
+        return saved
+
+    def __len__(self) -> int:
+        return sum(len(pending) for pending in self._pending.values())
@@ -1,29 +1,219 @@
+import os
+import queue
+import sys
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import sqlite3
 from hotel_management.room import Room
 from hotel_management.guest import Guest
 from hotel_management.reservation import Reservation
-from hotel_management.database import DatabaseManager
-from openpyxl import Workbook
-
-
+from hotel_management.database import BookingConflictError, DatabaseManager
+from hotel_management.room_registry import RoomRegistry
+from hotel_management.list_view import DatabaseSource, TreeviewSync, VirtualTreeview
+from hotel_management.metrics import METRICS, instrument_class
+from hotel_management.migration import migrate
+from hotel_management.search import GuestSearchIndex
+from hotel_management.snapshot import load_state, save_snapshot
+from hotel_management.write_queue import WriteQueue
+from hotel_management.export import export_to_xlsx
+
+
+# Файлы выгрузки метрик кнопкой на вкладке отчетов
+METRICS_FILES = ("metrics.json", "metrics.prom")
+# Снимок состояния для быстрого запуска (hotel_management.snapshot)
+SNAPSHOT_FILE = "hotel.snapshot"
+
+
+@instrument_class(
+    "app",
+    names=(
+        "add_room",
+        "add_guest",
+        "add_reservation",
+        "calculate_cost",
+        "export_to_excel",
+        "show_statistics",
+        "save_snapshot",
+    ),
+)
 class HotelManagementApp:
     """Главное приложение для управления отелем"""
 
-    def __init__(self, root):
+    # Интервал фоновой записи очереди в БД, мс
+    FLUSH_INTERVAL_MS = 2000
+    # Интервал записи снимка состояния в фоновом потоке, мс
+    SNAPSHOT_INTERVAL_MS = 10 * 60 * 1000
+
+    def __init__(self, root, queue_writes: bool = False):
         self.root = root
         self.root.title("Система управления отелем")
         self.root.geometry("800x600")
 
         self.db = DatabaseManager()
+        # При queue_writes=True новые записи копятся и пишутся пачками
+        self.write_queue = WriteQueue(self.db) if queue_writes else None
+        if self.db.schema_version < 2:
+            self._offer_migration()
+        # Снимок с изменениями БД после него или, если снимка нет или он
+        # устарел, запросы к БД
+        state = load_state(self.db, SNAPSHOT_FILE, date.today())
+        if state.reason is not None:
+            print(f"Снимок состояния не использован: {state.reason}", file=sys.stderr)
+        self.snapshot = state.snapshot
+        self.repository = state.repository
+        self.availability = state.availability
+        self.statistics = state.statistics
+        self._snapshot_thread = None
+        # Ошибка последней фоновой записи снимка для показа в интерфейсе
+        self._snapshot_error = None
         self.rooms = []
+        self.room_registry = RoomRegistry()
         self.guests = []
         self.reservations = []
+        # Поисковый индекс гостей строится при первом поиске
+        self._guest_index = None
+        self._export_thread = None
 
         self.create_widgets()
         self.load_data()
+        if self.write_queue is not None:
+            self.root.after(self.FLUSH_INTERVAL_MS, self._periodic_flush)
+        self.root.after(self.SNAPSHOT_INTERVAL_MS, self._periodic_snapshot)
+
+    def _offer_migration(self):
+        """Предложение перевести базу в схеме v1 на v2 (нужна для снимка)"""
+        if not messagebox.askyesno(
+            "Схема БД",
+            "База данных в старой схеме v1: снимок состояния для быстрого "
+            "запуска с ней не работает.\nПеревести базу на схему v2 сейчас? "
+            "Другие рабочие места могут продолжать работу.",
+        ):
+            print("Снимок состояния отключен: база данных в схеме v1", file=sys.stderr)
+            return
+        try:
+            migrate(self.db)
+        except (sqlite3.Error, ValueError) as e:
+            self._report_error(f"Ошибка миграции БД: {e}")
+
+    def _save(self, entity, save) -> bool:
+        """Запись уже учтенной в памяти сущности сразу или через очередь
+
+        Возвращает False, если БД отвергла сущность: она убирается из
+        памяти, а ошибка показывается пользователю.
+        """
+        if self.write_queue is None:
+            try:
+                save(entity)
+            except sqlite3.Error as e:
+                self._forget(entity)
+                self._report_error(f"Ошибка записи в БД: {e}")
+                return False
+            return True
+        self.write_queue.put(entity)
+        if self.write_queue.full:
+            self.flush_writes()
+        return self.repository.get(type(entity), entity.id) is entity
+
+    def _forget(self, entity):
+        """Удаление из памяти сущности, не записанной в БД"""
+        self.repository.unregister(entity)
+        if isinstance(entity, Room):
+            self.rooms[:] = [room for room in self.rooms if room is not entity]
+            if self.room_registry.get(entity.id) is entity:
+                self.room_registry.remove(entity.id)
+                self.availability.remove_room(entity.id)
+                self.statistics.remove_room(entity)
+        elif isinstance(entity, Guest):
+            self.guests[:] = [guest for guest in self.guests if guest is not entity]
+            if self._guest_index is not None and entity.id in self._guest_index:
+                self._guest_index.remove(entity.id)
+            self.statistics.remove_guest(entity)
+
+    def _report_error(self, message: str):
+        """Сообщение об ошибке фоновой операции"""
+        try:
+            messagebox.showerror("Ошибка", message)
+        except tk.TclError:
+            # Окно уже закрыто (запись при выходе)
+            print(message, file=sys.stderr)
+
+    def flush_writes(self) -> bool:
+        """Сброс очереди пакетной записи в БД, False - если записано не все"""
+        if self.write_queue is None:
+            return True
+        try:
+            self.write_queue.flush()
+        except sqlite3.Error as e:
+            self._report_error(f"Ошибка записи в БД: {e}")
+            return False
+        if self.write_queue.failed:
+            failed, self.write_queue.failed = self.write_queue.failed, []
+            for entity, _ in failed:
+                self._forget(entity)
+            self.update_rooms_list()
+            self.update_guests_list()
+            self._report_error(
+                "Не сохранены в БД:\n"
+                + "\n".join(
+                    f"{type(entity).__name__} {entity.id}: {e}" for entity, e in failed
+                )
+            )
+            return False
+        return True
+
+    def _periodic_flush(self):
+        try:
+            self.flush_writes()
+        finally:
+            self.root.after(self.FLUSH_INTERVAL_MS, self._periodic_flush)
+
+    def _write_snapshot(self):
+        """Запись снимка состояния, возвращает текст ошибки или None"""
+        if self.db.schema_version < 2:
+            # Снимок работает только со схемой v2: запуск идет через БД
+            return None
+        try:
+            self.snapshot = save_snapshot(
+                self.db, SNAPSHOT_FILE, date.today(), self.snapshot
+            )
+        except (OSError, ValueError) as e:
+            return f"Не удалось записать снимок состояния: {e}"
+        return None
+
+    def _background_snapshot(self):
+        try:
+            self._snapshot_error = self._write_snapshot()
+        finally:
+            self.db.release_thread_connection()
+
+    def _periodic_snapshot(self):
+        if self._snapshot_thread is None or not self._snapshot_thread.is_alive():
+            self.flush_writes()
+            self._snapshot_thread = threading.Thread(
+                target=self._background_snapshot, daemon=True
+            )
+            self._snapshot_thread.start()
+            self.root.after(100, self._poll_snapshot)
+        self.root.after(self.SNAPSHOT_INTERVAL_MS, self._periodic_snapshot)
+
+    def _poll_snapshot(self):
+        """Сообщение об ошибке фоновой записи снимка в потоке интерфейса"""
+        if self._snapshot_thread.is_alive():
+            self.root.after(100, self._poll_snapshot)
+        elif self._snapshot_error is not None:
+            message, self._snapshot_error = self._snapshot_error, None
+            self._report_error(message)
+
+    def save_snapshot(self):
+        """Запись снимка состояния (при выходе из приложения)"""
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        self.flush_writes()
+        message = self._write_snapshot()
+        if message is not None:
+            self._report_error(message)
 
     def create_widgets(self):
         """Создание элементов интерфейса"""
@@ -91,6 +281,7 @@ class HotelManagementApp:
             self.rooms_tree.column(col, width=100)
 
         self.rooms_tree.pack(fill="both", expand=True)
+        self.rooms_view = TreeviewSync(self.rooms_tree, self._room_row)
 
     def create_guests_tab(self, parent):
         """Создание вкладки для управления гостями"""
@@ -118,6 +309,17 @@ class HotelManagementApp:
             row=4, column=0, columnspan=2, pady=10
         )
 
+        # Поиск гостей
+        search_frame = ttk.Frame(parent)
+        search_frame.pack(fill="x", padx=5, pady=5)
+
+        self.guest_search = ttk.Entry(search_frame)
+        self.guest_search.pack(side="left", fill="x", expand=True, padx=5)
+        self.guest_search.bind("<Return>", lambda event: self.search_guests())
+        ttk.Button(search_frame, text="Найти", command=self.search_guests).pack(
+            side="left", padx=5
+        )
+
         # Список гостей
         list_frame = ttk.LabelFrame(parent, text="Список гостей")
         list_frame.pack(fill="both", expand=True, padx=5, pady=5)
@@ -129,7 +331,13 @@ class HotelManagementApp:
             self.guests_tree.heading(col, text=col)
             self.guests_tree.column(col, width=120)
 
-        self.guests_tree.pack(fill="both", expand=True)
+        # В дереве только видимые строки, прокрутка обрабатывается вручную
+        guests_scroll = ttk.Scrollbar(list_frame, orient="vertical")
+        guests_scroll.pack(side="right", fill="y")
+        self.guests_tree.pack(side="left", fill="both", expand=True)
+        self.guests_view = VirtualTreeview(
+            self.guests_tree, guests_scroll, self._guest_row
+        )
 
     def create_reservations_tab(self, parent):
         """Создание вкладки для бронирований"""
@@ -177,6 +385,35 @@ class HotelManagementApp:
         self.result_text = tk.Text(result_frame, height=4, width=80)
         self.result_text.pack(padx=5, pady=5)
 
+        # Список бронирований: история читается из БД страницами
+        list_frame = ttk.LabelFrame(parent, text="Список бронирований")
+        list_frame.pack(fill="both", expand=True, padx=5, pady=5)
+
+        columns = (
+            "ID",
+            "Гость",
+            "Номер",
+            "Заезд",
+            "Выезд",
+            "Гостей",
+            "Сумма",
+            "Статус",
+        )
+        self.reservations_tree = ttk.Treeview(
+            list_frame, columns=columns, show="headings"
+        )
+
+        for col in columns:
+            self.reservations_tree.heading(col, text=col)
+            self.reservations_tree.column(col, width=90)
+
+        reservations_scroll = ttk.Scrollbar(list_frame, orient="vertical")
+        reservations_scroll.pack(side="right", fill="y")
+        self.reservations_tree.pack(side="left", fill="both", expand=True)
+        self.reservations_view = VirtualTreeview(
+            self.reservations_tree, reservations_scroll, self._reservation_row
+        )
+
     def create_reports_tab(self, parent):
         """Создание вкладки для отчетов"""
         report_frame = ttk.Frame(parent)
@@ -189,18 +426,37 @@ class HotelManagementApp:
             report_frame, text="Показать статистику", command=self.show_statistics
         ).pack(pady=5)
 
+        self.metrics_enabled = tk.BooleanVar(value=METRICS.enabled)
+        ttk.Checkbutton(
+            report_frame,
+            text="Сбор метрик",
+            variable=self.metrics_enabled,
+            command=self.toggle_metrics,
+        ).pack(pady=5)
+        ttk.Button(
+            report_frame, text="Сохранить метрики", command=self.save_metrics
+        ).pack(pady=5)
+
         self.report_text = tk.Text(report_frame, height=15, width=80)
         self.report_text.pack(pady=10)
 
     def load_data(self):
         """Загрузка данных из БД"""
-        # Загрузка будет реализована после создания тестов
-        pass
+        self.rooms = self.repository.load_rooms()
+        self.room_registry = RoomRegistry(self.rooms)
+        self.guests = self.repository.load_guests()
+        for room in self.rooms:
+            self.statistics.track_room(room)
+        # История бронирований загружается при первом обращении
+        self.reservations = self.repository.reservations
+        self.update_rooms_list()
+        self.update_guests_list()
+        self.reservations_view.set_source(DatabaseSource(self.db, "reservations"))
 
     def add_room(self):
         """Добавление нового номера"""
         try:
-            room_id = len(self.rooms) + 1
+            room_id = self.repository.next_id(Room)
             room = Room(
                 id=room_id,
                 number=int(self.room_number.get()),
@@ -210,10 +466,15 @@ class HotelManagementApp:
             )
 
             if room.validate():
+                self.room_registry.add(room)
                 self.rooms.append(room)
-                self.db.save_room(room.to_dict())
+                self.repository.register(room)
+                self.availability.add_room(room)
+                self.statistics.add_room(room)
+                saved = self._save(room, self.db.save_room)
                 self.update_rooms_list()
-                messagebox.showinfo("Успех", "Номер успешно добавлен")
+                if saved:
+                    messagebox.showinfo("Успех", "Номер успешно добавлен")
             else:
                 messagebox.showerror("Ошибка", "Некорректные данные номера")
 
@@ -223,7 +484,7 @@ class HotelManagementApp:
     def add_guest(self):
         """Добавление нового гостя"""
         try:
-            guest_id = len(self.guests) + 1
+            guest_id = self.repository.next_id(Guest)
             guest = Guest(
                 id=guest_id,
                 name=self.guest_name.get(),
@@ -234,9 +495,15 @@ class HotelManagementApp:
 
             if guest.validate():
                 self.guests.append(guest)
-                self.db.save_guest(guest.to_dict())
+                self.repository.register(guest)
+                if self._guest_index is not None:
+                    self._guest_index.add(guest)
+                self.statistics.add_guest(guest)
+                saved = self._save(guest, self.db.save_guest)
                 self.update_guests_list()
-                messagebox.showinfo("Успех", "Гость успешно добавлен")
+                if saved:
+                    self.guests_view.scroll_to(len(self.guests))
+                    messagebox.showinfo("Успех", "Гость успешно добавлен")
             else:
                 messagebox.showerror("Ошибка", "Некорректные данные гостя")
 
@@ -247,7 +514,7 @@ class HotelManagementApp:
         """Расчет стоимости бронирования"""
         try:
             room_id = int(self.reservation_room.get().split(":")[0])
-            room = next((r for r in self.rooms if r.id == room_id), None)
+            room = self.room_registry.get(room_id)
 
             if not room:
                 messagebox.showerror("Ошибка", "Номер не найден")
@@ -257,7 +524,7 @@ class HotelManagementApp:
             check_out = datetime.strptime(self.check_out_date.get(), "%Y-%m-%d")
             num_guests = int(self.num_guests.get())
 
-            reservation_id = len(self.reservations) + 1
+            reservation_id = self.repository.next_id(Reservation)
             reservation = Reservation(
                 id=reservation_id,
                 guest_id=1,  # Временное значение
@@ -286,12 +553,12 @@ class HotelManagementApp:
     def add_reservation(self):
         """Добавление нового бронирования"""
         try:
-            reservation_id = len(self.reservations) + 1
             guest_id = int(self.reservation_guest.get().split(":")[0])
             room_id = int(self.reservation_room.get().split(":")[0])
 
+            # id выдает БД: другие рабочие места пишут в ту же базу
             reservation = Reservation(
-                id=reservation_id,
+                id=None,
                 guest_id=guest_id,
                 room_id=room_id,
                 check_in_date=datetime.strptime(self.check_in_date.get(), "%Y-%m-%d"),
@@ -299,135 +566,219 @@ class HotelManagementApp:
                 num_guests=int(self.num_guests.get()),
             )
 
-            room = next((r for r in self.rooms if r.id == room_id), None)
+            room = self.room_registry.get(room_id)
             if room:
                 reservation.calculate_stay_cost(room.price_per_night)
 
             if reservation.validate():
+                if not self.availability.is_room_free(
+                    room_id, reservation.check_in_date, reservation.check_out_date
+                ):
+                    messagebox.showerror("Ошибка", "Номер уже забронирован на эти даты")
+                    return
+                # Сохранение до обновления списков: другой пользователь БД
+                # мог занять номер на эти даты. Бронирование не ставится в
+                # очередь, чтобы конфликт был виден сразу; гость и номер из
+                # очереди записываются раньше него
+                if not self.flush_writes():
+                    return
+                reservation_id = self.db.book_if_free(reservation)
+                reservation = Reservation.from_row(
+                    (reservation_id,) + reservation.to_row()[1:]
+                )
                 self.reservations.append(reservation)
-                self.db.save_reservation(reservation.to_dict())
+                self.repository.register(reservation)
+                self.availability.add_reservation(reservation)
+                self.statistics.add_reservation(reservation)
+                self.update_reservations_list()
                 messagebox.showinfo("Успех", "Бронирование успешно создано")
             else:
                 messagebox.showerror("Ошибка", "Некорректные данные бронирования")
 
+        except BookingConflictError:
+            messagebox.showerror("Ошибка", "Номер уже забронирован на эти даты")
         except ValueError as e:
             messagebox.showerror("Ошибка", f"Некорректные данные: {e}")
+        except sqlite3.Error as e:
+            messagebox.showerror("Ошибка", f"Ошибка записи в БД: {e}")
 
     def export_to_excel(self):
         """Экспорт данных в Excel"""
-        try:
-            wb = Workbook()
-
-            # Лист с номерами
-            ws_rooms = wb.active
-            ws_rooms.title = "Номера"
-            ws_rooms.append(
-                ["ID", "Номер", "Тип", "Цена за ночь", "Вместимость", "Доступен"]
-            )
-            for room in self.rooms:
-                ws_rooms.append(
-                    [
-                        room.id,
-                        room.number,
-                        room.room_type,
-                        room.price_per_night,
-                        room.capacity,
-                        room.is_available,
-                    ]
+        if self._export_thread is not None and self._export_thread.is_alive():
+            messagebox.showinfo("Экспорт", "Экспорт уже выполняется")
+            return
+        self.flush_writes()
+        # Выгрузка идет в фоновом потоке, интерфейс получает события через очередь
+        events = queue.Queue()
+
+        def run():
+            try:
+                rows = export_to_xlsx(
+                    self.db,
+                    "hotel_report.xlsx",
+                    lambda done, total: events.put(("progress", done, total)),
                 )
-
-            # Лист с бронированиями
-            ws_reservations = wb.create_sheet("Бронирования")
-            ws_reservations.append(
-                [
-                    "ID",
-                    "ID Гостя",
-                    "ID Номера",
-                    "Дата заезда",
-                    "Дата выезда",
-                    "Кол-во гостей",
-                    "Общая стоимость",
-                    "Статус",
-                ]
-            )
-            for reservation in self.reservations:
-                ws_reservations.append(
-                    [
-                        reservation.id,
-                        reservation.guest_id,
-                        reservation.room_id,
-                        reservation.check_in_date.strftime("%Y-%m-%d"),
-                        reservation.check_out_date.strftime("%Y-%m-%d"),
-                        reservation.num_guests,
-                        reservation.total_cost,
-                        reservation.status,
-                    ]
+                events.put(("done", rows))
+            except Exception as e:
+                events.put(("error", e))
+            finally:
+                self.db.release_thread_connection()
+
+        self._export_thread = threading.Thread(target=run, daemon=True)
+        self._export_thread.start()
+        self.root.after(100, self._poll_export, events)
+
+    def _poll_export(self, events):
+        """Обработка событий фонового экспорта в потоке интерфейса"""
+        while not events.empty():
+            event = events.get_nowait()
+            if event[0] == "progress":
+                _, done, total = event
+                self.report_text.delete(1.0, tk.END)
+                self.report_text.insert(1.0, f"Экспорт: {done} из {total} строк")
+            elif event[0] == "done":
+                messagebox.showinfo(
+                    "Успех", "Данные экспортированы в hotel_report.xlsx"
                 )
-
-            wb.save("hotel_report.xlsx")
-            messagebox.showinfo("Успех", "Данные экспортированы в hotel_report.xlsx")
-
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка при экспорте: {e}")
+                return
+            else:
+                messagebox.showerror("Ошибка", f"Ошибка при экспорте: {event[1]}")
+                return
+        self.root.after(100, self._poll_export, events)
 
     def show_statistics(self):
         """Показать статистику"""
-        total_rooms = len(self.rooms)
-        available_rooms = len([r for r in self.rooms if r.is_available])
-        total_guests = len(self.guests)
-        active_reservations = len(
-            [r for r in self.reservations if r.status == "active"]
-        )
-
-        total_revenue = sum(r.total_cost for r in self.reservations)
-
+        statistics = self.statistics
         stats = f"""Статистика отеля:
-Всего номеров: {total_rooms}
-Доступных номеров: {available_rooms}
-Всего гостей: {total_guests}
-Активных бронирований: {active_reservations}
-Общий доход: {total_revenue:.2f} руб."""
+Всего номеров: {statistics.total_rooms}
+Доступных номеров: {statistics.available_rooms}
+Всего гостей: {statistics.total_guests}
+Активных бронирований: {statistics.active_reservations}
+Общий доход: {statistics.total_revenue:.2f} руб."""
+
+        by_type = statistics.by_room_type()
+        if by_type:
+            stats += "\n\nПо типам номеров:"
+            for room_type, totals in by_type.items():
+                stats += (
+                    f"\n{room_type or 'без номера'}: бронирований "
+                    f"{totals.reservations}, доход {totals.revenue:.2f} руб."
+                )
+        by_month = statistics.by_month()
+        if by_month:
+            stats += "\n\nПо месяцам заезда:"
+            for month, totals in list(by_month.items())[-12:]:
+                stats += (
+                    f"\n{month}: бронирований {totals.reservations}, "
+                    f"доход {totals.revenue:.2f} руб."
+                )
 
         self.report_text.delete(1.0, tk.END)
         self.report_text.insert(1.0, stats)
 
-    def update_rooms_list(self):
-        """Обновление списка номеров"""
-        for item in self.rooms_tree.get_children():
-            self.rooms_tree.delete(item)
+    def toggle_metrics(self):
+        """Включение и выключение сбора метрик"""
+        if self.metrics_enabled.get():
+            METRICS.enable()
+        else:
+            METRICS.disable()
 
-        for room in self.rooms:
-            self.rooms_tree.insert(
-                "",
-                "end",
-                values=(
-                    room.id,
-                    room.number,
-                    room.room_type,
-                    room.price_per_night,
-                    room.capacity,
-                    "Да" if room.is_available else "Нет",
-                ),
-            )
+    def save_metrics(self):
+        """Выгрузка метрик в JSON и в формате Prometheus"""
+        try:
+            for path in METRICS_FILES:
+                METRICS.dump(path)
+        except OSError as e:
+            messagebox.showerror("Ошибка", f"Ошибка при сохранении метрик: {e}")
+            return
+        messagebox.showinfo("Успех", f"Метрики сохранены в {', '.join(METRICS_FILES)}")
+
+    @staticmethod
+    def _room_row(room) -> tuple:
+        return (
+            room.id,
+            room.number,
+            room.room_type,
+            room.price_per_night,
+            room.capacity,
+            "Да" if room.is_available else "Нет",
+        )
+
+    @staticmethod
+    def _guest_row(guest) -> tuple:
+        return (guest.id, guest.name, guest.email, guest.phone, guest.passport)
+
+    @staticmethod
+    def _reservation_row(reservation) -> tuple:
+        return (
+            reservation.id,
+            reservation.guest_id,
+            reservation.room_id,
+            reservation.check_in_date.strftime("%Y-%m-%d"),
+            reservation.check_out_date.strftime("%Y-%m-%d"),
+            reservation.num_guests,
+            f"{reservation.total_cost:.2f}",
+            reservation.status,
+        )
+
+    def update_rooms_list(self):
+        """Обновление списка номеров (только изменившиеся строки)"""
+        self.rooms_view.sync(self.rooms)
+
+    @property
+    def guest_index(self) -> GuestSearchIndex:
+        """Поисковый индекс гостей (строится при первом обращении)"""
+        if self._guest_index is None:
+            self._guest_index = GuestSearchIndex(self.guests)
+        return self._guest_index
+
+    def search_guests(self):
+        """Поиск гостей по имени, email, телефону или паспорту"""
+        query = self.guest_search.get().strip()
+        if query:
+            self._show_guests(self.guest_index.search(query, limit=100))
+        else:
+            self.update_guests_list()
+
+    def update_reservations_list(self):
+        """Перечитывание видимого окна списка бронирований из БД"""
+        self.reservations_view.source.refresh()
+        self.reservations_view.render()
 
     def update_guests_list(self):
         """Обновление списка гостей"""
-        for item in self.guests_tree.get_children():
-            self.guests_tree.delete(item)
-
-        for guest in self.guests:
-            self.guests_tree.insert(
-                "",
-                "end",
-                values=(guest.id, guest.name, guest.email, guest.phone, guest.passport),
-            )
+        self._show_guests(self.guests)
+
+    def _show_guests(self, guests):
+        """Вывод гостей в таблицу (отображается только видимое окно)"""
+        if guests is self.guests_view.source:
+            self.guests_view.render()
+        else:
+            self.guests_view.set_source(guests)
 
 
 def main():
-    """Запуск приложения"""
+    """Запуск приложения
+
+    HOTEL_METRICS=<файл> включает сбор метрик и записывает их в файл при
+    выходе; HOTEL_PROFILE=<операция> снимает профиль cProfile ее первого
+    вызова в <операция>.prof.
+    """
+    metrics_path = os.environ.get("HOTEL_METRICS")
+    if metrics_path:
+        METRICS.enable()
+    profile = os.environ.get("HOTEL_PROFILE")
+    if profile:
+        METRICS.profile_next(profile, f"{profile}.prof")
     root = tk.Tk()
     app = HotelManagementApp(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        app.save_snapshot()
+        app.db.close()
+        if metrics_path:
+            METRICS.dump(metrics_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import pytest
+from hotel_management.async_db import AsyncDatabaseManager
+from hotel_management.guest import Guest
+from hotel_management.room import Room
+
+
+def make_guest(i: int, email: str = None) -> Guest:
+    return Guest(
+        i, f"Гость {i}", email or f"guest{i}@example.com", "+79001234567", f"PP{i}"
+    )
+
+
+class TestAsyncDatabaseManager:
+    def test_concurrent_writes_are_grouped(self, tmp_path):
+        async def run():
+            async with AsyncDatabaseManager(str(tmp_path / "hotel.db")) as db:
+                ids = await asyncio.gather(
+                    *(db.save_guest(make_guest(i)) for i in range(1, 101))
+                )
+                counts = await db.get_row_counts()
+                return ids, counts, db.writes, db.commits
+
+        ids, counts, writes, commits = asyncio.run(run())
+        assert ids == list(range(1, 101))
+        assert counts["guests"] == 100
+        assert writes == 100
+        assert commits < writes
+
+    def test_failed_write_does_not_affect_batch(self, tmp_path):
+        def save_then_fail(manager, room):
+            manager.save_room(room)
+            raise ValueError("сбой")
+
+        async def run():
+            async with AsyncDatabaseManager(str(tmp_path / "hotel.db")) as db:
+                await db.save_room(Room(1, 101, "single", 100.0, 1))
+                results = await asyncio.gather(
+                    db.save_room(Room(2, 102, "double", 150.0, 2)),
+                    db.write(save_then_fail, Room(3, 103, "double", 150.0, 2)),
+                    db.save_room(Room(4, 104, "suite", 300.0, 3)),
+                    return_exceptions=True,
+                )
+                rooms = await db.get_all_rooms()
+                return results, sorted(room.id for room in rooms)
+
+        results, room_ids = asyncio.run(run())
+        assert results[0] == 2 and results[2] == 4
+        assert isinstance(results[1], ValueError)
+        # Запись отмененной операции откатилась до точки сохранения
+        assert room_ids == [1, 2, 4]
+
+    def test_bounded_queue(self, tmp_path):
+        with pytest.raises(ValueError):
+            AsyncDatabaseManager(str(tmp_path / "hotel.db"), max_pending=0)
+
+        async def run():
+            db = AsyncDatabaseManager(str(tmp_path / "hotel.db"), max_pending=3)
+            await asyncio.gather(*(db.save_guest(make_guest(i)) for i in range(1, 21)))
+            await db.close()
+            with pytest.raises(ValueError):
+                await db.get_row_counts()
+            return db.commits
+
+        assert asyncio.run(run()) >= 7
+
+    def test_close_fails_waiting_writes(self, tmp_path):
+        started, release = threading.Event(), threading.Event()
+
+        def slow(manager):
+            started.set()
+            return release.wait(5)
+
+        async def run():
+            db = AsyncDatabaseManager(str(tmp_path / "hotel.db"), max_pending=1)
+            first = asyncio.ensure_future(db.write(slow))
+            waiting = [
+                asyncio.ensure_future(db.save_guest(make_guest(i))) for i in (1, 2)
+            ]
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            closing = asyncio.ensure_future(db.close())
+            await asyncio.sleep(0)
+            release.set()
+            await closing
+            results = await asyncio.wait_for(
+                asyncio.gather(*waiting, return_exceptions=True), 5
+            )
+            return await first, results
+
+        accepted, results = asyncio.run(run())
+        # Принятая до закрытия запись выполняется, ждущие место - нет
+        assert accepted is True
+        assert all(isinstance(result, ValueError) for result in results)
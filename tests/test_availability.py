@@ -0,0 +1,100 @@
+import random
+from datetime import date, datetime, timedelta
+import pytest
+from hotel_management.availability import AvailabilityEngine, IntervalTree
+from hotel_management.database import DatabaseManager
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+
+
+class TestIntervalTree:
+    def test_matches_linear_scan(self):
+        rng = random.Random(42)
+        intervals = []
+        for key in range(300):
+            start = rng.randrange(1000)
+            intervals.append((start, start + rng.randrange(1, 15), key))
+        tree = IntervalTree(intervals[:150])
+        for interval in intervals[150:]:
+            tree.add(*interval)
+        for interval in intervals[::3]:
+            assert tree.remove(*interval)
+        alive = [i for n, i in enumerate(intervals) if n % 3]
+        assert len(tree) == len(alive)
+        for _ in range(200):
+            start = rng.randrange(1000)
+            end = start + rng.randrange(1, 20)
+            expected = sorted(k for s, e, k in alive if s < end and e > start)
+            assert sorted(tree.find_overlapping(start, end)) == expected
+            assert tree.overlaps(start, end) == bool(expected)
+
+    def test_from_sorted_before_and_after_changes(self):
+        rng = random.Random(7)
+        intervals = []
+        for key in range(200):
+            start = rng.randrange(500)
+            intervals.append((start, start + rng.randrange(1, 30), key))
+        alive = sorted(intervals)
+        tree = IntervalTree.from_sorted(*zip(*alive))
+        for step in range(2):
+            for _ in range(200):
+                start = rng.randrange(520)
+                end = start + rng.randrange(1, 20)
+                expected = sorted(k for s, e, k in alive if s < end and e > start)
+                assert sorted(tree.find_overlapping(start, end)) == expected
+                assert tree.overlaps(start, end) == bool(expected)
+            assert len(tree) == len(alive)
+            # Первое изменение строит узлы дерева
+            assert tree.remove(*alive.pop(50))
+            tree.add(10, 12, 500)
+            alive.append((10, 12, 500))
+
+    def test_half_open_boundaries(self):
+        tree = IntervalTree([(10, 13, 1)])
+        assert not tree.overlaps(13, 15)
+        assert not tree.overlaps(7, 10)
+        assert tree.overlaps(12, 14)
+
+
+class TestAvailabilityEngine:
+    def test_booking_and_cancel(self):
+        engine = AvailabilityEngine()
+        engine.add_room(Room(1, 101, "double", 100.0, 2))
+        engine.add_room(Room(2, 102, "double", 100.0, 2))
+        reservation = Reservation(
+            1, 1, 1, datetime(2025, 5, 10), datetime(2025, 5, 14), 2
+        )
+        engine.add_reservation(reservation)
+        assert not engine.is_room_free(1, date(2025, 5, 12), date(2025, 5, 15))
+        assert engine.is_room_free(1, date(2025, 5, 14), date(2025, 5, 16))
+        assert engine.free_rooms(date(2025, 5, 11), date(2025, 5, 12), "double") == [2]
+        assert engine.cancel_reservation(1)
+        assert engine.free_rooms(date(2025, 5, 11), date(2025, 5, 12), "double") == [
+            1,
+            2,
+        ]
+
+    def test_remove_room(self):
+        engine = AvailabilityEngine()
+        engine.add_room(Room(1, 101, "double", 100.0, 2))
+        engine.add_room(Room(2, 102, "double", 100.0, 2))
+        engine.add_booking(1, 2, date(2025, 5, 10), date(2025, 5, 12))
+        engine.remove_room(1)
+        assert engine.free_rooms(date(2025, 5, 1), date(2025, 5, 2), "double") == [2]
+        with pytest.raises(ValueError):
+            engine.remove_room(2)
+
+    def test_from_database(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            db.save_rooms_many([Room(1, 101, "suite", 300.0, 4)])
+            booked = Reservation(
+                1, 1, 1, datetime(2025, 5, 10), datetime(2025, 5, 14), 2
+            )
+            cancelled = Reservation(
+                2, 1, 1, datetime(2025, 6, 1), datetime(2025, 6, 3), 2
+            )
+            cancelled.status = "cancelled"
+            db.save_reservations_many([booked, cancelled])
+            engine = AvailabilityEngine.from_database(db)
+        assert engine.conflicting_reservations(1, "2025-05-01", "2025-07-01") == [1]
+        assert engine.free_rooms("2025-06-01", "2025-06-03", "suite") == [1]
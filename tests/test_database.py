@@ -0,0 +1,258 @@
+import multiprocessing
+import random
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+import pytest
+from hotel_management.database import BookingConflictError, DatabaseManager
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+
+
+class TestDatabaseManager:
+    def test_connection_reused_within_thread(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            assert db.connection is db.connection
+
+    def test_connection_per_thread(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            other = []
+            thread = threading.Thread(target=lambda: other.append(db.connection))
+            thread.start()
+            thread.join()
+            assert other[0] is not db.connection
+
+    def test_finished_thread_connections_are_closed(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            opened = []
+
+            def run(release):
+                opened.append(db.connection)
+                if release:
+                    db.release_thread_connection()
+
+            for release in (True, False, False):
+                thread = threading.Thread(target=run, args=(release,))
+                thread.start()
+                thread.join()
+            # Соединение завершившегося потока закрывается при следующем открытии
+            for conn in opened[:2]:
+                with pytest.raises(sqlite3.ProgrammingError):
+                    conn.execute("SELECT 1")
+            assert list(db._connections.values()) == [db.connection, opened[2]]
+
+    def test_pragmas_applied(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db"), synchronous="OFF") as db:
+            assert db.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert db.connection.execute("PRAGMA synchronous").fetchone()[0] == 0
+
+    def test_save_and_get_room(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            db.save_room(Room(1, 101, "single", 100.0, 2).to_dict())
+            rooms = db.get_all_rooms()
+            assert len(rooms) == 1
+            assert rooms[0].number == 101
+
+    def test_transaction_rollback(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            with pytest.raises(RuntimeError):
+                with db.transaction():
+                    db.save_room(Room(1, 101, "single", 100.0, 2).to_dict())
+                    raise RuntimeError
+            assert db.get_all_rooms() == []
+
+    def test_reopen_after_close(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / "hotel.db"))
+        db.save_room(Room(1, 101, "single", 100.0, 2).to_dict())
+        db.close()
+        assert len(db.get_all_rooms()) == 1
+        db.close()
+
+    def test_save_rooms_many_from_generator(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            rooms = (Room(i, 100 + i, "double", 80.0, 2) for i in range(1, 8))
+            ids = db.save_rooms_many(rooms, chunk_size=3)
+            assert ids == list(range(1, 8))
+            assert len(db.get_all_rooms()) == 7
+
+    def test_save_many_accepts_dicts(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            guest = {
+                "id": None,
+                "name": "John Doe",
+                "email": "john@example.com",
+                "phone": "+1234567890",
+                "passport": "AB123456",
+                "created_at": "2025-01-01T00:00:00",
+            }
+            assert db.save_guests_many([guest]) == [1]
+
+    def test_save_many_rolls_back_whole_batch(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            broken = dict(Room(2, 102, "single", 50.0, 1).to_dict(), room_type=None)
+            rooms = [Room(1, 101, "single", 50.0, 1), broken]
+            with pytest.raises(sqlite3.IntegrityError):
+                db.save_rooms_many(rooms)
+            assert db.get_all_rooms() == []
+
+
+def _reservation(id, room_id, guest_id, check_in, nights, status="active"):
+    return {
+        "id": id,
+        "guest_id": guest_id,
+        "room_id": room_id,
+        "check_in_date": check_in.isoformat(),
+        "check_out_date": (check_in + timedelta(days=nights)).isoformat(),
+        "num_guests": 1,
+        "total_cost": 100.0 * nights,
+        "status": status,
+        "created_at": check_in.isoformat(),
+    }
+
+
+class TestReservationQueries:
+    @pytest.fixture
+    def db(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            day = datetime(2025, 3, 1)
+            db.save_reservations_many(
+                [
+                    _reservation(1, 204, 1, day, 3),
+                    _reservation(2, 204, 2, day + timedelta(days=3), 2),
+                    _reservation(3, 204, 1, day + timedelta(days=10), 1, "cancelled"),
+                    _reservation(4, 101, 1, day, 5),
+                ]
+            )
+            yield db
+
+    def test_room_reservations_in_window(self, db):
+        found = db.get_room_reservations(204, date(2025, 3, 3), date(2025, 3, 5))
+        assert [r["id"] for r in found] == [1, 2]
+        assert db.get_room_reservations(204, date(2025, 3, 6), date(2025, 3, 12)) == []
+        found = db.get_room_reservations(
+            204, date(2025, 3, 6), date(2025, 3, 12), include_cancelled=True
+        )
+        assert [r["id"] for r in found] == [3]
+
+    def test_guest_active_reservations(self, db):
+        assert [r["id"] for r in db.get_guest_active_reservations(1)] == [1, 4]
+
+    def test_reservations_by_status(self, db):
+        assert [r["id"] for r in db.get_reservations_by_status("cancelled")] == [3]
+        assert len(db.get_reservations_by_status("active", limit=2)) == 2
+
+    def test_reservations_page_by_status(self, db):
+        page = db.get_reservations_page_by_status("active", limit=2)
+        assert [row[0] for row in page] == [1, 2]
+        assert db.get_reservations_page_by_status("active", after_id=2)[0][0] == 4
+        page = db.get_reservations_page_by_status("active", since=date(2025, 3, 5))
+        assert [row[0] for row in page] == [2, 4]
+
+    @pytest.mark.parametrize("schema_version", [1, 2])
+    @pytest.mark.parametrize(
+        "query, params, index",
+        [
+            ("room_reservations", (204, 2, 1, 0), "room_dates (room_id=? AND check_in"),
+            ("overlap", (204, 2, 1), "room_dates (room_id=? AND check_in"),
+            ("guest_reservations", (1,), "guest (guest_id=?)"),
+            ("reservations_by_status", ("active", 10), "status (status=?)"),
+            ("status_page", ("active", 0, 1, 10), "status (status=? AND rowid>?)"),
+        ],
+    )
+    def test_queries_use_indexes(self, tmp_path, schema_version, query, params, index):
+        path = str(tmp_path / "hotel.db")
+        with DatabaseManager(path, schema_version=schema_version) as db:
+            plan = db.connection.execute(
+                f"EXPLAIN QUERY PLAN {db._queries[query]}", params
+            ).fetchall()
+        assert any(
+            "USING INDEX idx_reservations_" in detail and index in detail
+            for *_, detail in plan
+        ), plan
+
+
+class TestStreaming:
+    @pytest.fixture
+    def db(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            db.save_rooms_many(
+                Room(i, 100 + i, "double", 10.0 * i, 2) for i in range(1, 11)
+            )
+            yield db
+
+    def test_iter_rooms_in_batches(self, db):
+        rows = list(db.iter_rooms(batch_size=3))
+        assert [row[0] for row in rows] == list(range(1, 11))
+        assert isinstance(rows[0], tuple)
+
+    def test_iter_rooms_formats(self, db):
+        assert next(db.iter_rooms(row_format="dict"))["number"] == 101
+        assert next(db.iter_rooms(row_format="row"))["room_type"] == "double"
+        room = next(db.iter_rooms(row_format="entity"))
+        assert isinstance(room, Room)
+        assert room.price_per_night == 10.0
+        assert room.is_available is True
+
+    def test_unknown_format(self, db):
+        with pytest.raises(ValueError):
+            db.iter_rooms(row_format="xml")
+
+    def test_keyset_pagination(self, db):
+        first = db.get_rooms_page(limit=4)
+        second = db.get_rooms_page(after_id=first[-1][0], limit=4)
+        assert [row[0] for row in first] == [1, 2, 3, 4]
+        assert [row[0] for row in second] == [5, 6, 7, 8]
+        assert db.get_rooms_page(after_id=10) == []
+
+
+def book_randomly(path: str, seed: int, attempts: int) -> int:
+    """Процесс-участник гонки: случайные бронирования трех номеров"""
+    rng = random.Random(seed)
+    booked = 0
+    with DatabaseManager(path, timeout=0.05) as db:
+        for _ in range(attempts):
+            check_in = datetime(2030, 1, 1) + timedelta(days=rng.randrange(20))
+            reservation = Reservation(
+                None, 1, rng.randrange(1, 4), check_in, check_in + timedelta(2), 1
+            )
+            try:
+                db.book_if_free(reservation, retries=50)
+                booked += 1
+            except BookingConflictError:
+                pass
+    return booked
+
+
+class TestBookIfFree:
+    def test_conflict_check(self, tmp_path):
+        start = datetime(2030, 1, 10)
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            db.book_if_free(Reservation(1, 1, 1, start, start + timedelta(3), 1))
+            with pytest.raises(BookingConflictError):
+                db.book_if_free(
+                    Reservation(2, 1, 1, start + timedelta(2), start + timedelta(5), 1)
+                )
+            # Выезд в день заезда следующего гостя - не пересечение
+            db.book_if_free(
+                Reservation(3, 1, 1, start + timedelta(3), start + timedelta(4), 1)
+            )
+            db.book_if_free(Reservation(4, 1, 2, start, start + timedelta(3), 1))
+            with pytest.raises(sqlite3.IntegrityError):
+                # Чужой id не перезаписывается
+                db.book_if_free(Reservation(4, 1, 3, start, start + timedelta(3), 1))
+            with pytest.raises(ValueError):
+                db.book_if_free(Reservation(5, 1, 3, start, start, 1))
+            assert sorted(r.id for r in db.get_all_reservations()) == [1, 3, 4]
+            assert not db.connection.in_transaction
+
+    def test_no_double_bookings_across_processes(self, tmp_path):
+        path = str(tmp_path / "hotel.db")
+        DatabaseManager(path).close()
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(4) as pool:
+            booked = pool.starmap(
+                book_randomly, [(path, seed, 30) for seed in range(4)]
+            )
+        with DatabaseManager(path) as db:
+            assert db.get_double_bookings() == []
+            assert db.get_row_counts()["reservations"] == sum(booked)
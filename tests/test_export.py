@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from hotel_management.database import DatabaseManager
+from hotel_management.export import export_to_xlsx, main
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+
+
+@pytest.fixture
+def db(tmp_path):
+    with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+        db.save_rooms_many([Room(1, 101, "single", 100.0, 1)])
+        day = datetime(2025, 5, 1)
+        db.save_reservations_many(
+            Reservation(i, 1, 1, day, day + timedelta(days=2), 1) for i in range(1, 6)
+        )
+        yield db
+
+
+class TestExport:
+    def test_export_sheets(self, db, tmp_path):
+        path = str(tmp_path / "report.xlsx")
+        assert export_to_xlsx(db, path) == 6
+        workbook = openpyxl.load_workbook(path)
+        assert workbook.sheetnames == ["Номера", "Бронирования"]
+        rows = list(workbook["Бронирования"].values)
+        assert rows[1][:5] == (1, 1, 1, "2025-05-01", "2025-05-03")
+        assert list(workbook["Номера"].values)[1][-1] is True
+
+    def test_splits_by_row_limit(self, db, tmp_path):
+        path = str(tmp_path / "report.xlsx")
+        export_to_xlsx(db, path, max_rows=3)
+        workbook = openpyxl.load_workbook(path)
+        assert workbook.sheetnames == [
+            "Номера",
+            "Бронирования",
+            "Бронирования (2)",
+            "Бронирования (3)",
+        ]
+        assert [row[0] for row in workbook["Бронирования (3)"].values] == ["ID", 5]
+
+    def test_progress_callback(self, db, tmp_path):
+        calls = []
+        export_to_xlsx(
+            db,
+            str(tmp_path / "report.xlsx"),
+            progress=lambda done, total: calls.append((done, total)),
+            progress_every=4,
+        )
+        assert calls == [(4, 6), (6, 6)]
+
+    def test_reads_one_state_of_database(self, db, tmp_path):
+        calls = []
+
+        def progress(done, total):
+            if not calls:
+                # Запись другого соединения во время выгрузки
+                with DatabaseManager(db.db_path) as other:
+                    day = datetime(2025, 6, 1)
+                    other.save_reservation(
+                        Reservation(6, 1, 1, day, day + timedelta(days=1), 1)
+                    )
+            calls.append((done, total))
+
+        path = str(tmp_path / "report.xlsx")
+        assert export_to_xlsx(db, path, progress=progress, progress_every=1) == 6
+        assert calls[-1] == (6, 6)
+        assert len(list(openpyxl.load_workbook(path)["Бронирования"].values)) == 6
+
+    def test_cli_does_not_create_database(self, tmp_path):
+        path = tmp_path / "missing.db"
+        with pytest.raises(SystemExit):
+            main([str(path), str(tmp_path / "report.xlsx"), "--quiet"])
+        assert not path.exists()
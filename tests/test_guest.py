@@ -1,5 +1,5 @@
 import pytest
-from hotel_management.guest import Guest
+from hotel_management.guest import Guest, guest_errors
 
 
 class TestGuest:
@@ -13,3 +13,18 @@ class TestGuest:
     def test_guest_validation(self):
         guest = Guest(1, "John Doe", "john@example.com", "+1234567890", "AB123456")
         assert guest.validate() == True
+
+    @pytest.mark.parametrize(
+        "field, value",
+        [("name", " "), ("email", "john"), ("phone", "0123"), ("passport", "AB1")],
+    )
+    def test_validation_matches_guest_errors(self, field, value):
+        args = ["John Doe", "john@example.com", "+1234567890", "AB123456"]
+        args[["name", "email", "phone", "passport"].index(field)] = value
+        guest = Guest(1, *args)
+        assert guest_errors(guest.to_dict())
+        assert guest.validate() == False
+
+    def test_row_round_trip(self):
+        guest = Guest(1, "John Doe", "john@example.com", "+1234567890", "AB123456")
+        assert Guest.from_row(guest.to_row()).to_dict() == guest.to_dict()
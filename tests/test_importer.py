@@ -0,0 +1,140 @@
+import csv
+import json
+from datetime import datetime
+import pytest
+from hotel_management.database import DatabaseManager
+from hotel_management.importer import import_file
+from hotel_management.reservation import Reservation
+
+
+@pytest.fixture
+def db(tmp_path):
+    with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+        yield db
+
+
+def write_guests_csv(path, count):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "email", "phone", "passport"])
+        for i in range(1, count + 1):
+            email = "broken" if i % 10 == 0 else f"guest{i}@example.com"
+            writer.writerow([i, f"Гость {i}", email, "+79001234567", f"PP{i:06d}"])
+
+
+class TestImporter:
+    def test_csv_rejects_invalid_rows(self, db, tmp_path):
+        path = tmp_path / "guests.csv"
+        write_guests_csv(path, 25)
+        rejects = []
+        report = import_file(
+            db, "guests", str(path), on_reject=lambda *reject: rejects.append(reject)
+        )
+        assert (report.records, report.imported, report.rejected) == (25, 23, 2)
+        assert report.reasons == {"email: Некорректный email адрес": 2}
+        assert [number for number, _, _ in rejects] == [10, 20]
+        assert db.get_row_counts()["guests"] == 23
+        assert db.get_import_checkpoint(f"guests:{path}") is None
+
+    def test_jsonl_reservations_and_rooms(self, db, tmp_path):
+        rooms = tmp_path / "rooms.csv"
+        rooms.write_text(
+            "number,room_type,price_per_night,capacity,is_available\n"
+            "101,single,100,1,0\n"
+            "102,penthouse,100,1,1\n"
+            "103,double,abc,2,1\n",
+            encoding="utf-8",
+        )
+        report = import_file(db, "rooms", str(rooms))
+        assert (report.imported, report.rejected) == (1, 2)
+        assert db.get_all_rooms()[0].is_available is False
+
+        path = tmp_path / "reservations.jsonl"
+        lines = [
+            {
+                "id": 1,
+                "guest_id": 1,
+                "room_id": 1,
+                "check_in_date": "2020-01-01",
+                "check_out_date": "2020-01-03",
+                "num_guests": 1,
+                "status": "completed",
+            },
+            {"id": 2, "guest_id": 1, "room_id": 1, "check_in_date": "2020-01-05"},
+        ]
+        path.write_text(
+            "\n".join(json.dumps(line) for line in lines) + "\n{oops\n",
+            encoding="utf-8",
+        )
+        report = import_file(db, "reservations", str(path))
+        assert (report.imported, report.rejected) == (1, 2)
+        assert report.reasons["строка: некорректный JSON"] == 1
+        assert report.reasons["num_guests: поле отсутствует"] == 1
+        saved = db.get_all_reservations()[0]
+        # История в прошлом допускается, даты приводятся к формату БД
+        assert saved.check_in_date == datetime(2020, 1, 1)
+        assert saved.status == "completed"
+
+    def test_reservations_are_checked_for_overlap(self, db, tmp_path):
+        db.save_reservation(
+            Reservation(1, 1, 2, datetime(2030, 1, 1), datetime(2030, 1, 5), 1)
+        )
+        path = tmp_path / "reservations.csv"
+        path.write_text(
+            "id,guest_id,room_id,check_in_date,check_out_date,num_guests\n"
+            ",1,1,2030-01-01,2030-01-04,1\n"
+            ",1,1,2030-01-03,2030-01-06,1\n"
+            "1,1,3,2030-02-01,2030-02-03,1\n"
+            ",1,1,2030-01-04,2030-01-06,1\n",
+            encoding="utf-8",
+        )
+        rejects = []
+        report = import_file(
+            db,
+            "reservations",
+            str(path),
+            batch_size=2,
+            on_reject=lambda *reject: rejects.append(reject),
+        )
+        assert (report.imported, report.rejected) == (2, 2)
+        assert [number for number, _, _ in rejects] == [2, 3]
+        assert report.reasons["id: бронирование с таким id уже есть"] == 1
+        assert db.get_double_bookings() == []
+        # Существующее бронирование с тем же id не перезаписано
+        assert db.get_all_reservations()[0].room_id == 2
+
+    def test_resume_after_crash(self, db, tmp_path):
+        path = tmp_path / "guests.csv"
+        write_guests_csv(path, 95)
+        rejects = []
+
+        def crash(records, imported, rejected):
+            if records >= 40:
+                raise RuntimeError("сбой")
+
+        with pytest.raises(RuntimeError):
+            import_file(
+                db,
+                "guests",
+                str(path),
+                batch_size=20,
+                on_reject=lambda *reject: rejects.append(reject),
+                progress=crash,
+            )
+        checkpoint = db.get_import_checkpoint(f"guests:{path}")
+        assert checkpoint[1:4] == (40, 36, 4)
+        assert sum(checkpoint[4].values()) == 4
+
+        report = import_file(
+            db,
+            "guests",
+            str(path),
+            batch_size=20,
+            on_reject=lambda *reject: rejects.append(reject),
+        )
+        assert report.resumed_from == 40
+        assert (report.records, report.imported, report.rejected) == (95, 86, 9)
+        # Причины отказов до сбоя восстанавливаются из точки импорта
+        assert sum(report.reasons.values()) == 9
+        assert [number for number, _, _ in rejects] == list(range(10, 100, 10))
+        assert db.get_row_counts()["guests"] == 86
@@ -0,0 +1,139 @@
+import pytest
+from hotel_management.database import DatabaseManager
+from hotel_management.guest import Guest
+from hotel_management.list_view import DatabaseSource, TreeviewSync, VirtualTreeview
+
+
+class FakeTree:
+    """Минимальная замена ttk.Treeview с подсчетом вызовов"""
+
+    def __init__(self, height=10):
+        self.height = height
+        self.children = []
+        self.values = {}
+        self.calls = 0
+        self.bindings = {}
+
+    def cget(self, option):
+        return self.height
+
+    def bind(self, event, handler):
+        self.bindings[event] = handler
+
+    def insert(self, parent, index, iid, values):
+        self.calls += 1
+        self.children.insert(index, iid)
+        self.values[iid] = values
+
+    def item(self, iid, values):
+        self.calls += 1
+        self.values[iid] = values
+
+    def move(self, iid, parent, index):
+        self.calls += 1
+        self.children.remove(iid)
+        self.children.insert(index, iid)
+
+    def delete(self, *iids):
+        self.calls += 1
+        for iid in iids:
+            self.children.remove(iid)
+            del self.values[iid]
+
+    def rows(self):
+        return [self.values[iid] for iid in self.children]
+
+
+class FakeScrollbar:
+    def configure(self, command):
+        self.command = command
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+def make_guests(count, start=1):
+    return [
+        Guest(i, f"Guest {i}", f"guest{i}@example.com", "+79001234567", f"PP{i:06d}")
+        for i in range(start, start + count)
+    ]
+
+
+def guest_row(guest):
+    return (guest.id, guest.name)
+
+
+class TestTreeviewSync:
+    def test_append_touches_only_new_rows(self):
+        tree = FakeTree()
+        view = TreeviewSync(tree, guest_row)
+        guests = make_guests(100)
+        view.sync(guests)
+        tree.calls = 0
+        guests.append(make_guests(1, start=101)[0])
+        stats = view.sync(guests)
+        assert stats == (1, 0, 0, 0)
+        assert tree.calls == 1
+        assert tree.rows() == [guest_row(g) for g in guests]
+
+    def test_update_remove_and_reorder(self):
+        tree = FakeTree()
+        view = TreeviewSync(tree, guest_row)
+        guests = make_guests(5)
+        view.sync(guests)
+        guests[1].name = "Renamed Guest"
+        del guests[3]
+        stats = view.sync(guests)
+        assert (stats.updated, stats.removed, stats.moved) == (1, 1, 0)
+        guests.reverse()
+        view.sync(guests)
+        assert tree.rows() == [guest_row(g) for g in guests]
+
+
+class TestVirtualTreeview:
+    def test_only_visible_window_materialised(self):
+        tree, scrollbar = FakeTree(height=10), FakeScrollbar()
+        view = VirtualTreeview(tree, scrollbar, guest_row)
+        guests = make_guests(1000)
+        view.set_source(guests)
+        assert tree.rows() == [guest_row(g) for g in guests[:10]]
+
+        tree.calls = 0
+        view.scroll(1)
+        # Одна строка ушла сверху и одна добавилась снизу
+        assert tree.calls == 2
+        assert tree.rows() == [guest_row(g) for g in guests[1:11]]
+
+        scrollbar.command("moveto", "0.5")
+        assert tree.rows()[0] == guest_row(guests[500])
+        assert scrollbar.position == (0.5, 0.51)
+        view.scroll_to(5000)
+        assert tree.rows() == [guest_row(g) for g in guests[-10:]]
+
+
+class TestDatabaseSource:
+    def test_slices_cross_pages(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            # Пропуски в id не должны сдвигать позиции
+            guests = make_guests(120)[::2] + make_guests(50, start=500)
+            db.save_guests_many(guests)
+            source = DatabaseSource(db, "guests", page_size=16)
+            assert len(source) == len(guests)
+            assert [g.id for g in source[10:45]] == [g.id for g in guests[10:45]]
+            assert [g.id for g in source[100:]] == [g.id for g in guests[100:]]
+            assert source[-1].id == guests[-1].id
+            with pytest.raises(IndexError):
+                source[len(guests)]
+
+    def test_virtual_view_over_database(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            db.save_guests_many(make_guests(300))
+            tree = FakeTree(height=10)
+            view = VirtualTreeview(tree, FakeScrollbar(), guest_row)
+            view.set_source(DatabaseSource(db, "guests", page_size=32))
+            view.scroll_to(295)
+            assert [row[0] for row in tree.rows()] == list(range(291, 301))
+            db.save_guests_many(make_guests(2, start=301))
+            view.source.refresh()
+            view.scroll_to(1000)
+            assert [row[0] for row in tree.rows()] == list(range(293, 303))
@@ -0,0 +1,98 @@
+import json
+import pstats
+import pytest
+from hotel_management.database import DatabaseManager
+from hotel_management.metrics import METRICS, Histogram, MetricsRegistry
+from hotel_management.room import Room
+
+
+@pytest.fixture
+def metrics():
+    METRICS.reset()
+    METRICS.enable()
+    yield METRICS
+    METRICS.disable()
+    METRICS.reset()
+
+
+class TestMetrics:
+    def test_histogram_quantiles(self):
+        histogram = Histogram()
+        for ms in range(1, 101):
+            histogram.observe(ms / 1000)
+        assert histogram.count == 100
+        # Корзины шириной 2**(1/4): ошибка оценки меньше 20%
+        assert histogram.quantile(0.5) == pytest.approx(0.050, rel=0.2)
+        assert histogram.quantile(0.95) == pytest.approx(0.095, rel=0.2)
+        assert histogram.quantile(0.99) <= histogram.max == 0.1
+
+    def test_instrument_counts_and_toggle(self):
+        registry = MetricsRegistry()
+
+        @registry.instrument("op")
+        def op(n):
+            if n < 0:
+                raise ValueError("n < 0")
+            return list(range(n))
+
+        @registry.instrument("gen")
+        def gen(n):
+            yield from range(n)
+
+        op(3)
+        assert registry.operations == {}
+        registry.enable()
+        op(3)
+        op(4)
+        with pytest.raises(ValueError):
+            op(-1)
+        assert list(gen(5)) == [0, 1, 2, 3, 4]
+        registry.disable()
+        op(3)
+        snapshot = registry.snapshot()["operations"]
+        assert {k: snapshot["op"][k] for k in ("calls", "errors", "rows")} == {
+            "calls": 3,
+            "errors": 1,
+            "rows": 7,
+        }
+        assert (snapshot["gen"]["calls"], snapshot["gen"]["rows"]) == (1, 5)
+        assert snapshot["op"]["p99_seconds"] >= snapshot["op"]["p50_seconds"]
+
+    def test_database_and_export(self, metrics, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            db.save_rooms_many(
+                Room(i, 100 + i, "single", 100.0, 1) for i in range(1, 11)
+            )
+            db.save_room(Room(11, 111, "double", 100.0, 2))
+            assert len(list(db.iter_rooms(batch_size=4))) == 11
+            assert len(db.get_all_rooms()) == 11
+        Room(12, 112, "suite", 100.0, 2).validate()
+        operations = metrics.snapshot()["operations"]
+        assert operations["db.save_rooms_many"]["rows"] == 10
+        assert operations["db.save_room"]["rows"] == 1
+        assert operations["db.iter_rooms"]["rows"] == 11
+        assert operations["db.get_all_rooms"]["rows"] == 11
+        assert operations["room.validate"]["calls"] == 1
+        assert "db.transaction" not in operations
+
+        metrics.dump(str(tmp_path / "metrics.json"))
+        saved = json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))
+        assert saved["operations"]["db.save_room"]["calls"] == 1
+        metrics.dump(str(tmp_path / "metrics.prom"))
+        text = (tmp_path / "metrics.prom").read_text(encoding="utf-8")
+        assert "# TYPE hotel_operation_duration_seconds histogram" in text
+        assert (
+            'hotel_operation_duration_seconds_bucket{operation="db.save_room",'
+            'le="+Inf"} 1' in text
+        )
+        assert 'hotel_operation_rows_total{operation="db.iter_rooms"} 11' in text
+
+    def test_profile_next(self, metrics, tmp_path):
+        path = str(tmp_path / "validate.prof")
+        metrics.profile_next("room.validate", path)
+        room = Room(1, 101, "single", 100.0, 1)
+        room.validate()
+        room.validate()
+        stats = pstats.Stats(path)
+        assert any(name == "validate" for _, _, name in stats.stats)
+        assert metrics.snapshot()["operations"]["room.validate"]["calls"] == 2
@@ -0,0 +1,174 @@
+import random
+from datetime import date, datetime, timedelta
+import pytest
+from hotel_management.database import INSERT_RESERVATION_SQL, DatabaseManager
+from hotel_management.guest import Guest
+from hotel_management.migration import migrate
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+
+
+@pytest.fixture(scope="module")
+def data():
+    """Одни и те же сущности для всех БД: created_at берется из часов"""
+    rng = random.Random(7)
+    rooms = [Room(i, 100 + i, Room.ROOM_TYPES[i % 4], 50.0 + i, 2) for i in range(1, 7)]
+    guests = [
+        Guest(i, f"Guest {i}", f"guest{i}@example.com", "+79001234567", f"P{i}")
+        for i in range(1, 4)
+    ]
+    reservations = []
+    start = datetime(2030, 1, 1)
+    for i in range(1, 41):
+        check_in = start + timedelta(days=rng.randrange(60), hours=rng.randrange(3))
+        reservation = Reservation(
+            i, 1 + i % 3, 1 + i % 6, check_in, check_in + timedelta(2), 1
+        )
+        reservation.calculate_stay_cost(rng.uniform(50, 500))
+        if i % 5 == 0:
+            reservation.status = "cancelled"
+        reservations.append(reservation)
+    return rooms, guests, reservations
+
+
+def populate(db, data):
+    rooms, guests, reservations = data
+    db.save_rooms_many(rooms)
+    db.save_guests_many(guests)
+    db.save_reservations_many(reservations)
+
+
+def snapshot(db) -> dict:
+    """Результаты методов DatabaseManager, которые не должны зависеть от схемы"""
+    aggregates = db.get_statistics_aggregates()
+    return {
+        "rooms": [room.to_row() for room in db.get_all_rooms()],
+        "guests": list(db.iter_guests()),
+        "reservations": [r.to_row() for r in db.get_all_reservations()],
+        "page": db.get_reservations_page(after_id=10, limit=5),
+        "room": db.get_room_reservations(
+            2, date(2030, 1, 10), date(2030, 2, 10), include_cancelled=True
+        ),
+        "active": list(db.iter_active_reservations(datetime(2030, 2, 1))),
+        "guest": db.get_guest_active_reservations(1),
+        "facts": list(db.iter_reservation_facts(1, 1000)),
+        "doubles": db.get_double_bookings(),
+        "room_stats": sorted(aggregates["rooms"]),
+        # Порядок сложения в SUM() не задан: суммы сравниваются с округлением
+        "reservation_stats": sorted(
+            row[:4] + (round(row[4], 6),) for row in aggregates["reservations"]
+        ),
+        "counts": db.get_row_counts(),
+    }
+
+
+class TestSchema:
+    def test_new_database_is_v2(self, tmp_path, data):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            populate(db, data)
+            assert db.schema_version == 2
+            conn = db.connection
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == 2
+            assert conn.execute(
+                "SELECT typeof(check_in), typeof(check_out) FROM reservations_v2"
+            ).fetchone() == ("integer", "integer")
+            assert conn.execute(
+                "SELECT type FROM sqlite_master WHERE name = 'reservations'"
+            ).fetchone() == ("view",)
+
+    def test_v1_and_v2_return_same_rows(self, tmp_path, data):
+        with DatabaseManager(str(tmp_path / "v1.db"), schema_version=1) as v1:
+            populate(v1, data)
+            expected = snapshot(v1)
+        with DatabaseManager(str(tmp_path / "v2.db")) as v2:
+            populate(v2, data)
+            assert snapshot(v2) == expected
+            restored = list(v2.iter_reservations(row_format="entity"))
+        # Даты с часами и created_at с микросекундами восстанавливаются точно
+        assert [r.to_row() for r in restored] == [r.to_row() for r in data[2]]
+
+    def test_v1_statements_work_through_views(self, tmp_path, data):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            populate(db, data)
+            row = Reservation(
+                None, 1, 1, datetime(2031, 1, 1), datetime(2031, 1, 3), 1
+            ).to_row()
+            db.connection.execute(INSERT_RESERVATION_SQL, row)
+            db.connection.execute(
+                "UPDATE rooms SET room_type = 'penthouse' WHERE id = 1"
+            )
+            assert db.get_room_reservations(1, date(2031, 1, 1), date(2031, 1, 2))
+            assert db.get_all_rooms()[0].room_type == "penthouse"
+
+
+class TestMigration:
+    def test_resumable_migration_with_live_writes(self, tmp_path, data):
+        path = str(tmp_path / "hotel.db")
+        with DatabaseManager(path, schema_version=1) as db:
+            populate(db, data)
+            assert not migrate(db, batch_size=7, max_batches=3)
+            assert db.schema_version == 1
+
+        # Запись в v1 во время миграции: в уже перенесенные и новые строки
+        live = DatabaseManager(path)
+        assert live.schema_version == 1
+        live.set_reservation_status(2, "cancelled")
+        live.save_reservation(
+            Reservation(None, 2, 3, datetime(2030, 5, 1), datetime(2030, 5, 4), 2)
+        )
+        live.save_room(
+            {
+                "id": 7,
+                "number": 107,
+                "room_type": "penthouse",
+                "price_per_night": 900.0,
+                "capacity": 4,
+                "is_available": False,
+                "created_at": datetime(2030, 1, 1, 12, 0, 0, 5).isoformat(),
+            }
+        )
+        live.connection.execute("DELETE FROM reservations WHERE id = 3")
+        expected = snapshot(live)
+
+        with DatabaseManager(path) as db:
+            assert migrate(db, batch_size=7)
+            assert db.schema_version == 2
+            assert snapshot(db) == expected
+            assert migrate(db)
+
+        # Соединение, открытое до переключения, работает через представления
+        assert snapshot(live) == expected
+        live.save_reservation(
+            Reservation(50, 1, 1, datetime(2031, 1, 1), datetime(2031, 1, 2), 1)
+        )
+        assert live.reload_schema() == 2
+        assert live.get_room_reservations(1, date(2031, 1, 1), date(2031, 1, 2))
+        live.close()
+
+    def test_writes_from_manager_opened_before_migration(self, tmp_path, data):
+        path = str(tmp_path / "hotel.db")
+        with DatabaseManager(path, schema_version=1) as db:
+            populate(db, data)
+        live = DatabaseManager(path)
+        with DatabaseManager(path) as db:
+            assert migrate(db)
+
+        def reservation(day: int) -> Reservation:
+            return Reservation(
+                None, 1, 1, datetime(2031, 1, day), datetime(2031, 1, day + 1), 1
+            )
+
+        # id новых строк берется из таблиц v2, а не из представлений
+        ids = [live.book_if_free(reservation(1)), live.book_if_free(reservation(3))]
+        ids += live.save_reservations_many([reservation(5)])
+        ids.append(live.save_room(Room(None, 301, "suite", 500.0, 3)))
+        assert live.schema_version == 2
+        assert ids == [41, 42, 43, 7]
+        assert [
+            r.check_in_date.day for r in live.get_all_reservations() if r.id > 40
+        ] == [1, 3, 5]
+        live.close()
+
+    def test_unknown_schema_version(self, tmp_path):
+        with pytest.raises(ValueError):
+            DatabaseManager(str(tmp_path / "hotel.db"), schema_version=3)
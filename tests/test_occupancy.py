@@ -0,0 +1,96 @@
+import random
+from datetime import date, datetime, timedelta
+import pytest
+from hotel_management.database import DatabaseManager
+from hotel_management.occupancy import OccupancyCalendar
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+
+ORIGIN = date(2030, 1, 1)
+
+
+def day(offset: int) -> date:
+    return ORIGIN + timedelta(days=offset)
+
+
+class TestOccupancyCalendar:
+    def test_matches_brute_force(self):
+        rng = random.Random(3)
+        calendar = OccupancyCalendar(ORIGIN, horizon=60)
+        room_types = {room_id: rng.choice(Room.ROOM_TYPES) for room_id in range(1, 21)}
+        for room_id, room_type in room_types.items():
+            calendar.add_room(room_id, room_type)
+        bookings = {}
+        for reservation_id in range(1, 80):
+            start = rng.randrange(-5, 70)
+            booking = (rng.randrange(1, 21), start, start + rng.randrange(1, 8))
+            bookings[reservation_id] = booking
+            calendar.add_booking(
+                reservation_id, booking[0], day(booking[1]), day(booking[2])
+            )
+        for reservation_id in range(1, 80, 4):
+            assert calendar.cancel_reservation(reservation_id)
+            del bookings[reservation_id]
+
+        def busy(room_id, night):
+            return any(r == room_id and s <= night < e for r, s, e in bookings.values())
+
+        for _ in range(50):
+            start = rng.randrange(0, 55)
+            end = start + rng.randrange(1, 6)
+            room_type = rng.choice([None, "double"])
+            rooms = [
+                r for r, t in room_types.items() if room_type is None or t == room_type
+            ]
+            free = [r for r in rooms if not any(busy(r, n) for n in range(start, end))]
+            assert calendar.free_rooms(day(start), day(end), room_type) == free
+            nights = [sum(busy(r, n) for r in rooms) for n in range(start, end)]
+            assert calendar.daily_free(day(start), day(end), room_type) == [
+                len(rooms) - count for count in nights
+            ]
+            assert calendar.occupancy_rate(
+                day(start), day(end), room_type
+            ) == pytest.approx(sum(nights) / (len(rooms) * (end - start)))
+
+    def test_horizon_and_advance(self):
+        calendar = OccupancyCalendar(ORIGIN, horizon=10)
+        calendar.add_room(1, "single")
+        calendar.add_booking(1, 1, day(8), day(14))
+        with pytest.raises(ValueError):
+            calendar.free_rooms(day(8), day(12))
+        assert calendar.daily_free(day(7), day(10)) == [1, 0, 0]
+
+        calendar.advance(day(5))
+        # Ночи за прежним горизонтом появились после сдвига
+        assert calendar.daily_free(day(7), day(15)) == [1, 0, 0, 0, 0, 0, 0, 1]
+        assert not calendar.is_room_free(1, day(13), day(14))
+
+    def test_untyped_rooms_do_not_share_overall_counter(self):
+        calendar = OccupancyCalendar(ORIGIN, horizon=30)
+        calendar.add_room(1)
+        calendar.add_room(2, "single")
+        calendar.add_booking(7, 1, day(2), day(5))
+        assert calendar.daily_free(day(0), day(6)) == [2, 2, 1, 1, 1, 2]
+        assert calendar.occupancy_rate(day(2), day(5)) == pytest.approx(0.5)
+        calendar.cancel_reservation(7)
+        assert calendar.daily_free(day(0), day(6)) == [2] * 6
+
+    def test_status_changes(self, tmp_path):
+        start = datetime.combine(ORIGIN, datetime.min.time())
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            db.save_room(Room(1, 101, "single", 100.0, 1))
+            db.save_reservation(Reservation(1, 1, 1, start, start + timedelta(3), 1))
+            calendar = OccupancyCalendar.from_database(db, ORIGIN, horizon=30)
+        assert calendar.free_rooms(day(0), day(3)) == []
+
+        reservation = Reservation(
+            2, 1, 1, start + timedelta(5), start + timedelta(9), 1
+        )
+        calendar.add_reservation(reservation)
+        assert calendar.occupancy_rate(day(5), day(9)) == 1.0
+        assert calendar.complete_reservation(2, day(7))
+        assert calendar.free_rooms(day(7), day(9)) == [1]
+        reservation.status = "cancelled"
+        assert calendar.free_rooms(day(5), day(9)) == [1]
+        assert calendar.cancel_reservation(1)
+        assert calendar.occupancy_rate(day(0), day(30)) == 0.0
@@ -0,0 +1,68 @@
+import math
+from datetime import datetime, timedelta
+import pytest
+from hotel_management.database import DatabaseManager
+from hotel_management.pricing import price_batch, reprice_reservations
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+
+
+def _modes():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return [False]
+    return [False, True]
+
+
+@pytest.mark.parametrize("use_numpy", _modes())
+class TestPriceBatch:
+    def test_matches_scalar_methods(self, use_numpy):
+        start = datetime(2025, 4, 1, 14, 0)
+        check_in = [start + timedelta(days=i) for i in range(20)]
+        check_out = [
+            d + timedelta(days=1 + i % 5, hours=i % 3) for i, d in enumerate(check_in)
+        ]
+        room_ids = [1 + i % 3 for i in range(20)]
+        prices = {1: 99.9, 2: 120.0, 3: 33.33}
+        result = price_batch(check_in, check_out, room_ids, prices, use_numpy=use_numpy)
+        assert result.errors == {}
+        for i in range(20):
+            reservation = Reservation(i, 1, room_ids[i], check_in[i], check_out[i], 1)
+            price = prices[room_ids[i]]
+            assert result.nights[i] == reservation.get_stay_duration()
+            assert result.stay_cost[i] == reservation.calculate_stay_cost(price)
+            assert result.deposit[i] == reservation.calculate_booking_deposit(price)
+
+    def test_errors_reported_per_row(self, use_numpy):
+        check_in = ["2025-04-01T00:00:00", "2025-04-05T00:00:00", "2025-04-01T00:00:00"]
+        check_out = [
+            "2025-04-03T00:00:00",
+            "2025-04-05T00:00:00",
+            "2025-04-02T00:00:00",
+        ]
+        result = price_batch(
+            check_in, check_out, [1, 1, 9], {1: 100.0}, use_numpy=use_numpy
+        )
+        assert result.stay_cost[0] == 200.0
+        assert math.isnan(result.stay_cost[1])
+        assert result.errors == {
+            1: "Минимальное время проживания - 1 ночь",
+            2: "Номер не найден",
+        }
+
+
+class TestRepriceReservations:
+    def test_writes_total_cost(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            db.save_rooms_many([Room(1, 101, "single", 80.0, 1)])
+            day = datetime(2025, 4, 1)
+            cancelled = Reservation(2, 1, 1, day, day + timedelta(days=1), 1)
+            cancelled.status = "cancelled"
+            db.save_reservations_many(
+                [Reservation(1, 1, 1, day, day + timedelta(days=3), 1), cancelled]
+            )
+            report = reprice_reservations(db, chunk_size=1)
+            assert report.updated == 1
+            costs = {r.id: r.total_cost for r in db.get_all_reservations()}
+            assert costs == {1: 240.0, 2: 0.0}
@@ -0,0 +1,72 @@
+import math
+import random
+from datetime import datetime, timedelta
+import pytest
+from hotel_management.database import DatabaseManager
+from hotel_management.reports import build_report, partition
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    rng = random.Random(5)
+    path = str(tmp_path / "hotel.db")
+    start = datetime(2019, 1, 1, 14)
+    reservations = []
+    for i in range(1, 301):
+        check_in = start + timedelta(days=rng.randrange(900), hours=rng.randrange(3))
+        reservation = Reservation(
+            i,
+            1,
+            rng.randrange(1, 7),
+            check_in,
+            check_in + timedelta(rng.randrange(1, 9)),
+            1,
+        )
+        # Цены с дробной частью: порядок сложения влияет на обычную сумму
+        reservation.calculate_stay_cost(rng.uniform(50, 500) + 1e-7)
+        reservation.status = rng.choice(["active", "completed", "cancelled"])
+        reservations.append(reservation)
+    with DatabaseManager(path) as db:
+        db.save_rooms_many(
+            Room(i, 100 + i, Room.ROOM_TYPES[i % 4], 100.0, 2) for i in range(1, 6)
+        )
+        db.save_reservations_many(reservations)
+    return path, reservations
+
+
+class TestReports:
+    def test_partition(self):
+        assert partition(1, 10, 3) == [(1, 4), (5, 8), (9, 10)]
+        assert partition(1, 2, 5) == [(1, 1), (2, 2)]
+        assert partition(0, -1, 3) == []
+        with pytest.raises(ValueError):
+            partition(1, 10, 0)
+
+    def test_matches_reference(self, db_path):
+        path, reservations = db_path
+        report = build_report(path, workers=1)
+        sold = [r for r in reservations if r.status != "cancelled"]
+        assert report.cancelled == len(reservations) - len(sold)
+        assert report.total.reservations == len(sold)
+        assert report.total.nights == sum(r.get_stay_duration() for r in sold)
+        assert report.total.revenue == math.fsum(r.total_cost for r in sold)
+
+        months = {}
+        for r in sold:
+            months.setdefault(r.check_in_date.isoformat()[:7], []).append(r)
+        assert list(report.by_month) == sorted(months)
+        for month, rows in months.items():
+            row = report.by_month[month]
+            assert row.nights == sum(r.get_stay_duration() for r in rows)
+            assert row.revenue == math.fsum(r.total_cost for r in rows)
+            assert row.average_daily_rate == row.revenue / row.nights
+        # Номер 6 отсутствует в таблице rooms: тип неизвестен
+        assert report.by_room_type[None].reservations == sum(
+            r.room_id == 6 for r in sold
+        )
+
+    def test_parallel_equals_single(self, db_path):
+        path, _ = db_path
+        assert build_report(path, workers=2) == build_report(path, workers=1)
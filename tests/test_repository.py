@@ -0,0 +1,67 @@
+from datetime import datetime
+import pytest
+from hotel_management.database import DatabaseManager
+from hotel_management.guest import Guest
+from hotel_management.repository import HotelRepository
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+
+
+@pytest.fixture
+def db(tmp_path):
+    with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+        db.save_rooms_many(
+            [Room(1, 101, "single", 100.0, 1), Room(5, 105, "suite", 400.0, 4)]
+        )
+        db.save_guests_many(
+            [Guest(1, "John Doe", "john@example.com", "+1234567890", "AB123456")]
+        )
+        db.save_reservations_many(
+            [Reservation(3, 1, 5, datetime(2025, 1, 1), datetime(2025, 1, 4), 2)]
+        )
+        yield db
+
+
+class TestHotelRepository:
+    def test_identity_map(self, db):
+        repository = HotelRepository(db)
+        rooms = repository.load_rooms()
+        assert [room.number for room in rooms] == [101, 105]
+        assert repository.load_rooms()[0] is rooms[0]
+        assert repository.get(Room, 5) is rooms[1]
+
+    def test_next_id_follows_database(self, db):
+        repository = HotelRepository(db)
+        assert repository.next_id(Room) == 6
+        assert repository.next_id(Guest) == 2
+        assert repository.next_id(Reservation) == 4
+        repository.register(Room(6, 106, "single", 100.0, 1))
+        assert repository.next_id(Room) == 7
+
+    def test_reservations_loaded_lazily(self, db):
+        repository = HotelRepository(db)
+        new = Reservation(4, 1, 1, datetime(2025, 2, 1), datetime(2025, 2, 2), 1)
+        repository.reservations.append(new)
+        assert not repository.reservations.loaded
+        assert [r.id for r in repository.reservations] == [3, 4]
+        assert repository.reservations.loaded
+
+    def test_pending_saved_item_not_duplicated(self, db):
+        repository = HotelRepository(db)
+        new = Reservation(4, 1, 1, datetime(2025, 2, 1), datetime(2025, 2, 2), 1)
+        repository.register(new)
+        repository.reservations.append(new)
+        db.save_reservation(new.to_dict())
+        assert len(repository.reservations) == 2
+        assert repository.reservations[1] is new
+
+    def test_unregister(self, db):
+        repository = HotelRepository(db)
+        room = Room(6, 106, "single", 100.0, 1)
+        repository.register(room)
+        repository.unregister(room)
+        assert repository.get(Room, 6) is None
+        # Другой объект с тем же id не удаляется
+        loaded = repository.load_rooms()[0]
+        repository.unregister(Room(1, 101, "single", 100.0, 1))
+        assert repository.get(Room, 1) is loaded
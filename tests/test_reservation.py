@@ -25,3 +25,13 @@ class TestReservation:
         reservation = Reservation(1, 1, 1, check_in, check_out, 2)
         deposit = reservation.calculate_booking_deposit(100.0)
         assert deposit == 20.0  # 20% от 100
+
+    def test_from_row(self):
+        check_in = datetime(2025, 3, 1)
+        check_out = check_in + timedelta(days=2)
+        original = Reservation(7, 1, 2, check_in, check_out, 2)
+        original.calculate_stay_cost(50.0)
+        row = tuple(original.to_dict().values())
+        restored = Reservation.from_row(row)
+        assert restored.to_dict() == original.to_dict()
+        assert restored.created_at == original.created_at
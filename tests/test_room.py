@@ -17,3 +17,16 @@ class TestRoom:
     def test_calculate_stay_cost(self):
         room = Room(1, 101, "single", 100.0, 2)
         assert room.calculate_stay_cost(5) == 500.0
+
+    def test_room_has_no_instance_dict(self):
+        room = Room(1, 101, "single", 100.0, 2)
+        assert not hasattr(room, "__dict__")
+        with pytest.raises(AttributeError):
+            room.floor = 3
+
+    def test_row_round_trip(self):
+        room = Room(1, 101, "single", 100.0, 2)
+        room.is_available = False
+        restored = Room.from_row(room.to_row())
+        assert restored.to_row() == room.to_row()
+        assert restored.is_available is False
@@ -0,0 +1,110 @@
+import random
+import pytest
+from hotel_management.room import Room
+from hotel_management.room_registry import RoomRegistry, _discard
+
+
+@pytest.fixture
+def rooms():
+    rng = random.Random(7)
+    return [
+        Room(
+            i,
+            100 + i,
+            rng.choice(Room.ROOM_TYPES),
+            float(rng.randrange(50, 500, 25)),
+            rng.randrange(1, 5),
+        )
+        for i in range(1, 201)
+    ]
+
+
+class TestRoomRegistry:
+    def test_point_lookups(self, rooms):
+        registry = RoomRegistry(rooms)
+        assert registry.get(5) is rooms[4]
+        assert registry.get_by_number(105) is rooms[4]
+        assert registry.get(999) is None
+        assert len(registry) == 200 and 5 in registry
+        with pytest.raises(ValueError):
+            registry.add(Room(500, 101, "single", 100.0, 1))
+
+    def test_queries_match_linear_scan(self, rooms):
+        registry = RoomRegistry(rooms)
+        assert registry.of_type("suite") == [r for r in rooms if r.room_type == "suite"]
+        assert registry.by_price(100, 200) == sorted(
+            (r for r in rooms if 100 <= r.price_per_night <= 200),
+            key=lambda r: (r.price_per_night, r.id),
+        )
+        assert {r.id for r in registry.by_capacity(min_capacity=3)} == {
+            r.id for r in rooms if r.capacity >= 3
+        }
+        doubles = [r for r in rooms if r.room_type == "double" and r.capacity >= 3]
+        assert registry.cheapest(room_type="double", min_capacity=3) == min(
+            doubles, key=lambda r: (r.price_per_night, r.id)
+        )
+
+    def test_indexes_follow_setters(self, rooms):
+        registry = RoomRegistry(rooms)
+        room = rooms[0]
+        room.number = 999
+        room.room_type = "deluxe"
+        room.price_per_night = 1.0
+        room.capacity = 4
+        room.is_available = False
+        assert registry.get_by_number(999) is room
+        assert registry.get_by_number(101) is None
+        assert room in registry.of_type("deluxe")
+        assert registry.cheapest() is room
+        assert registry.cheapest(available=True) is not room
+        assert room in registry.by_capacity(4, 4)
+
+        registry.remove(room.id)
+        room.price_per_night = 0.5
+        assert registry.cheapest() is not room
+        assert room not in registry.by_capacity(4, 4)
+
+    def test_find_matches_linear_scan(self, rooms):
+        registry = RoomRegistry(rooms)
+        for room_type in (None, "double"):
+            for min_capacity in (None, 1, 3, 4):
+                for max_price in (None, 150.0, 1000.0):
+                    for limit in (None, 2):
+                        expected = sorted(
+                            (
+                                r
+                                for r in rooms
+                                if (room_type is None or r.room_type == room_type)
+                                and (min_capacity is None or r.capacity >= min_capacity)
+                                and (
+                                    max_price is None or r.price_per_night <= max_price
+                                )
+                            ),
+                            key=lambda r: (r.price_per_night, r.id),
+                        )
+                        assert (
+                            registry.find(
+                                room_type, min_capacity, max_price, limit=limit
+                            )
+                            == expected[:limit]
+                        )
+
+    def test_duplicate_number_is_rejected(self, rooms):
+        registry = RoomRegistry(rooms)
+        seen = []
+        rooms[0].subscribe(lambda room, field, old, new: seen.append(field))
+        with pytest.raises(ValueError):
+            rooms[0].number = 102
+        # Номер отклонен до присваивания: подписчики ничего не получили
+        assert seen == []
+        assert rooms[0].number == 101
+        assert registry.get_by_number(101) is rooms[0]
+        assert registry.get_by_number(102) is rooms[1]
+
+    def test_discard_checks_key(self):
+        keys = [(1.0, 1), (2.0, 2)]
+        _discard(keys, (1.5, 3))
+        _discard(keys, (3.0, 1))
+        assert keys == [(1.0, 1), (2.0, 2)]
+        _discard(keys, (2.0, 2))
+        assert keys == [(1.0, 1)]
@@ -0,0 +1,53 @@
+import random
+import pytest
+from hotel_management.guest import Guest
+from hotel_management.search import GuestSearchIndex
+
+
+@pytest.fixture
+def guests():
+    return [
+        Guest(1, "John Doe", "john@example.com", "+1234567890", "AB123456"),
+        Guest(2, "Johnny Cash", "cash@music.org", "+1987654321", "CD987654"),
+        Guest(3, "Anna Johnson", "anna@example.com", "+1555000111", "EF555000"),
+        Guest(4, "Jo", "jo@mail.ru", "+79001234567", "GH000111"),
+    ]
+
+
+class TestGuestSearchIndex:
+    def test_same_results_as_contains(self, guests):
+        index = GuestSearchIndex(guests)
+        rng = random.Random(3)
+        for guest in guests:
+            text = f"{guest.name} {guest.email} {guest.phone} {guest.passport}"
+            for _ in range(20):
+                start = rng.randrange(len(text))
+                query = text[start : start + rng.randrange(1, 6)]
+                expected = {g.id for g in guests if query in g}
+                assert {g.id for g in index.search(query, limit=10)} == expected
+
+    def test_ranking_and_limit(self, guests):
+        index = GuestSearchIndex(guests)
+        assert [g.id for g in index.search("john")] == [1, 2, 3]
+        assert [g.id for g in index.search("JOHN", limit=1)] == [1]
+
+    def test_follows_setter_changes(self, guests):
+        index = GuestSearchIndex(guests)
+        guests[0].name = "Richard Roe"
+        assert index.search("john doe") == []
+        assert index.search("richard") == [guests[0]]
+
+    def test_remove(self, guests):
+        index = GuestSearchIndex(guests)
+        index.remove(1)
+        guests[0].name = "Johnathan"
+        assert 1 not in index
+        assert [g.id for g in index.search("john")] == [2, 3]
+
+    def test_compaction_keeps_results(self, guests):
+        index = GuestSearchIndex(guests)
+        for round in range(10):
+            guests[1].email = f"cash{round}@music.org"
+        assert [g.id for g in index.search("cash9@")] == [2]
+        assert index.search("cash3@") == []
+        assert [g.id for g in index.search("music")] == [2]
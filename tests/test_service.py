@@ -0,0 +1,176 @@
+import asyncio
+import json
+from datetime import date, datetime, time, timedelta
+import pytest
+from hotel_management.database import BookingConflictError, DatabaseManager
+from hotel_management.guest import Guest
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+from hotel_management.service import BookingService
+
+
+def day(offset: int) -> str:
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+def moment(offset: int) -> datetime:
+    return datetime.combine(date.today() + timedelta(days=offset), time())
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "hotel.db")
+    with DatabaseManager(path) as db:
+        db.save_rooms_many(
+            [
+                Room(1, 101, "single", 100.0, 1),
+                Room(2, 102, "double", 150.0, 2),
+                Room(3, 103, "double", 160.0, 2),
+            ]
+        )
+        db.save_guest(Guest(1, "Иван", "ivan@example.com", "+79001234567", "PP1"))
+    return path
+
+
+async def request(port: int, method: str, path: str, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    data = json.loads(await reader.read())
+    writer.close()
+    return status, data
+
+
+class TestBookingService:
+    def test_book_conflict_and_cancel(self, db_path):
+        async def run():
+            service = BookingService(db_path)
+            try:
+                check_in, check_out = moment(10), moment(13)
+                free = service.find_available(check_in, check_out, "double", 2)
+                assert [room["id"] for room in free] == [2, 3]
+                # Повторный запрос без изменений занятости берется из кэша
+                assert service.find_available(check_in, check_out, "double", 2) == free
+                assert service.coalesced == 1
+
+                quote = await service.quote(2, check_in, check_out, 2)
+                assert (quote["nights"], quote["stay_cost"]) == (3, 450.0)
+                assert quote["deposit"] == 30.0
+
+                results = await asyncio.gather(
+                    service.book(1, 2, check_in, check_out, 2),
+                    service.book(1, 2, check_in, check_out, 1),
+                    return_exceptions=True,
+                )
+                assert isinstance(results[1], BookingConflictError)
+                booked = results[0]
+                assert booked["total_cost"] == 450.0
+                free = service.find_available(check_in, check_out, "double", 2)
+                assert [room["id"] for room in free] == [3]
+                report = service.occupancy_report(check_in, check_out, "double")
+                assert report == {"occupancy_rate": 0.5, "daily_free": [1, 1, 1]}
+
+                await service.cancel(booked["id"])
+                report = service.occupancy_report(check_in, check_out, None)
+                assert report["daily_free"] == [3, 3, 3]
+                free = service.find_available(check_in, check_out, "double", 2)
+                assert [room["id"] for room in free] == [2, 3]
+                with pytest.raises(LookupError):
+                    await service.cancel(999)
+                with pytest.raises(ValueError):
+                    await service.book(1, 1, check_in, check_out, 2)
+            finally:
+                await service.close()
+            with DatabaseManager(db_path) as db:
+                rows = db.get_all_reservations()
+            assert [row.status for row in rows] == ["cancelled"]
+
+        asyncio.run(run())
+
+    def test_bookings_of_other_clients(self, db_path):
+        async def run():
+            service = BookingService(db_path)
+            try:
+                check_in, check_out = moment(10), moment(13)
+                with DatabaseManager(db_path) as other:
+                    taken = other.book_if_free(
+                        Reservation(None, 1, 2, moment(11), moment(12), 1)
+                    )
+                # Конфликт при записи загружает бронирования номера
+                with pytest.raises(BookingConflictError):
+                    await service.book(1, 2, check_in, check_out, 1)
+                free = service.find_available(check_in, check_out, "double", 2)
+                assert [room["id"] for room in free] == [3]
+
+                with DatabaseManager(db_path) as other:
+                    other.set_reservation_status(taken, "cancelled")
+                    other.book_if_free(
+                        Reservation(None, 1, 3, moment(10), moment(11), 1)
+                    )
+                await service.sync()
+                free = service.find_available(check_in, check_out, "double", 2)
+                assert [room["id"] for room in free] == [2]
+            finally:
+                await service.close()
+
+        asyncio.run(run())
+
+    def test_http_endpoints(self, db_path):
+        async def run():
+            service = BookingService(db_path)
+            server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                status, data = await request(
+                    port,
+                    "GET",
+                    f"/availability?check_in={day(1)}&check_out={day(3)}&guests=2",
+                )
+                assert status == 200
+                assert [room["id"] for room in data["rooms"]] == [2, 3]
+
+                booking = {
+                    "guest_id": 1,
+                    "room_id": 3,
+                    "check_in": day(1),
+                    "check_out": day(3),
+                    "num_guests": 2,
+                }
+                status, data = await request(port, "POST", "/reservations", booking)
+                assert (status, data["total_cost"]) == (201, 320.0)
+                status, _ = await request(port, "POST", "/reservations", booking)
+                assert status == 409
+                status, data = await request(
+                    port,
+                    "GET",
+                    f"/quote?room_id=7&check_in={day(1)}&check_out={day(2)}",
+                )
+                assert status == 404
+                status, _ = await request(
+                    port, "GET", "/availability?check_in=завтра&check_out=x"
+                )
+                assert status == 400
+                status, data = await request(
+                    port, "GET", f"/occupancy?check_in={day(0)}&check_out={day(4)}"
+                )
+                assert status == 200
+                assert data["daily_free"] == [3, 2, 2, 3]
+                status, _ = await request(port, "DELETE", f"/reservations/{1}")
+                assert status == 200
+                status, data = await request(
+                    port, "GET", f"/occupancy?check_in={day(0)}&check_out={day(4)}"
+                )
+                assert data["daily_free"] == [3, 3, 3, 3]
+            finally:
+                server.close()
+                await server.wait_closed()
+                await service.close()
+
+        asyncio.run(run())
@@ -0,0 +1,166 @@
+import random
+from datetime import date, datetime, timedelta
+import pytest
+from hotel_management.database import DatabaseManager
+from hotel_management.guest import Guest
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+from hotel_management.snapshot import load_state, save_snapshot
+
+TODAY = date(2030, 3, 1)
+
+
+@pytest.fixture
+def db(tmp_path):
+    rng = random.Random(3)
+    with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+        db.save_rooms_many(
+            Room(i, 100 + i, Room.ROOM_TYPES[i % 4], 50.0 + i, 2) for i in range(1, 9)
+        )
+        db.save_guests_many(
+            Guest(i, f"Гость {i}", f"guest{i}@example.com", "+79001234567", f"P{i}")
+            for i in range(1, 6)
+        )
+        reservations = []
+        for i in range(1, 201):
+            check_in = datetime(2030, 1, 1) + timedelta(
+                days=rng.randrange(120), hours=rng.randrange(3)
+            )
+            reservation = Reservation(
+                i, 1 + i % 5, 1 + i % 8, check_in, check_in + timedelta(2), 1
+            )
+            reservation.calculate_stay_cost(rng.uniform(50, 500))
+            if i % 7 == 0:
+                reservation.status = "cancelled"
+            reservations.append(reservation)
+        db.save_reservations_many(reservations)
+        yield db
+
+
+def view(state, today=TODAY) -> dict:
+    """Все, что приложение видит после запуска"""
+    stats = state.statistics
+    periods = [
+        (today + timedelta(d), today + timedelta(d + 3)) for d in range(0, 60, 4)
+    ]
+    return {
+        "rooms": [r.to_row() for r in state.repository.load_rooms()],
+        "guests": [g.to_row() for g in state.repository.load_guests()],
+        "reservations": [r.to_row() for r in state.repository.reservations],
+        "next_ids": [
+            state.repository.next_id(entity) for entity in (Room, Guest, Reservation)
+        ],
+        "totals": (
+            stats.total_rooms,
+            stats.available_rooms,
+            stats.total_guests,
+            round(stats.total_revenue, 6),
+        ),
+        "statuses": stats.reservations_by_status(),
+        "room_types": stats.rooms_by_type(),
+        "by_type": {
+            k: v[:2] + (round(v[2], 6),) for k, v in stats.by_room_type().items()
+        },
+        "by_month": {k: v[:2] + (round(v[2], 6),) for k, v in stats.by_month().items()},
+        "free": [state.availability.free_rooms(*period) for period in periods],
+        "conflicts": [
+            sorted(state.availability.conflicting_reservations(room_id, *period))
+            for room_id in range(1, 10)
+            for period in periods
+        ],
+    }
+
+
+def from_database(db, today=TODAY) -> dict:
+    return view(load_state(db, "missing.snapshot", today), today)
+
+
+class TestSnapshot:
+    def test_round_trip(self, tmp_path, db):
+        path = str(tmp_path / "hotel.snapshot")
+        save_snapshot(db, path, TODAY)
+        state = load_state(db, path, TODAY)
+        assert state.reason is None and state.snapshot is not None
+        assert view(state) == from_database(db)
+
+    def test_replays_changes_after_snapshot(self, tmp_path, db):
+        path = str(tmp_path / "hotel.snapshot")
+        previous = save_snapshot(db, path, TODAY)
+        db.save_guest(Guest(6, "Новый гость", "new@example.com", "+7900", "P6"))
+        db.save_room(Room(9, 109, "suite", 500.0, 4))
+        db.save_reservation(
+            Reservation(201, 6, 9, datetime(2030, 3, 5), datetime(2030, 3, 9), 2)
+        )
+        db.save_reservation(
+            Reservation(150, 1, 2, datetime(2030, 3, 2), datetime(2030, 3, 4), 1)
+        )
+        db.set_reservation_status(3, "cancelled")
+        db.update_reservation_costs([(999.0, 4)])
+        db.connection.execute("DELETE FROM reservations WHERE id IN (5, 120)")
+        expected = from_database(db)
+
+        state = load_state(db, path, TODAY)
+        assert state.reason is None
+        assert state.snapshot.mark > previous.mark
+        assert view(state) == expected
+
+        # Следующий снимок строится из предыдущего и журнала изменений
+        later = TODAY + timedelta(10)
+        refreshed = save_snapshot(db, path, later, state.snapshot)
+        assert refreshed.mark == state.snapshot.mark
+        assert not db.get_changes(0)["reservations"]
+        state = load_state(db, path, later)
+        assert state.reason is None
+        assert view(state, later) == from_database(db, later)
+
+    def test_room_type_change_recomputes_statistics(self, tmp_path, db):
+        path = str(tmp_path / "hotel.snapshot")
+        save_snapshot(db, path, TODAY)
+        db.connection.execute("UPDATE rooms SET room_type = 'penthouse' WHERE id = 3")
+        state = load_state(db, path, TODAY)
+        assert state.reason is None
+        assert view(state) == from_database(db)
+
+    def test_file_layout_is_checked(self, tmp_path, db):
+        path = tmp_path / "hotel.snapshot"
+        save_snapshot(db, str(path), TODAY)
+        data = bytearray(path.read_bytes())
+        data[-5] ^= 0xFF
+        path.write_bytes(bytes(data))
+        state = load_state(db, str(path), TODAY)
+        assert state.snapshot is None and "Контрольная сумма" in state.reason
+        assert view(state) == from_database(db)
+
+        path.write_bytes(bytes(data[:100]))
+        assert "обрезан" in load_state(db, str(path), TODAY).reason
+        path.write_bytes(b"")
+        assert "обрезан" in load_state(db, str(path), TODAY).reason
+
+    def test_stale_snapshots_fall_back_to_database(self, tmp_path, db):
+        path = str(tmp_path / "hotel.snapshot")
+        old = save_snapshot(db, path, TODAY)
+        old.write(str(tmp_path / "old.snapshot"))
+        db.set_reservation_status(1, "cancelled")
+        save_snapshot(db, path, TODAY, old)
+
+        # Журнал после старого снимка очищен следующим снимком
+        state = load_state(db, str(tmp_path / "old.snapshot"), TODAY)
+        assert state.snapshot is None and "очищен" in state.reason
+        assert view(state) == from_database(db)
+        assert "более поздней" in load_state(db, path, TODAY - timedelta(1)).reason
+        db.set_reservation_status(2, "cancelled")
+        assert "слишком много" in load_state(db, path, TODAY, max_changes=0).reason
+
+        with DatabaseManager(str(tmp_path / "other.db")) as other:
+            save_snapshot(other, str(tmp_path / "other.snapshot"), TODAY)
+        state = load_state(db, str(tmp_path / "other.snapshot"), TODAY)
+        assert "другой базы" in state.reason
+
+    def test_v1_database_is_loaded_without_snapshot(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "v1.db"), schema_version=1) as db:
+            db.save_rooms_many([Room(1, 101, "single", 100.0, 1)])
+            with pytest.raises(ValueError):
+                save_snapshot(db, str(tmp_path / "hotel.snapshot"), TODAY)
+            state = load_state(db, str(tmp_path / "hotel.snapshot"), TODAY)
+            assert state.snapshot is None
+            assert [room.id for room in state.repository.load_rooms()] == [1]
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+import pytest
+from hotel_management.database import DatabaseManager
+from hotel_management.guest import Guest
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+from hotel_management.statistics import Breakdown, HotelStatistics
+
+
+def recompute(rooms, guests, reservations) -> dict:
+    """Прежний расчет show_statistics полным обходом коллекций"""
+    return {
+        "total_rooms": len(rooms),
+        "available_rooms": len([r for r in rooms if r.is_available]),
+        "total_guests": len(guests),
+        "active_reservations": len([r for r in reservations if r.status == "active"]),
+        "total_revenue": sum(r.total_cost for r in reservations),
+    }
+
+
+def snapshot(stats: HotelStatistics) -> dict:
+    return {
+        "total_rooms": stats.total_rooms,
+        "available_rooms": stats.available_rooms,
+        "total_guests": stats.total_guests,
+        "active_reservations": stats.active_reservations,
+        "total_revenue": pytest.approx(stats.total_revenue),
+    }
+
+
+@pytest.fixture
+def hotel():
+    rooms = [Room(1, 101, "single", 100.0, 1), Room(2, 201, "suite", 400.0, 4)]
+    rooms[1].is_available = False
+    guests = [Guest(1, "John Doe", "john@example.com", "+1234567890", "AB123456")]
+    start = datetime(2025, 1, 30)
+    reservations = [
+        Reservation(1, 1, 1, start, start + timedelta(days=3), 1),
+        Reservation(2, 1, 2, start + timedelta(days=5), start + timedelta(days=7), 2),
+        Reservation(3, 1, 2, start + timedelta(days=40), start + timedelta(days=41), 2),
+    ]
+    for reservation, room in zip(reservations, [rooms[0], rooms[1], rooms[1]]):
+        reservation.calculate_stay_cost(room.price_per_night)
+    reservations[2].status = "cancelled"
+    return rooms, guests, reservations
+
+
+class TestHotelStatistics:
+    def test_seed_from_database(self, tmp_path, hotel):
+        rooms, guests, reservations = hotel
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            db.save_rooms_many(rooms)
+            db.save_guests_many(guests)
+            db.save_reservations_many(reservations)
+            stats = HotelStatistics.from_database(db)
+        assert snapshot(stats) == recompute(rooms, guests, reservations)
+        assert stats.rooms_by_type() == {"single": (1, 1), "suite": (1, 0)}
+        assert stats.by_room_type() == {
+            "single": Breakdown(1, 1, 300.0),
+            "suite": Breakdown(2, 1, 1200.0),
+        }
+        assert stats.by_month() == {
+            "2025-01": Breakdown(1, 1, 300.0),
+            "2025-02": Breakdown(1, 1, 800.0),
+            "2025-03": Breakdown(1, 0, 400.0),
+        }
+        assert stats.reservations_by_status() == {"active": 2, "cancelled": 1}
+
+    def test_incremental_updates_match_recompute(self, hotel):
+        rooms, guests, reservations = hotel
+        stats = HotelStatistics()
+        for room in rooms:
+            stats.add_room(room)
+        for guest in guests:
+            stats.add_guest(guest)
+        for reservation in reservations:
+            stats.add_reservation(reservation)
+        assert snapshot(stats) == recompute(rooms, guests, reservations)
+
+        rooms[0].is_available = False
+        rooms[1].is_available = True
+        reservations[0].status = "completed"
+        reservations[1].calculate_stay_cost(500.0)
+        reservations[1].check_in_date = datetime.now() + timedelta(days=400)
+        reservations[1].check_out_date = reservations[1].check_in_date + timedelta(1)
+        assert snapshot(stats) == recompute(rooms, guests, reservations)
+
+        month = reservations[1].check_in_date.isoformat()[:7]
+        assert "2025-02" not in stats.by_month()
+        assert stats.by_month()[month] == Breakdown(1, 1, 1000.0)
+        assert stats.by_room_type()["single"] == Breakdown(1, 0, 300.0)
+
+    def test_room_type_change_moves_room(self, hotel):
+        rooms, _, _ = hotel
+        stats = HotelStatistics()
+        for room in rooms:
+            stats.add_room(room)
+        rooms[0].room_type = "deluxe"
+        assert stats.rooms_by_type() == {"deluxe": (1, 1), "suite": (1, 0)}
+
+    def test_removed_room_and_guest_are_not_counted(self, hotel):
+        rooms, guests, _ = hotel
+        stats = HotelStatistics()
+        for room in rooms:
+            stats.add_room(room)
+        stats.add_guest(guests[0])
+        stats.remove_room(rooms[0])
+        stats.remove_guest(guests[0])
+        # Изменения удаленного номера больше не учитываются
+        rooms[0].is_available = False
+        assert (stats.total_rooms, stats.available_rooms) == (1, 0)
+        assert stats.rooms_by_type()["suite"] == (1, 0)
+        assert stats.total_guests == 0
@@ -0,0 +1,55 @@
+import pytest
+from hotel_management.guest import Guest
+from hotel_management.validation import invalid_guests, validate_guests
+
+
+def _records():
+    return [
+        {
+            "name": "John Doe",
+            "email": "john@example.com",
+            "phone": "+1234567890",
+            "passport": "AB123456",
+        },
+        {
+            "name": " ",
+            "email": "not-an-email",
+            "phone": "+1234567890",
+            "passport": "AB123456",
+        },
+        {
+            "name": "Jane Roe",
+            "email": "jane@example.com",
+            "phone": "0123",
+            "passport": "AB1",
+        },
+        {"name": "No Phone", "email": "np@example.com", "passport": "AB123456"},
+    ]
+
+
+class TestValidateGuests:
+    def test_reports_every_row(self):
+        results = list(validate_guests(iter(_records()), chunk_size=3))
+        assert [r.index for r in results] == [0, 1, 2, 3]
+        assert results[0].ok
+        assert results[1].errors == [
+            "name: Имя не может быть пустым",
+            "email: Некорректный email адрес",
+        ]
+        assert len(results[2].errors) == 2
+        assert results[3].errors == ["phone: поле отсутствует"]
+
+    def test_accepts_guest_objects(self):
+        guest = Guest(1, "John Doe", "john@example.com", "+1234567890", "AB123456")
+        assert list(invalid_guests([guest])) == []
+
+    def test_process_pool_matches_serial(self):
+        records = _records() * 50
+        serial = [r.errors for r in validate_guests(records, chunk_size=7)]
+        parallel = [r.errors for r in validate_guests(records, workers=2, chunk_size=7)]
+        assert parallel == serial
+
+    def test_rules_shared_with_setters(self):
+        guest = Guest(1, "John Doe", "john@example.com", "+1234567890", "AB123456")
+        with pytest.raises(ValueError, match="Некорректный email адрес"):
+            guest.email = "not-an-email"
@@ -0,0 +1,82 @@
+import sqlite3
+from datetime import datetime
+import pytest
+from hotel_management.database import BookingConflictError, DatabaseManager
+from hotel_management.guest import Guest
+from hotel_management.reservation import Reservation
+from hotel_management.room import Room
+from hotel_management.write_queue import WriteQueue
+
+
+class TestWriteQueue:
+    def test_flush_writes_pending(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            queue = WriteQueue(db)
+            queue.put(Room(1, 101, "single", 100.0, 2))
+            queue.put(
+                Guest(1, "John Doe", "john@example.com", "+1234567890", "AB123456")
+            )
+            assert len(queue) == 2
+            assert db.get_all_rooms() == []
+            assert queue.flush() == {"rooms": [1], "guests": [1]}
+            assert len(queue) == 0
+            assert len(db.get_all_rooms()) == 1
+
+    def test_put_only_enqueues(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            queue = WriteQueue(db, batch_size=2)
+            queue.put(Room(1, 101, "single", 100.0, 2))
+            assert not queue.full
+            queue.put(Room(2, 102, "single", 100.0, 2))
+            assert queue.full
+            assert db.get_all_rooms() == []
+            queue.flush()
+            assert not queue.full
+            assert len(db.get_all_rooms()) == 2
+
+    def test_failed_entities_are_set_aside(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            db.connection.execute(
+                "CREATE TRIGGER reject BEFORE INSERT ON rooms_v2 WHEN NEW.number = 102"
+                " BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+            )
+            queue = WriteQueue(db)
+            queue.put(Room(1, 101, "single", 100.0, 2))
+            queue.put(Room(2, 102, "double", 120.0, 2))
+            queue.put(Room(3, 103, "single", 100.0, 2))
+            assert queue.flush() == {"rooms": [1, 3]}
+            assert [(room.id, type(e)) for room, e in queue.failed] == [
+                (2, sqlite3.IntegrityError)
+            ]
+            assert len(queue) == 0
+            assert queue.flush() == {}
+
+    def test_reservations_are_checked_for_overlap(self, tmp_path):
+        def reservation(reservation_id: int, day: int) -> Reservation:
+            return Reservation(
+                reservation_id,
+                1,
+                1,
+                datetime(2030, 1, day),
+                datetime(2030, 1, day + 3),
+                1,
+            )
+
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            db.save_reservation(reservation(1, 1))
+            queue = WriteQueue(db)
+            queue.put(Room(1, 101, "single", 100.0, 2))
+            queue.put(reservation(2, 2))
+            queue.put(reservation(3, 10))
+            queue.put(reservation(4, 11))
+            assert queue.flush() == {"rooms": [1], "reservations": [3]}
+            assert [(item.id, type(e)) for item, e in queue.failed] == [
+                (2, BookingConflictError),
+                (4, BookingConflictError),
+            ]
+            assert db.get_double_bookings() == []
+
+    def test_rejects_unknown_entity(self, tmp_path):
+        with DatabaseManager(str(tmp_path / "hotel.db")) as db:
+            with pytest.raises(TypeError):
+                WriteQueue(db).put(object())